@@ -0,0 +1,353 @@
+# -*- coding: utf-8 -*-
+"""
+Run the performance benchmarks for mpcpy.
+
+Benchmarks time the data processing paths of mpcpy against the size of the
+data and print the results as a table.  They do not check results, which is
+done by the unit tests.
+
+"""
+import argparse
+import inspect
+import timeit
+import os
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+from pyfmi import load_fmu
+from mpcpy import exodata
+from mpcpy import models
+from mpcpy import optimization
+from mpcpy import units
+from mpcpy import utility
+from mpcpy import variables
+from occupant.occupancy.queueing.simulate_queue_batch import simulate_queue_batch, simulate_queue_loop
+
+
+def time_function(function, repeat = 3):
+    '''Return the best wall-clock time of repeated calls to a function.
+
+    Parameters
+    ----------
+    function : callable
+        Function without arguments to time.
+    repeat : int, optional
+        Number of times to call the function.
+        Default is 3.
+
+    Returns
+    -------
+    t : float
+        Minimum time of the calls in seconds.
+
+    '''
+
+    t = min(timeit.repeat(function, number = 1, repeat = repeat));
+
+    return t
+
+def print_table(title, header, rows):
+    '''Print a table of benchmark results.
+
+    Parameters
+    ----------
+    title : string
+        Title of the benchmark.
+    header : list of strings
+        Column names.
+    rows : list of lists
+        Rows of values.  Floats are printed in scientific notation.
+
+    '''
+
+    print('\n' + title);
+    print('-'*len(title));
+    print(''.join(['{0:>16}'.format(h) for h in header]));
+    for row in rows:
+        line = '';
+        for value in row:
+            if type(value) is float:
+                line += '{0:>16.3e}'.format(value);
+            else:
+                line += '{0:>16}'.format(value);
+        print(line);
+
+#%% Benchmarks
+def benchmark_unit_conversion():
+    '''Time conversion of display data to base units against data length.
+
+    Compares the vectorized conversion of ``variables.Static`` and
+    ``variables.Timeseries`` to an element-by-element conversion.
+
+    '''
+
+    rows = [];
+    for n in [100, 1000, 10000, 100000]:
+        data = np.random.rand(n)*30;
+        index = pd.date_range('1/1/2017', periods = n, freq = 'T');
+        ts = pd.Series(data = data, index = index);
+        unit = units.degF(variables.Static('unit', 0, units.degF));
+        t_loop = time_function(lambda: np.array([unit._convert_to_base(float(x)) for x in data]));
+        t_static = time_function(lambda: variables.Static('var', data, units.degF));
+        t_ts_loop = time_function(lambda: unit._convert_to_base(ts.apply(float)));
+        t_ts = time_function(lambda: variables.Timeseries('var', ts, units.degF));
+        rows.append([n, t_loop, t_static, t_ts_loop, t_ts]);
+    print_table('Unit conversion [s]', \
+                ['length', 'static_loop', 'static', 'ts_apply', 'timeseries'], \
+                rows);
+
+def benchmark_unit_lookup():
+    '''Time the lookup of unit classes from unit strings.
+
+    Compares the registry lookup of ``utility.get_unit_class_from_unit_string``
+    to a scan of the members of ``units`` constructing a variable for each.
+
+    '''
+
+    def scan(unit_string):
+        for name, obj in inspect.getmembers(units):
+            try:
+                if unit_string == variables.Static('tempvar', 1, obj).get_display_unit_name():
+                    return obj;
+            except:
+                continue
+        return [];
+
+    unit_strings = sorted(units._unit_registry.keys());
+    rows = [];
+    for n in [10, 100, 1000]:
+        lookups = [unit_strings[i % len(unit_strings)] for i in range(n)];
+        t_scan = time_function(lambda: [scan(x) for x in lookups]);
+        t_registry = time_function(lambda: [utility.get_unit_class_from_unit_string(x) for x in lookups]);
+        rows.append([n, t_scan, t_registry]);
+    print_table('Unit lookup [s]', ['lookups', 'scan', 'registry'], rows);
+
+def benchmark_fmu_load():
+    '''Time the loading of the weather processing fmu.
+
+    Compares loading the fmu with ``load_fmu`` to getting an instance from
+    the fmu pool of ``utility``, as done by the objects using fmus.
+
+    '''
+
+    class Owner(object):
+        pass
+
+    fmupath = os.path.join(utility.get_MPCPy_path(), 'resources', 'weather', \
+                           'WeatherProcessor_JModelica_v2.fmu');
+    utility._fmu_pool.acquire(fmupath, Owner());
+    rows = [];
+    for n in [1, 10, 50]:
+        t_load = time_function(lambda: [load_fmu(fmupath) for i in range(n)]);
+        t_pool = time_function(lambda: [utility._fmu_pool.acquire(fmupath, Owner()) for i in range(n)]);
+        rows.append([n, t_load, t_pool]);
+    print_table('FMU load [s]', ['loads', 'load_fmu', 'pool'], rows);
+
+def benchmark_batch_optimization():
+    '''Time the batch optimization of price scenarios against worker count.
+
+    Solves the energy cost minimization of the simple RC unit test model
+    for 8 scaled price scenarios with ``Optimization.optimize_batch``.
+
+    '''
+
+    resources = os.path.join(utility.get_MPCPy_path(), 'unittests', 'resources');
+    start_time = '1/1/2017';
+    final_time = '1/2/2017';
+    controls = exodata.ControlFromCSV(os.path.join(resources, 'model', 'SimpleRC_Input.csv'), \
+                                      {'q_flow_csv' : ('q_flow', units.W)});
+    controls.collect_data(start_time, '1/10/2017');
+    constraints = exodata.ConstraintFromCSV(os.path.join(resources, 'optimization', 'SimpleRC_Constraints.csv'), \
+                                            {'q_flow_min' : ('q_flow', 'GTE', units.W), \
+                                             'T_db_min' : ('T_db', 'GTE', units.K), \
+                                             'T_db_max' : ('T_db', 'LTE', units.K)});
+    constraints.collect_data(start_time, '1/10/2017');
+    price = exodata.PriceFromCSV(os.path.join(resources, 'optimization', 'SimpleRC_Prices.csv'), \
+                                 {'energy[cents/kWh]' : ('pi_e', units.cents_kWh)});
+    price.collect_data(start_time, final_time);
+    measurements = {'T_db' : {'Sample' : variables.Static('T_db_sample', 1800, units.s)}, \
+                    'q_flow' : {'Sample' : variables.Static('q_flow_sample', 1800, units.s)}};
+    model = models.Modelica(models.JModelicaParameter, models.RMSE, measurements, \
+                            moinfo = (os.path.join(resources, 'model', 'Simple.mo'), 'Simple.RC', {}), \
+                            control_data = controls.data);
+    opt_problem = optimization.Optimization(model, optimization.EnergyCostMin, optimization.JModelica, \
+                                            'q_flow', constraint_data = constraints.data);
+    scenarios = [];
+    for factor in np.linspace(0.5, 4, 8):
+        ts = price.data['pi_e'].get_base_data()*factor;
+        scenarios.append({'price_data' : {'pi_e' : variables.Timeseries('pi_e', ts, units.cents_kWh)}});
+    rows = [];
+    for processes in [1, 2, 4, 8]:
+        t = time_function(lambda: opt_problem.optimize_batch(start_time, final_time, scenarios, processes = processes), repeat = 1);
+        rows.append([processes, t, t/len(scenarios)]);
+    print_table('Batch optimization of {0} scenarios [s]'.format(len(scenarios)), \
+                ['processes', 'total', 'per_scenario'], rows);
+
+def benchmark_solar_radiation():
+    '''Time the calculation of solar radiation against weather data length.
+
+    Times each method of ``calculate_solar_radiation`` for one year of
+    hourly and of 15-minute synthetic weather data.
+
+    '''
+
+    methods = ['Zhang-Huang', 'Kasten-Czeplak', 'Haurwitz'];
+    rows = [];
+    for n, freq in [(8760, 'H'), (35040, '15T')]:
+        index = pd.date_range('1/1/2017', periods = n, freq = freq);
+        hours = np.arange(n)*24.0/(n/365);
+        df = pd.DataFrame(index = index);
+        df['alt'] = np.sin(2*np.pi*(hours % 24 - 6)/24)*np.pi/3;
+        df['cloud'] = np.random.rand(n)*10;
+        df['rh'] = np.random.rand(n)*100;
+        df['wind'] = np.random.rand(n)*10;
+        weather = exodata.WeatherFromDF(df, \
+                                        {'alt' : ('weaSolAlt', units.rad), \
+                                         'cloud' : ('weaNTot', units.unit1), \
+                                         'rh' : ('weaRelHum', units.percent), \
+                                         'wind' : ('weaWinSpe', units.m_s)}, \
+                                        [37.8716, -122.2727], \
+                                        tz_name = 'UTC');
+        weather.collect_data(str(index[0]), str(index[-1]));
+        row = [n];
+        for method in methods:
+            row.append(time_function(lambda: weather.calculate_solar_radiation(method = method)));
+        rows.append(row);
+    print_table('Solar radiation calculation [s]', ['length'] + methods, rows);
+
+def benchmark_weather_processing():
+    '''Time the collection of epw weather data against the collection period.
+
+    Compares calculating the processed weather variables with the weather 
+    processor fmu to the native ``numpy`` implementation.  The epw data is
+    collected once beforehand so that both use the parsed data.
+
+    '''
+
+    epw_filepath = os.path.join(utility.get_MPCPy_path(), 'unittests', 'resources', 'weather', \
+                                'USA_IL_Chicago-OHare.Intl.AP.725300_TMY3.epw');
+    weather_fmu = exodata.WeatherFromEPW(epw_filepath);
+    weather_numpy = exodata.WeatherFromEPW(epw_filepath, process_method = 'numpy');
+    rows = [];
+    for period, start_time, final_time in [('week', '3/1/2015', '3/8/2015'), ('month', '3/1/2015', '4/1/2015'), ('year', '1/1/2015', '1/1/2016')]:
+        weather_fmu.collect_data(start_time, final_time);
+        t_fmu = time_function(lambda: weather_fmu.collect_data(start_time, final_time));
+        t_numpy = time_function(lambda: weather_numpy.collect_data(start_time, final_time));
+        rows.append([period, t_fmu, t_numpy]);
+    print_table('Weather data collection from epw [s]', ['period', 'fmu', 'numpy'], rows);
+
+def benchmark_parquet_load():
+    '''Time the collection of control data from csv and parquet files.
+
+    Collects one week and the whole of one year and ten years of 1-minute 
+    data with ``ControlFromCSV`` and ``ControlFromParquet``.  The parquet 
+    reader skips the row groups outside of the week.
+
+    '''
+
+    tmp_dir = tempfile.mkdtemp();
+    variable_map = {'u{0}'.format(i) : ('u{0}'.format(i), units.unit1) for i in range(4)};
+    rows = [];
+    try:
+        for years in [1, 10]:
+            n = years*525600;
+            df = pd.DataFrame(np.random.rand(n, 8), columns = ['u{0}'.format(i) for i in range(8)]);
+            df.insert(0, 'Time', pd.date_range('1/1/2017', periods = n, freq = 'T'));
+            csv_path = os.path.join(tmp_dir, 'data.csv');
+            parquet_path = os.path.join(tmp_dir, 'data.parquet');
+            df.to_csv(csv_path, index = False);
+            utility._write_parquet(df, parquet_path, row_group_size = 10080);
+            final_time = str(df['Time'].iloc[-1]);
+            for period, start_time, end_time in [('week', '6/1/2017', '6/8/2017'), ('all', '1/1/2017', final_time)]:
+                csv = exodata.ControlFromCSV(csv_path, variable_map);
+                parquet = exodata.ControlFromParquet(parquet_path, variable_map);
+                t_csv = time_function(lambda: csv.collect_data(start_time, end_time), repeat = 1);
+                t_parquet = time_function(lambda: parquet.collect_data(start_time, end_time), repeat = 1);
+                rows.append([years, period, t_csv, t_parquet]);
+    finally:
+        shutil.rmtree(tmp_dir);
+    print_table('Control data collection of 1-minute data [s]', \
+                ['years', 'period', 'csv', 'parquet'], rows);
+
+def benchmark_input_object():
+    '''Time the creation of fmu input objects against the number of inputs.
+
+    Compares the int64 time grid builder of ``utility._FMU`` to assembling 
+    a dataframe of the inputs, adding the simulation time with ``apply`` 
+    and stacking the columns, for one day of 5-minute inputs with staggered
+    time stamps.
+
+    '''
+
+    def assemble(ts_list, start_time, final_time):
+        d = {};
+        for ts in ts_list:
+            d[ts.name] = ts.get_base_data();
+        df = pd.DataFrame(d).interpolate(method = 'linear');
+        t = df.index.to_series();
+        dt = (t - t[0]).apply(lambda x: x / np.timedelta64(1, 's'));
+        dt.name = 'SimTime';
+        input_df = df.join(dt).loc[start_time:final_time];
+        input_trajectory = input_df['SimTime'].values;
+        for header in tuple(df):
+            input_trajectory = np.vstack((input_trajectory, input_df[header].values));
+        return (tuple(df), np.transpose(input_trajectory));
+
+    builder = utility._FMU();
+    builder._global_start_time_utc = pd.Timestamp('1/1/2017', tz = 'UTC');
+    builder.start_time_utc = builder._global_start_time_utc;
+    builder.final_time_utc = pd.Timestamp('1/2/2017', tz = 'UTC');
+    rows = [];
+    for n in [10, 50, 200]:
+        ts_list = [];
+        for i in range(n):
+            index = pd.date_range('1/1/2017', periods = 289, freq = '5T') + pd.Timedelta(seconds = i % 5);
+            ts_list.append(variables.Timeseries('u{0}'.format(i), pd.Series(np.random.rand(289), index = index), units.unit1));
+        t_df = time_function(lambda: assemble(ts_list, builder.start_time_utc, builder.final_time_utc));
+        t_grid = time_function(lambda: builder._create_input_object_from_input_mpcpy_ts_list(ts_list));
+        rows.append([n, t_df, t_grid]);
+    print_table('Input object creation [s]', ['inputs', 'dataframe', 'grid'], rows);
+
+def benchmark_queue_simulation():
+    '''Time the Monte Carlo simulation of a day of occupancy against replicates.
+
+    Compares the batch simulation of all replicates to single simulations
+    post-processed to the time grid one by one.
+
+    '''
+
+    maxtime = 288;
+    lam_vec = np.concatenate((0.01*np.ones(96), 0.5*np.ones(96), 0.05*np.ones(96)));
+    mu_vec = np.concatenate((0.1*np.ones(96), 0.02*np.ones(96), 0.1*np.ones(96)));
+    rows = [];
+    for iter_num in [10, 100, 1000]:
+        t_loop = time_function(lambda: simulate_queue_loop(maxtime, lam_vec, mu_vec, 0, 250, iter_num), repeat = 1);
+        t_batch = time_function(lambda: simulate_queue_batch(maxtime, lam_vec, mu_vec, 0, 250, iter_num));
+        rows.append([iter_num, t_loop, t_batch]);
+    print_table('Queue simulation of a day [s]', ['replicates', 'loop', 'batch'], rows);
+
+
+# Main program
+# ============
+benchmarks = {'unit_conversion' : benchmark_unit_conversion,
+              'unit_lookup' : benchmark_unit_lookup,
+              'fmu_load' : benchmark_fmu_load,
+              'batch_optimization' : benchmark_batch_optimization,
+              'solar_radiation' : benchmark_solar_radiation,
+              'weather_processing' : benchmark_weather_processing,
+              'parquet_load' : benchmark_parquet_load,
+              'input_object' : benchmark_input_object,
+              'queue_simulation' : benchmark_queue_simulation};
+parser = argparse.ArgumentParser(description='Run the performance benchmarks for mpcpy.');
+parser.add_argument('-s', '--specify_benchmark', \
+                    metavar='name', \
+                    choices = sorted(benchmarks.keys()), \
+                    help='run only the benchmark specified');
+args = parser.parse_args();
+if args.specify_benchmark:
+    names = [args.specify_benchmark];
+else:
+    names = sorted(benchmarks.keys());
+for name in names:
+    benchmarks[name]();
@@ -64,6 +64,9 @@ Classes
 
 .. autoclass:: mpcpy.exodata.WeatherFromCSV
     :members: collect_data, display_data, get_base_data, calculate_solar_radiation
+
+.. autoclass:: mpcpy.exodata.WeatherFromParquet
+    :members: collect_data, display_data, get_base_data, calculate_solar_radiation
     
 .. autoclass:: mpcpy.exodata.WeatherFromDF
     :members: collect_data, display_data, get_base_data, calculate_solar_radiation
@@ -71,6 +74,11 @@ Classes
 .. autoclass:: mpcpy.exodata.WeatherFromNOAA
     :members: collect_data, display_data, get_base_data, calculate_solar_radiation
 
+Functions
+=========
+
+.. automethod:: mpcpy.exodata.set_epw_cache
+
 
 ========   
 Internal
@@ -98,6 +106,9 @@ Classes
 
 .. autoclass:: mpcpy.exodata.InternalFromCSV
     :members: collect_data, display_data, get_base_data
+
+.. autoclass:: mpcpy.exodata.InternalFromParquet
+    :members: collect_data, display_data, get_base_data
     
 .. autoclass:: mpcpy.exodata.InternalFromOccupancyModel
     :members: collect_data, display_data, get_base_data
@@ -121,6 +132,9 @@ Classes
 
 .. autoclass:: mpcpy.exodata.ControlFromCSV
     :members: collect_data, display_data, get_base_data
+
+.. autoclass:: mpcpy.exodata.ControlFromParquet
+    :members: collect_data, display_data, get_base_data
     
 .. autoclass:: mpcpy.exodata.ControlFromDF
     :members: collect_data, display_data, get_base_data
@@ -143,6 +157,9 @@ Classes
 
 .. autoclass:: mpcpy.exodata.OtherInputFromCSV
     :members: collect_data, display_data, get_base_data
+
+.. autoclass:: mpcpy.exodata.OtherInputFromParquet
+    :members: collect_data, display_data, get_base_data
     
 .. autoclass:: mpcpy.exodata.OtherInputFromDF
     :members: collect_data, display_data, get_base_data
@@ -175,6 +192,10 @@ Classes
 
 .. autoclass:: mpcpy.exodata.PriceFromCSV
     :members: collect_data, display_data, get_base_data
+
+.. autoclass:: mpcpy.exodata.PriceFromParquet
+    :members: collect_data, display_data, get_base_data
+
 .. autoclass:: mpcpy.exodata.PriceFromDF
     :members: collect_data, display_data, get_base_data
 
@@ -228,6 +249,9 @@ Classes
 
 .. autoclass:: mpcpy.exodata.ConstraintFromCSV
     :members: collect_data, display_data, get_base_data 
+
+.. autoclass:: mpcpy.exodata.ConstraintFromParquet
+    :members: collect_data, display_data, get_base_data 
     
 .. autoclass:: mpcpy.exodata.ConstraintFromDF
     :members: collect_data, display_data, get_base_data 
@@ -263,6 +287,9 @@ Classes
 
 .. autoclass:: mpcpy.exodata.ParameterFromCSV
     :members: collect_data, display_data, get_base_data, set_data, append_data 
+
+.. autoclass:: mpcpy.exodata.ParameterFromParquet
+    :members: collect_data, display_data, get_base_data, set_data, append_data 
     
 .. autoclass:: mpcpy.exodata.ParameterFromDF
     :members: collect_data, display_data, get_base_data, set_data, append_data 
@@ -288,6 +315,9 @@ Classes
 
 .. autoclass:: mpcpy.exodata.EstimatedStateFromCSV
     :members: collect_data, display_data, get_base_data, set_data, append_data 
+
+.. autoclass:: mpcpy.exodata.EstimatedStateFromParquet
+    :members: collect_data, display_data, get_base_data, set_data, append_data 
     
 .. autoclass:: mpcpy.exodata.EstimatedStateFromDF
     :members: collect_data, display_data, get_base_data, set_data, append_data 
@@ -299,14 +329,14 @@ from mpcpy import utility
 import numpy as np
 import pandas as pd
 from tzwhere import tzwhere
-from dateutil.relativedelta import relativedelta
-from pytz import exceptions as pytz_exceptions
 from mpcpy import units
 from mpcpy import variables
 from pvlib.forecast import GFS, NAM, HRRR, RAP
 import datetime
+import calendar
+import hashlib
+import pytz
 import os
-import math
      
 #%% Abstract source interface class
 class _Type(utility._mpcpyPandas):
@@ -316,15 +346,31 @@ class _Type(utility._mpcpyPandas):
 
     __metaclass__ = ABCMeta;
     
-    def collect_data(self, start_time, final_time):
+    def collect_data(self, start_time, final_time, incremental = False, retention = None):
         '''Collect data from specified source and update data attribute.
         
+        In incremental mode, for example for the rolling horizons of mpc, 
+        if the period starts within the last collected period and ends after
+        it, the data already collected and processed is kept and only the 
+        data after the final time of the last collection is collected from 
+        the source and processed.  Data before the start time, or before the
+        retention window if specified, is evicted.  The merged data equals 
+        that of a full collection when the step between periods is a 
+        multiple of the data sample time.
+        
         Parameters
         ----------
         start_time : string
             Start time of data collection.
         final_time : string
             Final time of data collection.
+        incremental : boolean, optional
+            True to collect data incrementally.
+            Default is False.
+        retention : string or timedelta, optional
+            Length of time before the start time for which collected data 
+            is kept in incremental mode, e.g. '1D'.
+            Default is None, which keeps data from the start time.
             
         Yields
         ------
@@ -333,7 +379,68 @@ class _Type(utility._mpcpyPandas):
         
         '''
         
-        self._collect_data(start_time, final_time);
+        if incremental and self._get_incremental_tail(start_time, final_time) is not None:
+            self._collect_data_incremental(start_time, final_time, retention);
+        else:
+            self._collect_data(start_time, final_time);
+        self._collected_period = (self.start_time_utc, self.final_time_utc);
+        
+    def _get_incremental_tail(self, start_time, final_time):
+        '''Get the start of the data to collect in incremental mode.
+        
+        Parameters
+        ----------
+        start_time : string
+            Start time of data collection.
+        final_time : string
+            Final time of data collection.
+            
+        Returns
+        -------
+        tail_start : ``pandas`` Timestamp or None
+            Final time in utc of the last collection if the period starts 
+            within the last collected period, None otherwise.
+        
+        '''
+        
+        period = getattr(self, '_collected_period', None);
+        if period is None or start_time == 'continue':
+            return None
+        start_time_utc = self._localize_time(start_time).tz_convert('UTC');
+        if start_time_utc < period[0] or start_time_utc > period[1]:
+            return None
+            
+        return period[1]
+        
+    def _localize_time(self, time):
+        '''Localize a time to the timezone of the object, as done by ``_set_time_interval``.
+        
+        '''
+        
+        try:
+            return pd.to_datetime(time).tz_localize(getattr(self, 'tz_name', 'UTC'))
+        except TypeError:
+            return time
+        
+    def _collect_data_incremental(self, start_time, final_time, retention):
+        '''Collect the data after the last collection and merge it with the kept data.
+        
+        '''
+        
+        tail_start = self._get_incremental_tail(start_time, final_time);
+        keep_from = self._localize_time(start_time).tz_convert('UTC');
+        if retention is not None:
+            keep_from = keep_from - pd.Timedelta(retention);
+        data_old = _copy_data_structure(self.data);
+        if self._localize_time(final_time).tz_convert('UTC') > tail_start:
+            # Collect and process the new tail only
+            self._collect_data(tail_start.tz_convert(self.tz_name), final_time);
+            self.data = _merge_data(data_old, self.data, keep_from, tail_start);
+        else:
+            # All data is already collected
+            self.data = _merge_data(data_old, data_old, keep_from, tail_start);
+        # Set the time interval of the full period
+        self._set_time_interval(start_time, final_time);
     
     def display_data(self):
         '''Get data in display units as pandas dataframe.
@@ -365,6 +472,60 @@ class _Type(utility._mpcpyPandas):
         
         return df;
                
+# Data dictionary variables needed by each solar radiation method
+_solar_radiation_variables = {'Zhang-Huang' : ['weaSolAlt', 'weaNTot', 'weaRelHum', 'weaWinSpe'],
+                              'Kasten-Czeplak' : ['weaSolAlt', 'weaNTot'],
+                              'Haurwitz' : ['weaSolAlt']};
+
+# Bounds of weather data, see Buildings.BoundaryConditions.WeatherData.ReaderTMY3.
+# Values above 'Max' are set to 'Above_Max' if specified, otherwise to 'Max'.
+_weather_data_bounds = {'weaCelHei' : {'Max' : 20000, 'Above_Max' : 2000},
+                        'weaNOpa' : {'Min' : 0.011, 'Max' : 1.0},
+                        'weaNTot' : {'Min' : 0.011, 'Max' : 1.0},
+                        'weaRelHum' : {'Min' : 0.0, 'Max' : 0.989}};
+
+# Column headers of the timeseries data in epw files
+_epw_header = ['Year', 'Month', 'Day', 'Hour', 'Second', 'Unknown', \
+               'Dry bulb temperature', 'Dew point temperature', \
+               'Relative humidity', 'Atmospheric station pressure', \
+               'Extraterrestrial horizontal radiation', 'Extraterrestrial direct normal radiation', \
+               'Horizontal infrared radiation', 'Global horizontal radiation', \
+               'Direct normal radiation', 'Diffuse horizontal radiation', \
+               'Averaged global horizontal illuminance', 'Direct normal illuminance', \
+               'Diffuse horizontal illuminance', 'Zenith luminance', \
+               'Wind direction', 'Wind speed', \
+               'Total sky cover', 'Opaque sky cover', \
+               'Visibility', 'Ceiling', \
+               'Present weather observation', 'Present weather codes', \
+               'Precipitable water', 'Aerosol optical depth', \
+               'Snow depth', 'Days since last snowfall', \
+               'Albedo', 'Liquid precipitation depth', \
+               'Liquid precipitation quantity'];
+# Epw columns retrieved as (column header, weather variable name, unit)
+_epw_variables = [('Atmospheric station pressure', 'weaPAtm', units.Pa),
+                  ('Dew point temperature', 'weaTDewPoi', units.degC),
+                  ('Dry bulb temperature', 'weaTDryBul', units.degC),
+                  ('Relative humidity', 'weaRelHum', units.percent),
+                  ('Opaque sky cover', 'weaNOpa', units.unit10),
+                  ('Ceiling', 'weaCelHei', units.m),
+                  ('Total sky cover', 'weaNTot', units.unit10),
+                  ('Wind speed', 'weaWinSpe', units.m_s),
+                  ('Wind direction', 'weaWinDir', units.deg),
+                  ('Horizontal infrared radiation', 'weaHHorIR', units.W_m2),
+                  ('Direct normal radiation', 'weaHDirNor', units.W_m2),
+                  ('Global horizontal radiation', 'weaHGloHor', units.W_m2),
+                  ('Diffuse horizontal radiation', 'weaHDifHor', units.W_m2),
+                  ('Averaged global horizontal illuminance', 'weaIAveHor', units.lx),
+                  ('Direct normal illuminance', 'weaIDirNor', units.lx),
+                  ('Diffuse horizontal illuminance', 'weaIDifHor', units.lx),
+                  ('Zenith luminance', 'weaZLum', units.cd_m2)];
+# Parsed epw data by hash of cache version, file content, time zone, and year
+_epw_cache = {};
+# Directory of the on-disk cache of parsed epw data, None if disabled
+_epw_cache_dir = None;
+# Version of the cached epw data format, part of the cache key
+_epw_cache_version = 1;
+
 #%% Source implementations
 
 ## Weather       
@@ -402,27 +563,6 @@ class _Weather(_Type, utility._FMU):
                                                                  cleaning_type = self._cleaning_type, \
                                                                  cleaning_args = self._cleaning_args);
                                                                  
-    def _checkCelHei(self):
-        '''Check and convert ceiling height data.
-        
-        See Buildings.BoundaryConditions.WeatherData.ReaderTMY3.
-        
-        '''
-        
-        var = self.data['weaCelHei'];
-        ts_in = var.get_base_data();
-        M_in = ts_in.get_values();     
-        M_out = [];
-        for data_point in M_in:
-            if data_point > 20000:
-                M_out.append(2000);
-            else:
-                M_out.append(data_point);
-        ts_out = pd.Series(data = M_out, index = ts_in.index);
-        var.set_display_unit(var.get_base_unit());
-        var.set_data(ts_out);
-        self.data['weaCelHei'] = var;
-        
     def _checkPAtm(self):
         '''Check and convert atmospheric pressure data.
         
@@ -439,84 +579,67 @@ class _Weather(_Type, utility._FMU):
         var.set_data(ts);
         self.data['weaPAtm'] = var;
         
-    def _checkNOpa(self):
-        '''Check and convert opaque sky data.
-        
-        See Buildings.BoundaryConditions.WeatherData.ReaderTMY3.
-        
-        '''
-        
-        var = self.data['weaNOpa'];
-        ts_in = var.get_base_data();
-        M_in = ts_in.get_values();     
-        M_out = [];
-        M_max = 1.0;
-        M_min = 0.011;
-        for data_point in M_in:
-            if data_point > M_max:
-                M_out.append(M_max);
-            elif data_point < M_min:
-                M_out.append(M_min);
-            else:
-                M_out.append(data_point);
-        ts_out = pd.Series(data = M_out, index = ts_in.index);
-        var.set_display_unit(var.get_base_unit());
-        var.set_data(ts_out);                  
-        self.data['weaNOpa'] = var;
-        
-    def _checkNTot(self):
-        '''Check and convert total sky coverage data.
-        
-        See Buildings.BoundaryConditions.WeatherData.ReaderTMY3.
-        
-        '''
-        
-        var = self.data['weaNTot'];
-        ts_in = var.get_base_data();
-        M_in = ts_in.get_values();  
-        M_out = [];
-        M_max = 1.0;
-        M_min = 0.011;
-        for data_point in M_in:
-            if data_point > M_max:
-                M_out.append(M_max);
-            elif data_point < M_min:
-                M_out.append(M_min);
-            else:
-                M_out.append(data_point);
-        ts_out = pd.Series(data = M_out, index = ts_in.index);
-        var.set_display_unit(var.get_base_unit());
-        var.set_data(ts_out);   
-        self.data['weaNTot'] = var;
-        
-    def _checkRelHum(self):
-        '''Check and convert relative humidity data.
+    def _check_weather_data(self):
+        '''Check and clip weather data to the bounds of the weather reader.
+        
+        See Buildings.BoundaryConditions.WeatherData.ReaderTMY3.  All 
+        variables in ``_weather_data_bounds`` are checked at once and set to 
+        their base units.  The number of clipped points of each variable is 
+        stored in the ``clip_counts`` attribute.
+        
+        '''
+        
+        keys = [key for key in sorted(_weather_data_bounds.keys()) if key in self.data];
+        self.clip_counts = {};
+        if not keys:
+            return
+        df = pd.concat([self.data[key].get_base_data() for key in keys], axis = 1, keys = keys);
+        M_in = df.values;
+        M_min = np.array([_weather_data_bounds[key].get('Min', -np.inf) for key in keys]);
+        M_max = np.array([_weather_data_bounds[key].get('Max', np.inf) for key in keys]);
+        M_above = np.array([_weather_data_bounds[key].get('Above_Max', M_max[i]) for i, key in enumerate(keys)]);
+        with np.errstate(invalid='ignore'):
+            below = M_in < M_min;
+            above = M_in > M_max;
+        M_out = np.where(above, M_above, np.where(below, M_min, M_in));
+        counts = below.sum(axis = 0) + above.sum(axis = 0);
+        for i, key in enumerate(keys):
+            var = self.data[key];
+            ts_in = var.get_base_data();
+            ts_out = pd.Series(data = M_out[:,i], index = df.index, name = ts_in.name);
+            if not ts_out.index.equals(ts_in.index):
+                ts_out = ts_out.reindex(ts_in.index);
+            # Data is already in base units, so set it without conversion
+            var.set_display_unit(var.get_base_unit());
+            var._set_base_data(ts_out);
+            self.clip_counts[key] = int(counts[i]);
+        
+    def _set_process_method(self, process_method):
+        '''Set the method used to calculate the processed weather variables.
         
-        See Buildings.BoundaryConditions.WeatherData.ReaderTMY3.
+        Parameters
+        ----------
+        process_method : string
+            'fmu' to simulate the weather processor fmu or 'numpy' to use the
+            native implementation of the same calculations.
         
         '''
         
-        var = self.data['weaRelHum'];
-        ts_in = var.get_base_data();
-        M_in = ts_in.get_values();
-        M_out = [];
-        M_max = 0.989;
-        M_min = 0.0;
-        for data_point in M_in:
-            if data_point > M_max:
-                M_out.append(M_max);
-            elif data_point < M_min:
-                M_out.append(M_min);
-            else:
-                M_out.append(data_point);
-        ts_out = pd.Series(data = M_out, index = ts_in.index);
-        var.set_display_unit(var.get_base_unit());
-        var.set_data(ts_out); 
-        self.data['weaRelHum'] = var;
+        if process_method not in ['fmu', 'numpy']:
+            raise NameError('The process method {0} is not supported.'.format(process_method));
+        self.process_method = process_method;
+        if self.process_method == 'fmu':
+            # Set file_path for process fmu
+            weatherdir = utility.get_MPCPy_path() + os.sep + 'resources' + os.sep + 'weather';
+            fmuname = 'WeatherProcessor_JModelica_v2.fmu';
+            self._create_fmu({'fmupath': weatherdir+os.sep+fmuname});
         
     def _process_weather_data(self):
         '''Use process weather fmu to calculate other necessary weather data.
         
+        If the process method is 'numpy', the fmu is not simulated and the 
+        same calculations are made by ``_simulate_weather_processor``.
+        
         '''
         
         # Set parameters for fmu
@@ -536,12 +659,78 @@ class _Weather(_Type, utility._FMU):
         for key in self.process_variables:
             self.measurements[key] = {};
             self.measurements[key]['Sample'] = variables.Static(key+'_Sample', 3600, units.s);
-        # Simulate the fmu
-        self._save_parameter_input_data = False
-        self._simulate_fmu();
+        # Simulate the fmu or its native implementation
+        if self.process_method == 'numpy':
+            self._simulate_weather_processor();
+        else:
+            self._save_parameter_input_data = False
+            self._simulate_fmu();
         # Add process var data 
         for key in self.process_variables:
             self.data[key] = self.measurements[key]['Simulated'];
+            
+    def _simulate_weather_processor(self):
+        '''Calculate the outputs of the weather processor fmu with numpy.
+        
+        Implements the equations of the fmu, which are those of 
+        Buildings.BoundaryConditions.WeatherData.ReaderTMY3 for the black 
+        sky and wet bulb temperatures, diffuse horizontal irradiation, clock
+        and solar time, and solar zenith angle.  The inputs are linearly 
+        interpolated to the output times of the fmu simulation, as done by 
+        ``pyfmi``.  The outputs match the fmu within 0.05 K for temperatures,
+        0.5 W/m^2 for irradiation, 1e-3 rad for angles, and 1 s for times.
+        
+        Yields
+        ------
+        measurements : dictionary
+            The 'Simulated' key of each process variable is set, as by 
+            ``_simulate_fmu``.
+        
+        '''
+        
+        # Get inputs at output times
+        self._create_input_mpcpy_ts_list_sim();
+        df = self._mpcpy_ts_list_to_dataframe(self._input_mpcpy_ts_list);
+        time = np.linspace(0, self.elapsed_seconds, max(self._get_simulation_ncp(), 1) + 1);
+        time_in = (df.index.asi8 - self.start_time_utc.value)/1e9;
+        inputs = dict((key, np.interp(time, time_in, df[key].values)) for key in df.columns);
+        lat = self.parameter_data['lat']['Value'].get_base_data();
+        lon = self.parameter_data['lon']['Value'].get_base_data();
+        timZon = self.parameter_data['timZon']['Value'].get_base_data();
+        modTimOffset = self.parameter_data['modTimOffset']['Value'].get_base_data();
+        # Check inputs
+        relHum = _smooth_limit(inputs['weaRelHum'], 0.01, 0.99, 0.001);
+        nOpa = _smooth_limit(inputs['weaNOpa'], 0.01, 9.99, 0.001);
+        TDryBul = inputs['weaTDryBul'];
+        TDewPoi = inputs['weaTDewPoi'];
+        # Time
+        cloTim = time + modTimOffset;
+        Bt = np.pi*((cloTim + 86400)/86400 - 81)/182;
+        eqnTim = 60*(9.87*np.sin(2*Bt) - 7.53*np.cos(Bt) - 1.5*np.sin(Bt));
+        locTim = cloTim - timZon + lon*43200/np.pi;
+        solTim = locTim + eqnTim;
+        # Solar geometry
+        decAng = np.arcsin(-np.sin(23.45*2*np.pi/360)*np.cos((cloTim/86400 + 10)*2*np.pi/365.25));
+        solHouAng = (solTim/3600 - 12)*2*np.pi/24;
+        solZen = np.arccos(np.cos(lat)*np.cos(decAng)*np.cos(solHouAng) + np.sin(lat)*np.sin(decAng));
+        # Irradiation
+        HDifHor = np.maximum(inputs['weaHGloHor'] - inputs['weaHDirNor']*np.cos(solZen), 1e-4);
+        # Black sky temperature from temperatures and sky cover
+        TDewPoiK = -_smooth_max(-TDewPoi, -TDryBul, 0.1);
+        nOpa10 = 10*nOpa;
+        epsSky = (0.787 + 0.764*np.log(TDewPoiK/273.15))*(1 + 0.0224*nOpa10 - 0.0035*nOpa10**2 + 0.00028*nOpa10**3);
+        TBlaSky = TDryBul*epsSky**0.25;
+        # Wet bulb temperature
+        TWetBul = _wet_bulb_temperature(TDryBul, relHum, inputs['weaPAtm']);
+        # Set outputs
+        outputs = {'weaTBlaSky' : TBlaSky, 'weaTWetBul' : TWetBul, 'weaHDifHor' : HDifHor, \
+                   'weaCloTim' : cloTim, 'weaSolTim' : solTim, 'weaSolZen' : solZen};
+        timeindex = self.start_time_utc + pd.to_timedelta(time, 's');
+        for key in self.measurements.keys():
+            ts = pd.Series(data = outputs[key], index = timeindex);
+            ts.name = key;
+            # The fmu outputs do not define units
+            self.measurements[key]['Simulated'] = variables.Timeseries(key, ts, units.unit1);
 
     def _create_input_mpcpy_ts_list_sim(self):
         '''Create the input list to the weather processing FMU.
@@ -561,10 +750,25 @@ class _Weather(_Type, utility._FMU):
         
         This function adds the 'weaHGloHor' variable to the data dictionary in W/m^2.
         
-        The available method is the 'Zhang-Huang': Zhang-Huang Solar Model.
-        Reference to the ZH model: https://www.energyplus.net/sites/default/files/docs/site_v8.3.0/EngineeringReference/05-Climate/index.html#zhang-huang-solar-model
-        Original paper: https://pdfs.semanticscholar.org/7b8e/7ea72db78f99939ce2d7c2890dacfcb0dc5a.pdf
-        For this method, the data dictionary variables needed to calculate the solar radiation are:
+        The available methods are:
+        
+        - 'Zhang-Huang': Zhang-Huang Solar Model.
+          Reference to the ZH model: https://www.energyplus.net/sites/default/files/docs/site_v8.3.0/EngineeringReference/05-Climate/index.html#zhang-huang-solar-model
+          Original paper: https://pdfs.semanticscholar.org/7b8e/7ea72db78f99939ce2d7c2890dacfcb0dc5a.pdf
+          The data dictionary variables needed are weaSolAlt, weaNTot, 
+          weaRelHum, and weaWinSpe.
+        - 'Kasten-Czeplak': Clear sky irradiation of Kasten and Czeplak 
+          reduced by cloud cover.
+          Kasten, F. and Czeplak, G. (1980). "Solar and terrestrial radiation
+          dependent on the amount and type of cloud." Solar Energy 24(2), 
+          177-189.
+          The data dictionary variables needed are weaSolAlt and weaNTot.
+        - 'Haurwitz': Clear sky irradiation model of Haurwitz.
+          Haurwitz, B. (1945). "Insolation in relation to cloudiness and 
+          cloud density." Journal of Meteorology 2, 154-166.
+          The data dictionary variable needed is weaSolAlt.
+        
+        where the variables are:
         
         - weaSolAlt : solar altitude angle
         - weaNTot : cloud cover
@@ -577,7 +781,7 @@ class _Weather(_Type, utility._FMU):
         ----------
         method : str, optional
             Method of calculating the solar irradiation.  
-            Only one option exists, 'Zhang-Huang'.
+            'Zhang-Huang', 'Kasten-Czeplak', or 'Haurwitz'.
             Default is 'Zhang-Huang'.
         
         Returns
@@ -586,41 +790,48 @@ class _Weather(_Type, utility._FMU):
 
         '''
 
-        if method == 'Zhang-Huang':
-            if 'weaSolAlt' not in self.data.keys():
-                raise KeyError('weaSolAlt is not available, therefore solar radiation cannot be calculated')
-            elif 'weaNTot' not in self.data.keys():
-                raise KeyError('weaNTot is not available, therefore solar radiation cannot be calculated')
-            elif 'weaRelHum' not in self.data.keys():
-                raise KeyError('weaRelHum is not available, therefore solar radiation cannot be calculated')
-            elif 'weaWinSpe' not in self.data.keys():
-                raise KeyError('weaWinSpe is not available, therefore solar radiation cannot be calculated')
-            else:                
-                # Set constants
-                I_0 = 1355
-                c_0 = 0.5598
-                c_1 = 0.4982
-                c_2 = -0.6762
-                c_3 = 0 # 0.02842 in the paper, not used in this model
-                c_4 = -0.00317
-                c_5 = 0.014
-                d   = -17.853
-                k   = 0.843
-                # Calculate ghi
-                # weaSolAlt : solar altitude angle, in radians.  Already base units.
-                # weaNTot : cloud cover, in tenths. Base units are 1, so we divide by 10. 
-                # weaRelHum : relative humidity, in %.  Already base units.
-                # weaWinSpe : wind speed, in m/s.  Already base units.
-                weaHGloHor_np = np.zeros(len(self.get_base_data()))
-                for i in range(len(self.get_base_data())):
-                    weaHGloHor_np[i] = max((I_0*math.sin(self.get_base_data()['weaSolAlt'][i])*(c_0+c_1*(self.get_base_data()['weaNTot'][i]/10)+\
-                    c_2*(self.get_base_data()['weaNTot'][i]/10)**2+c_4*self.get_base_data()['weaRelHum'][i]+c_5*self.get_base_data()['weaWinSpe'][i])+d)/k,0)
-                # Make pandas series
-                weaHGloHor_ts = pd.Series(data=weaHGloHor_np, index=self.get_base_data().index)
-                # Assign to data dictionary
-                self.data['weaHGloHor'] = variables.Timeseries('weaHGloHor', weaHGloHor_ts, units.W_m2)
-        else:
+        if method not in _solar_radiation_variables:
             raise NameError("The method is not supported")
+        for key in _solar_radiation_variables[method]:
+            if key not in self.data.keys():
+                raise KeyError('{0} is not available, therefore solar radiation cannot be calculated'.format(key))
+        # Get aligned variables in base units
+        # weaSolAlt : solar altitude angle, in radians.  Already base units.
+        # weaNTot : cloud cover, in tenths. Base units are 1, so we divide by 10. 
+        # weaRelHum : relative humidity, in %.  Already base units.
+        # weaWinSpe : wind speed, in m/s.  Already base units.
+        df = self.get_base_data();
+        alt = df['weaSolAlt'].values;
+        if method == 'Zhang-Huang':
+            # Set constants
+            I_0 = 1355
+            c_0 = 0.5598
+            c_1 = 0.4982
+            c_2 = -0.6762
+            c_3 = 0 # 0.02842 in the paper, not used in this model
+            c_4 = -0.00317
+            c_5 = 0.014
+            d   = -17.853
+            k   = 0.843
+            # Calculate ghi
+            N = df['weaNTot'].values/10;
+            weaHGloHor_np = (I_0*np.sin(alt)*(c_0+c_1*N+c_2*N**2+c_4*df['weaRelHum'].values+c_5*df['weaWinSpe'].values)+d)/k;
+        elif method == 'Kasten-Czeplak':
+            # Clear sky ghi reduced by cloud cover fraction
+            N = df['weaNTot'].values/10;
+            weaHGloHor_np = (910*np.sin(alt)-30)*(1-0.75*N**3.4);
+        elif method == 'Haurwitz':
+            # Clear sky ghi from cosine of zenith angle
+            cos_zen = np.sin(alt);
+            with np.errstate(divide='ignore', invalid='ignore'):
+                weaHGloHor_np = np.where(cos_zen > 0, 1098*cos_zen*np.exp(-0.057/cos_zen), 0);
+        # No irradiation when sun is below horizon
+        with np.errstate(invalid='ignore'):
+            weaHGloHor_np = np.where(np.isnan(weaHGloHor_np), weaHGloHor_np, np.maximum(weaHGloHor_np, 0));
+        # Make pandas series
+        weaHGloHor_ts = pd.Series(data=weaHGloHor_np, index=df.index)
+        # Assign to data dictionary
+        self.data['weaHGloHor'] = variables.Timeseries('weaHGloHor', weaHGloHor_ts, units.W_m2)
 
         return None
 
@@ -1084,6 +1295,12 @@ class WeatherFromEPW(_Weather):
         False to localize data timestamps to EPW file location.
         True to treat data timestamps in standard time.
         Default is False.
+    process_method : string, optional
+        'fmu' to calculate the processed weather variables by simulating 
+        the weather processor fmu, or 'numpy' to use the native 
+        implementation, which matches the fmu within a small tolerance and 
+        does not load or simulate the fmu.
+        Default is 'fmu'.
 
     Attributes
     ----------
@@ -1097,10 +1314,13 @@ class WeatherFromEPW(_Weather):
         Timezone name.
     file_path : string
         Path of epw file.
+    clip_counts : dictionary
+        {"Weather Variable Name" : int} number of points clipped to the 
+        bounds of the weather reader in the last data collection.
        
     '''
 
-    def __init__(self, epw_file_path, standard_time = False):
+    def __init__(self, epw_file_path, standard_time = False, process_method = 'fmu'):
         '''Constructor of epw weather exodata object.
 
         '''
@@ -1116,10 +1336,8 @@ class WeatherFromEPW(_Weather):
             self.tz = tzwhere.tzwhere();
             self.tz_name = self.tz.tzNameAt(self.lat.display_data(), self.lon.display_data());        
         self.data = {};
-        # Set file_path for process fmu
-        weatherdir = utility.get_MPCPy_path() + os.sep + 'resources' + os.sep + 'weather';
-        fmuname = 'WeatherProcessor_JModelica_v2.fmu';
-        self._create_fmu({'fmupath': weatherdir+os.sep+fmuname});
+        # Set process method
+        self._set_process_method(process_method);
         # Define process variables
         self.process_variables = ['weaTBlaSky', \
                                   'weaTWetBul', \
@@ -1155,124 +1373,19 @@ class WeatherFromEPW(_Weather):
     def _read_timeseries_from_epw(self):
         '''Get timeseries data from epw file.
         
+        The parsed and localized data of the year of the start time is 
+        cached by file content and time zone, so that collecting data for 
+        successive horizons only slices the cached data.
+        
         '''
         
-        # Define column headers to read in from epw
-        header = ['Year', 'Month', 'Day', 'Hour', 'Second', 'Unknown', \
-                  'Dry bulb temperature', 'Dew point temperature', \
-                  'Relative humidity', 'Atmospheric station pressure', \
-                  'Extraterrestrial horizontal radiation', 'Extraterrestrial direct normal radiation', \
-                  'Horizontal infrared radiation', 'Global horizontal radiation', \
-                  'Direct normal radiation', 'Diffuse horizontal radiation', \
-                  'Averaged global horizontal illuminance', 'Direct normal illuminance', \
-                  'Diffuse horizontal illuminance', 'Zenith luminance', \
-                  'Wind direction', 'Wind speed', \
-                  'Total sky cover', 'Opaque sky cover', \
-                  'Visibility', 'Ceiling', \
-                  'Present weather observation', 'Present weather codes', \
-                  'Precipitable water', 'Aerosol optical depth', \
-                  'Snow depth', 'Days since last snowfall', \
-                  'Albedo', 'Liquid precipitation depth', \
-                  'Liquid precipitation quantity'];
-        # Read in data
-        df_epw = pd.read_csv(self.file_path, skiprows = 8, header = None, names=header);
-        # Convert time columns to timestamp and set as index                           
-        df_epw['Hour'] = df_epw['Hour'] - 1;
-        
-        df_epw['Time'] = str(self.start_time.year) + ' ' + df_epw['Month'].apply(str) + ' ' + df_epw['Day'].apply(str) + ' ' + df_epw['Hour'].apply(str) + ':00';
-        time = pd.to_datetime(df_epw['Time'], format= '%Y %m %d %H:%M');
-        df_epw.set_index(time, inplace=True);
-        # Remove unneeded columns
-        df_epw = df_epw.drop(['Time', 'Year', 'Month', 'Day', 'Hour', 'Second', 'Unknown'], axis = 1);
-        #  Perform data swap for epw (see Buildings.BoundaryConditions.WeatherData.ReaderTMY3 info)  
-        df_epw_last_row = df_epw.head(1);
-        df_epw = df_epw_last_row.append(df_epw.iloc[:-1], ignore_index=False);
-        new_index = df_epw.index[0:1].append(df_epw.index[1:] + pd.DateOffset(hours=1));
-        df_epw.set_index(new_index, inplace=True);
-        df_epw.index.name = 'Time';
-        # Treat daylight savings time
-        if self.standard_time:
-            df_epw = df_epw.tz_localize(self.tz_name);
-        else:
-            try:
-                df_epw = df_epw.tz_localize(self.tz_name);
-            except pytz_exceptions.NonExistentTimeError as time_nonexist:
-                time_nonexist = pd.to_datetime(time_nonexist.args[0])
-                if time_nonexist.month == 3:
-                    df_epw_st = df_epw[df_epw.index < time_nonexist];
-                    df_epw_dst = df_epw[df_epw.index >= time_nonexist];
-                    df_epw_dst = df_epw_dst.shift(periods = 1, freq = 'H');
-                    df_epw = pd.concat([df_epw_st, df_epw_dst], axis = 0);
-            try:
-                df_epw = df_epw.tz_localize(self.tz_name);
-            except pytz_exceptions.AmbiguousTimeError as time_ambiguous:
-                time_ambiguous = pd.to_datetime(time_ambiguous.args[0].split("'")[1])
-                if time_ambiguous.month == 11:
-                    df_epw_dst = df_epw[df_epw.index < time_ambiguous].tz_localize(self.tz_name);
-                    df_epw_st = df_epw[(df_epw.index > time_ambiguous + relativedelta(hours = 1))].shift(periods = -1, freq = 'H').tz_localize(self.tz_name);
-                    df_epw_amb = df_epw[(df_epw.index >= time_ambiguous) & (df_epw.index <= time_ambiguous + relativedelta(hours = 1))];
-                    df_epw_amb_0 = df_epw_amb.iloc[0:1].tz_localize(self.tz_name, ambiguous = np.array([True]));
-                    df_epw_amb_1 = df_epw_amb.iloc[1:2].shift(periods = -1, freq = 'H').tz_localize(self.tz_name, ambiguous = np.array([False]));
-                    df_epw = pd.concat([df_epw_dst, df_epw_amb_0, df_epw_amb_1, df_epw_st], axis = 0);
+        df_epw = self._load_epw_data(self.start_time.year);
         #  Retrieve data (not all is retrieved)
-        for key in header:
-            # Convert to mpcpy standard
-            if key == 'Atmospheric station pressure':
-                varname = 'weaPAtm';
-                self.data[varname] = self._dataframe_to_mpcpy_ts_variable(df_epw, key, varname, units.Pa, start_time = self.start_time, final_time = self.final_time);
-                self._checkPAtm();
-            elif key == 'Dew point temperature':
-                varname = 'weaTDewPoi';
-                self.data[varname] = self._dataframe_to_mpcpy_ts_variable(df_epw, key, varname, units.degC, start_time = self.start_time, final_time = self.final_time);
-            elif key == 'Dry bulb temperature':
-                varname = 'weaTDryBul';
-                self.data[varname] = self._dataframe_to_mpcpy_ts_variable(df_epw, key, varname, units.degC, start_time = self.start_time, final_time = self.final_time);
-            elif key == 'Relative humidity':
-                varname = 'weaRelHum';
-                self.data[varname] = self._dataframe_to_mpcpy_ts_variable(df_epw, key, varname, units.percent, start_time = self.start_time, final_time = self.final_time);                
-                self._checkRelHum();
-            elif key == 'Opaque sky cover':
-                varname = 'weaNOpa';
-                self.data[varname] = self._dataframe_to_mpcpy_ts_variable(df_epw, key, varname, units.unit10, start_time = self.start_time, final_time = self.final_time);                
-                self._checkNOpa();
-            elif key == 'Ceiling':
-                varname = 'weaCelHei';
-                self.data[varname] = self._dataframe_to_mpcpy_ts_variable(df_epw, key, varname, units.m, start_time = self.start_time, final_time = self.final_time);                
-                self._checkCelHei();
-            elif key == 'Total sky cover':
-                varname = 'weaNTot';
-                self.data[varname] = self._dataframe_to_mpcpy_ts_variable(df_epw, key, varname, units.unit10, start_time = self.start_time, final_time = self.final_time);                 
-                self._checkNTot();
-            elif key == 'Wind speed':
-                varname = 'weaWinSpe';
-                self.data[varname] = self._dataframe_to_mpcpy_ts_variable(df_epw, key, varname, units.m_s, start_time = self.start_time, final_time = self.final_time);
-            elif key == 'Wind direction':
-                varname = 'weaWinDir';
-                self.data[varname] = self._dataframe_to_mpcpy_ts_variable(df_epw, key, varname, units.deg, start_time = self.start_time, final_time = self.final_time);
-            elif key == 'Horizontal infrared radiation':
-                varname = 'weaHHorIR';
-                self.data[varname] = self._dataframe_to_mpcpy_ts_variable(df_epw, key, varname, units.W_m2, start_time = self.start_time, final_time = self.final_time);
-            elif key == 'Direct normal radiation':
-                varname = 'weaHDirNor';
-                self.data[varname] = self._dataframe_to_mpcpy_ts_variable(df_epw, key, varname, units.W_m2, start_time = self.start_time, final_time = self.final_time); 
-            elif key == 'Global horizontal radiation':
-                varname = 'weaHGloHor';
-                self.data[varname] = self._dataframe_to_mpcpy_ts_variable(df_epw, key, varname, units.W_m2, start_time = self.start_time, final_time = self.final_time);
-            elif key == 'Diffuse horizontal radiation':
-                varname = 'weaHDifHor';
-                self.data[varname] = self._dataframe_to_mpcpy_ts_variable(df_epw, key, varname, units.W_m2, start_time = self.start_time, final_time = self.final_time);
-            elif key == 'Averaged global horizontal illuminance':
-                varname = 'weaIAveHor';
-                self.data[varname] = self._dataframe_to_mpcpy_ts_variable(df_epw, key, varname, units.lx, start_time = self.start_time, final_time = self.final_time);
-            elif key == 'Direct normal illuminance':
-                varname = 'weaIDirNor';
-                self.data[varname] = self._dataframe_to_mpcpy_ts_variable(df_epw, key, varname, units.lx, start_time = self.start_time, final_time = self.final_time);
-            elif key == 'Diffuse horizontal illuminance':
-                varname = 'weaIDifHor';
-                self.data[varname] = self._dataframe_to_mpcpy_ts_variable(df_epw, key, varname, units.lx, start_time = self.start_time, final_time = self.final_time);
-            elif key == 'Zenith luminance':
-                varname = 'weaZLum';
-                self.data[varname] = self._dataframe_to_mpcpy_ts_variable(df_epw, key, varname, units.cd_m2, start_time = self.start_time, final_time = self.final_time);          
+        for key, varname, unit in _epw_variables:
+            self.data[varname] = self._dataframe_to_mpcpy_ts_variable(df_epw, key, varname, unit, start_time = self.start_time, final_time = self.final_time);
+        self._checkPAtm();
+        # Check and clip data to bounds
+        self._check_weather_data();
         # Time shift the solar data back 30 minutes by linear interpolation (see Buildings.BoundaryConditions.WeatherData.ReaderTMY3 info)
         for key in self.data.keys():
             if key in ['weaHHorIR', 'weaHGloHor', 'weaHDirNor', 'weaHDifHor', \
@@ -1284,6 +1397,87 @@ class WeatherFromEPW(_Weather):
                 ts = ts.ix[1:].append(ts_old.tail(n=1));
                 self.data[key].set_data(ts);
                      
+    def _load_epw_data(self, year):
+        '''Get the parsed and localized data of the epw file for a year.
+        
+        The data is looked up in memory, then in the on-disk cache set by
+        ``set_epw_cache``, and is parsed from the file otherwise.
+        
+        Parameters
+        ----------
+        year : int
+            Year to assign to the epw data.
+            
+        Returns
+        -------
+        df_epw : ``pandas`` DataFrame
+            Data of the retrieved epw columns with a localized time index.
+            The cached DataFrame is returned, so it should not be modified.
+        
+        '''
+        
+        key = hashlib.sha1('{0} {1} {2} {3}'.format(_epw_cache_version, \
+                                                    utility._hash_file(self.file_path), \
+                                                    self.tz_name, year)).hexdigest();
+        if key in _epw_cache:
+            return _epw_cache[key]
+        if _epw_cache_dir is not None:
+            cache_path = os.path.join(_epw_cache_dir, 'epw_{0}.npz'.format(key));
+            if os.path.exists(cache_path):
+                df_epw = _read_epw_cache_file(cache_path, self.tz_name);
+            else:
+                df_epw = self._parse_epw(year);
+                _write_epw_cache_file(cache_path, df_epw);
+        else:
+            df_epw = self._parse_epw(year);
+        _epw_cache[key] = df_epw;
+        
+        return df_epw
+        
+    def _parse_epw(self, year):
+        '''Parse the timeseries data of the epw file.
+        
+        The time index is built arithmetically from the month, day, and hour
+        columns.  Unless standard time is used, the epw timestamps, which are
+        in standard time, are localized with the standard offset of the time 
+        zone and converted to the time zone, which treats daylight savings 
+        time.
+        
+        Parameters
+        ----------
+        year : int
+            Year to assign to the epw data.
+            
+        Returns
+        -------
+        df_epw : ``pandas`` DataFrame
+            Data of the retrieved epw columns with a localized time index.
+        
+        '''
+        
+        # Read in data
+        df_epw = pd.read_csv(self.file_path, skiprows = 8, header = None, names = _epw_header);
+        # Build time index from the start of the year
+        month_lengths = [calendar.monthrange(year, month)[1] for month in range(1,13)];
+        month_starts = np.cumsum([0] + month_lengths[:-1]);
+        hours = (month_starts[df_epw['Month'].values - 1] + df_epw['Day'].values - 1)*24 + df_epw['Hour'].values - 1;
+        time = np.datetime64('{0}-01-01T00:00'.format(year), 'ns') + hours.astype('timedelta64[h]');
+        #  Perform data swap for epw (see Buildings.BoundaryConditions.WeatherData.ReaderTMY3 info)  
+        time = np.concatenate([time[0:1], time[:-1] + np.timedelta64(1, 'h')]);
+        df_epw = df_epw[[column for column, varname, unit in _epw_variables]];
+        df_epw = pd.DataFrame(dict((column, np.concatenate([df_epw[column].values[0:1], df_epw[column].values[:-1]])) for column in df_epw.columns), \
+                              index = pd.DatetimeIndex(time, name = 'Time'), columns = df_epw.columns);
+        # Treat daylight savings time
+        if self.standard_time:
+            df_epw = df_epw.tz_localize(self.tz_name);
+        else:
+            dt = pytz.timezone(self.tz_name).localize(datetime.datetime(year, 1, 1));
+            offset = dt.utcoffset() - dt.dst();
+            df_epw.index = (df_epw.index - offset).tz_localize('UTC').tz_convert(self.tz_name);
+            df_epw.index.name = 'Time';
+            
+        return df_epw
+
 class WeatherFromCSV(_Weather, utility._DAQ):
     '''Collects weather data from a csv file.
 
@@ -1295,6 +1489,13 @@ class WeatherFromCSV(_Weather, utility._DAQ):
         {"Column Header Name" : ("Weather Variable Name", mpcpy.Units.unit)}.
     geography : [numeric, numeric]
         List of [Latitude, Longitude] in degrees.
+    process_variables : list, optional
+        List of processed weather variable names to calculate from the 
+        collected data, see ``WeatherFromEPW``.
+    process_method : string, optional
+        'fmu' or 'numpy' to calculate the process variables, see 
+        ``WeatherFromEPW``.
+        Default is 'fmu'.
 
     Attributes
     ----------
@@ -1324,10 +1525,11 @@ class WeatherFromCSV(_Weather, utility._DAQ):
         self.geography = geography;
         # Process Variables
         if 'process_variables' in kwargs:
-            # Set file_path for process fmu
-            weatherdir = utility.get_MPCPy_path() + os.sep + 'resources' + os.sep + 'weather';
-            fmuname = 'WeatherProcessor_JModelica_v2.fmu';
-            self._create_fmu({'fmupath': weatherdir+os.sep+fmuname});
+            # Set process method
+            if 'process_method' in kwargs:
+                self._set_process_method(kwargs['process_method']);
+            else:
+                self._set_process_method('fmu');
             # Set process variables
             self.process_variables = kwargs['process_variables'];
         else:
@@ -1350,6 +1552,81 @@ class WeatherFromCSV(_Weather, utility._DAQ):
         if self.process_variables is not None:
             self._process_weather_data();
             
+class WeatherFromParquet(_Weather, utility._DAQ):
+    '''Collects weather data from a parquet file.
+
+    Parameters
+    ----------
+    parquet_file_path : string
+        Path of parquet file.  The time column, or named index, must 
+        contain time stamps without time zone.
+    variable_map : dictionary
+        {"Column Header Name" : ("Weather Variable Name", mpcpy.Units.unit)}.
+    geography : [numeric, numeric]
+        List of [Latitude, Longitude] in degrees.
+    process_variables : list, optional
+        List of processed weather variable names to calculate from the 
+        collected data, see ``WeatherFromEPW``.
+    process_method : string, optional
+        'fmu' or 'numpy' to calculate the process variables, see 
+        ``WeatherFromEPW``.
+        Default is 'fmu'.
+
+    Attributes
+    ----------
+    data : dictionary
+        {"Weather Variable Name" : mpcpy.Variables.Timeseries}.
+    lat : mpcpy.variables.Static
+        Latitude in degrees.
+    lon : mpcpy.variables.Static
+        Longitude in degrees.
+    tz_name : string
+        Timezone name.
+    file_path : string
+        Path of parquet file.        
+
+    '''
+    
+    def __init__(self, parquet_file_path, variable_map, geography, **kwargs):
+        '''Constructor of parquet weather exodata object.
+        
+        '''
+        
+        self.name = 'weather_from_parquet';
+        self.file_path = parquet_file_path;  
+        self.data = {};   
+        # Dictionary of format {'columnHeader' : ('weaVarName', mpcpyUnit)}
+        self.variable_map = variable_map;
+        self.geography = geography;
+        # Process Variables
+        if 'process_variables' in kwargs:
+            # Set process method
+            if 'process_method' in kwargs:
+                self._set_process_method(kwargs['process_method']);
+            else:
+                self._set_process_method('fmu');
+            # Set process variables
+            self.process_variables = kwargs['process_variables'];
+        else:
+            self.process_variables = None;
+        # Common kwargs
+        kwargs['geography'] = geography
+        self._parse_daq_kwargs(kwargs);
+        self._parse_time_zone_kwargs(kwargs);
+           
+    def _collect_data(self, start_time, final_time):
+        '''Collect data from parquet file into data dictionary.
+        
+        '''
+        
+        # Set time interval
+        self._set_time_interval(start_time, final_time);
+        # Get bulk time series        
+        self._read_timeseries_from_parquet();
+        # Process weather data
+        if self.process_variables is not None:
+            self._process_weather_data();
+            
 class WeatherFromDF(_Weather, utility._DAQ):
     '''Collects weather data from a pandas DataFrame object.
 
@@ -1361,6 +1638,13 @@ class WeatherFromDF(_Weather, utility._DAQ):
         {"Column Header Name" : ("Weather Variable Name", mpcpy.Units.unit)}.
     geography : [numeric, numeric]
         List of [Latitude, Longitude] in degrees.
+    process_variables : list, optional
+        List of processed weather variable names to calculate from the 
+        collected data, see ``WeatherFromEPW``.
+    process_method : string, optional
+        'fmu' or 'numpy' to calculate the process variables, see 
+        ``WeatherFromEPW``.
+        Default is 'fmu'.
 
     Attributes
     ----------
@@ -1388,10 +1672,11 @@ class WeatherFromDF(_Weather, utility._DAQ):
         self.geography = geography
         # Process Variables
         if 'process_variables' in kwargs:
-            # Set file_path for process fmu
-            weatherdir = utility.get_MPCPy_path() + os.sep + 'resources' + os.sep + 'weather';
-            fmuname = 'WeatherProcessor_JModelica_v2.fmu';
-            self._create_fmu({'fmupath': weatherdir+os.sep+fmuname});
+            # Set process method
+            if 'process_method' in kwargs:
+                self._set_process_method(kwargs['process_method']);
+            else:
+                self._set_process_method('fmu');
             # Set process variables
             self.process_variables = kwargs['process_variables'];
         else:
@@ -1566,6 +1851,56 @@ class InternalFromCSV(_Internal, utility._DAQ):
         # Get bulk time series        
         self._read_timeseries_from_csv();
         
+class InternalFromParquet(_Internal, utility._DAQ):
+    '''Collects internal data from a parquet file.
+
+    Parameters
+    ----------
+    parquet_file_path : string
+        Path of parquet file.  The time column, or named index, must 
+        contain time stamps without time zone.
+    variable_map : dictionary
+        {"Column Header Name" : ("Zone Name", "Internal Variable Name", mpcpy.Units.unit)}.
+
+    Attributes
+    ----------
+    data : dictionary
+        {"Zone Name" : {"Internal Variable Name" : mpcpy.Variables.Timeseries}}.
+    lat : mpcpy.variables.Static
+        Latitude in degrees.  For timezone.
+    lon : mpcpy.variables.Static
+        Longitude in degrees.  For timezone.
+    tz_name : string
+        Timezone name.  
+    file_path : string
+        Path of parquet file.
+
+    '''
+    
+    def __init__(self, parquet_file_path, variable_map, **kwargs):
+        '''Constructor of parquet internal exodata object.
+        
+        '''
+        
+        self.name = 'internal_from_parquet';
+        self.file_path = parquet_file_path;
+        self.data = {};   
+        # Dictionary of format {'columnHeader' : ('zone', 'RadConLatOcc', mpcpyUnit)}
+        self.variable_map = variable_map;
+        # Common kwargs
+        self._parse_daq_kwargs(kwargs);
+        self._parse_time_zone_kwargs(kwargs);
+                   
+    def _collect_data(self, start_time, final_time):
+        '''Collect data from the parquet file into data dictionary.
+        
+        '''
+        
+        # Set time interval
+        self._set_time_interval(start_time, final_time);
+        # Get bulk time series        
+        self._read_timeseries_from_parquet();
+        
 class InternalFromOccupancyModel(_Internal):
     '''Collects internal data from an occupancy model.
 
@@ -1754,13 +2089,14 @@ class ControlFromCSV(_Control, utility._DAQ):
         # Get bulk time series        
         self._read_timeseries_from_csv();
         
-class ControlFromDF(_Control, utility._DAQ):
-    '''Collects control data from a pandas DataFrame object.
+class ControlFromParquet(_Control, utility._DAQ):
+    '''Collects control data from a parquet file.
 
     Parameters
     ----------
-    df : pandas DataFrame
-        DataFrame of data.  The index must be a datetime object.
+    parquet_file_path : string
+        Path of parquet file.  The time column, or named index, must 
+        contain time stamps without time zone.
     variable_map : dictionary
         {"Column Header Name" : ("Control Variable Name", mpcpy.Units.unit)}.
 
@@ -1769,45 +2105,94 @@ class ControlFromDF(_Control, utility._DAQ):
     data : dictionary
         {"Control Variable Name" : mpcpy.Variables.Timeseries}.
     lat : mpcpy.variables.Static
-        Latitude in degrees.
+        Latitude in degrees.  For timezone.
     lon : mpcpy.variables.Static
-        Longitude in degrees.
+        Longitude in degrees.  For timezone.
     tz_name : string
-        Timezone name.  
+        Timezone name. 
+    file_path : string
+        Path of parquet file.
 
     '''
 
-    def __init__(self, df, variable_map, **kwargs):
-        '''Constructor of df control exodata object.
+    def __init__(self, parquet_file_path, variable_map, **kwargs):
+        '''Constructor of parquet control exodata object.
         
         '''
 
-        self.name = 'control_from_df';
-        self._df = df;
+        self.name = 'control_from_parquet';
+        self.file_path = parquet_file_path;
         self.data = {};   
-        # Dictionary of format {'dfHeader' : ('conVarName', mpcpyUnit)}
+        # Dictionary of format {'columnHeader' : ('conVarName', mpcpyUnit)}
         self.variable_map = variable_map;
         # Common kwargs
         self._parse_daq_kwargs(kwargs);
         self._parse_time_zone_kwargs(kwargs);             
-        # Set time index from default or user-specified time header
-        try:
-            self._df = self._df.tz_localize(self.tz_name);
-        except TypeError:
-            raise TypeError('Problem with dataframe index.  Check that it is a datetime index and is not already tz aware.')
-                            
+                   
     def _collect_data(self, start_time, final_time):
-        '''Collect data from the df into data dictionary.
+        '''Collect data from the parquet file into data dictionary.
         
         '''
         
         # Set time interval
         self._set_time_interval(start_time, final_time);
         # Get bulk time series        
-        self._read_timeseries_from_df();
+        self._read_timeseries_from_parquet();
         
-#%% Other input source implementations        
-class OtherInputFromCSV(_OtherInput, utility._DAQ):
+class ControlFromDF(_Control, utility._DAQ):
+    '''Collects control data from a pandas DataFrame object.
+
+    Parameters
+    ----------
+    df : pandas DataFrame
+        DataFrame of data.  The index must be a datetime object.
+    variable_map : dictionary
+        {"Column Header Name" : ("Control Variable Name", mpcpy.Units.unit)}.
+
+    Attributes
+    ----------
+    data : dictionary
+        {"Control Variable Name" : mpcpy.Variables.Timeseries}.
+    lat : mpcpy.variables.Static
+        Latitude in degrees.
+    lon : mpcpy.variables.Static
+        Longitude in degrees.
+    tz_name : string
+        Timezone name.  
+
+    '''
+
+    def __init__(self, df, variable_map, **kwargs):
+        '''Constructor of df control exodata object.
+        
+        '''
+
+        self.name = 'control_from_df';
+        self._df = df;
+        self.data = {};   
+        # Dictionary of format {'dfHeader' : ('conVarName', mpcpyUnit)}
+        self.variable_map = variable_map;
+        # Common kwargs
+        self._parse_daq_kwargs(kwargs);
+        self._parse_time_zone_kwargs(kwargs);             
+        # Set time index from default or user-specified time header
+        try:
+            self._df = self._df.tz_localize(self.tz_name);
+        except TypeError:
+            raise TypeError('Problem with dataframe index.  Check that it is a datetime index and is not already tz aware.')
+                            
+    def _collect_data(self, start_time, final_time):
+        '''Collect data from the df into data dictionary.
+        
+        '''
+        
+        # Set time interval
+        self._set_time_interval(start_time, final_time);
+        # Get bulk time series        
+        self._read_timeseries_from_df();
+        
+#%% Other input source implementations        
+class OtherInputFromCSV(_OtherInput, utility._DAQ):
     '''Collects other input data from a CSV file.
 
     Parameters
@@ -1856,6 +2241,56 @@ class OtherInputFromCSV(_OtherInput, utility._DAQ):
         # Get bulk time series        
         self._read_timeseries_from_csv();
         
+class OtherInputFromParquet(_OtherInput, utility._DAQ):
+    '''Collects other input data from a parquet file.
+
+    Parameters
+    ----------
+    parquet_file_path : string
+        Path of parquet file.  The time column, or named index, must 
+        contain time stamps without time zone.
+    variable_map : dictionary
+        {"Column Header Name" : ("Other Input Variable Name", mpcpy.Units.unit)}.
+
+    Attributes
+    ----------
+    data : dictionary
+        {"Other Input Variable Name" : mpcpy.Variables.Timeseries}.
+    lat : mpcpy.variables.Static
+        Latitude in degrees.  For timezone.
+    lon : mpcpy.variables.Static
+        Longitude in degrees.  For timezone.
+    tz_name : string
+        Timezone name.
+    file_path : string
+        Path of parquet file.
+    
+    '''
+
+    def __init__(self, parquet_file_path, variable_map, **kwargs):
+        '''Constructor of parquet other input exodata object.
+        
+        '''
+
+        self.name = 'otherinput_from_parquet';
+        self.file_path = parquet_file_path;
+        self.data = {};   
+        # Dictionary of format {'columnHeader' : ('otherinputVarName', mpcpyUnit)}
+        self.variable_map = variable_map;
+        # Common kwargs
+        self._parse_daq_kwargs(kwargs);
+        self._parse_time_zone_kwargs(kwargs);      
+                   
+    def _collect_data(self, start_time, final_time):
+        '''Collect data from the parquet file into data dictionary.
+        
+        '''
+        
+        # Set time interval
+        self._set_time_interval(start_time, final_time);
+        # Get bulk time series        
+        self._read_timeseries_from_parquet();
+        
 class OtherInputFromDF(_OtherInput, utility._DAQ):
     '''Collects other input data from a pandas DataFrame object.
 
@@ -1969,6 +2404,69 @@ class ParameterFromCSV(_Parameter, utility._DAQ):
                 if 'Covariance' in df.columns:
                     self.data[key]['Covariance'] = variables.Static(key+'_cov', df.loc[key, 'Covariance'], unit);
 
+class ParameterFromParquet(_Parameter, utility._DAQ):
+    '''Collects parameter data from a parquet file. 
+
+    Parameters
+    ----------
+    parquet_file_path : string
+        Path of parquet file. The parquet file rows must be named as the 
+        parameter names, by the index or by a 'Name' column, and the 
+        columns must be named as the parameter key names.
+
+    Attributes
+    ----------
+    data : dictionary
+        {"Parameter Name" : {"Parameter Key Name" : mpcpy.Variables.Static}}.
+    file_path : string
+        Path of parquet file.
+    
+    '''
+
+    def __init__(self, parquet_file_path):
+        '''Constructor of parquet parameter source.
+        
+        '''
+
+        self.name = 'parameter_from_parquet';
+        self.file_path = parquet_file_path;
+        self.data = {};
+        
+    def collect_data(self):
+        '''Collect parameter data from parquet file into data dictionary.
+        
+        Yields
+        ------
+        
+        data : dictionary
+            Data attribute.
+
+        '''
+        
+        # Read coefficients file
+        df = utility._read_parquet(self.file_path);
+        if 'Name' in df.columns:
+            df = df.set_index('Name');
+        # Create coefficient dictionary
+        for key in df.index.values:
+            self.data[key] = {};
+            unit = utility.get_unit_class_from_unit_string(df.loc[key, 'Unit']);
+            if df.loc[key, 'Free']:  
+                self.data[key]['Free'] = variables.Static(key+'_free', True, units.boolean);
+                self.data[key]['Value'] = variables.Static(key+'_val', df.loc[key, 'Value'], unit);
+                self.data[key]['Minimum'] = variables.Static(key+'_min', df.loc[key, 'Minimum'], unit);
+                self.data[key]['Maximum'] = variables.Static(key+'_max', df.loc[key, 'Maximum'], unit);
+                self.data[key]['Covariance'] = variables.Static(key+'_cov', df.loc[key, 'Covariance'], unit);
+            else: 
+                self.data[key]['Free'] = variables.Static(key+'_free', False, units.boolean);
+                self.data[key]['Value'] = variables.Static(key+'_val', df.loc[key, 'Value'], unit);   
+                if 'Minimum' in df.columns:
+                    self.data[key]['Minimum'] = variables.Static(key+'_min', df.loc[key, 'Minimum'], unit);
+                if 'Maximum' in df.columns:
+                    self.data[key]['Maximum'] = variables.Static(key+'_max', df.loc[key, 'Maximum'], unit);
+                if 'Covariance' in df.columns:
+                    self.data[key]['Covariance'] = variables.Static(key+'_cov', df.loc[key, 'Covariance'], unit);
+
 class ParameterFromDF(_Parameter, utility._DAQ):
     '''Collects parameter data from a pandas DataFrame object. 
 
@@ -2077,6 +2575,56 @@ class EstimatedStateFromCSV(_EstimatedState, utility._DAQ):
             self.data[key]['Value'] = variables.Static(key+'_val', df.loc[key, 'Value'], unit);  
             self.data[key]['Parameter'] = df.loc[key, 'Parameter']            
 
+class EstimatedStateFromParquet(_EstimatedState, utility._DAQ):
+    '''Collects estimated state data from a parquet file. 
+
+    Parameters
+    ----------
+    parquet_file_path : string
+        Path of parquet file. The parquet file rows must be named as the 
+        estimated state names, by the index or by a 'Name' column, and the 
+        columns must be named as the estimated state key names.
+
+    Attributes
+    ----------
+    data : dictionary
+        {"Estimated State Name" : {"Estimated State Key Name" : mpcpy.Variables.Static}}.
+    file_path : string
+        Path of parquet file.
+    
+    '''
+
+    def __init__(self, parquet_file_path):
+        '''Constructor of parquet estimated state source.
+        
+        '''
+
+        self.name = 'estimated_state_from_parquet';
+        self.file_path = parquet_file_path;
+        self.data = {};
+        
+    def collect_data(self):
+        '''Collect estimated state data from parquet file into data dictionary.
+        
+        Yields
+        ------
+        
+        data : dictionary
+            Data attribute.
+
+        '''
+        
+        # Read coefficients file
+        df = utility._read_parquet(self.file_path);
+        if 'Name' in df.columns:
+            df = df.set_index('Name');
+        # Create coefficient dictionary
+        for key in df.index.values:
+            self.data[key] = {};
+            unit = utility.get_unit_class_from_unit_string(df.loc[key, 'Unit']);
+            self.data[key]['Value'] = variables.Static(key+'_val', df.loc[key, 'Value'], unit);  
+            self.data[key]['Parameter'] = df.loc[key, 'Parameter']            
+
 class EstimatedStateFromDF(_EstimatedState, utility._DAQ):
     '''Collects estimated state data from a pandas DataFrame object. 
 
@@ -2175,6 +2723,58 @@ class ConstraintFromCSV(_Constraint, utility._DAQ):
         # Get bulk time series        
         self._read_timeseries_from_csv();
         
+class ConstraintFromParquet(_Constraint, utility._DAQ):
+    '''Collects constraint data from a parquet file.
+
+    Parameters
+    ----------
+    parquet_file_path : string
+        Path of parquet file.  The time column, or named index, must 
+        contain time stamps without time zone.
+    variable_map : dictionary
+        {"Column Header Name" : ("State or Control Variable Name", "Constraint Variable Type", mpcpy.Units.unit, <weight>[optional])}
+        Note that <weight> is float or int and is only needed if "Constraint Variable Type" is 'sLTE' or 'sGTE'.
+
+    Attributes
+    ----------
+    data : dictionary
+        {"State or Control Variable Name" : {"Constraint Variable Type" : {"Value" : mpcpy.Variables.Timeseries/Static,
+                                                                           "Weight" : mpcpy.Variables.Static or None}}}``
+    lat : mpcpy.variables.Static
+        Latitude in degrees.  For timezone.
+    lon : mpcpy.variables.Static
+        Longitude in degrees.  For timezone.
+    tz_name : string
+        Timezone name.
+    file_path : string
+        Path of parquet file.
+
+    '''
+
+    def __init__(self, parquet_file_path, variable_map, **kwargs):
+        '''Constructor of parquet constraint exodata object.
+        
+        '''
+
+        self.name = 'constraint_from_parquet';
+        self.file_path = parquet_file_path;
+        self.data = {};   
+        # Dictionary of format {'columnHeader' : (stateVarName, 'key', mpcpyUnit)}
+        self.variable_map = variable_map;
+        # Common kwargs
+        self._parse_daq_kwargs(kwargs);
+        self._parse_time_zone_kwargs(kwargs);
+            
+    def _collect_data(self, start_time, final_time):
+        '''Collect data from the parquet file into data dictionary.
+        
+        '''
+
+        # Set time interval
+        self._set_time_interval(start_time, final_time);
+        # Get bulk time series        
+        self._read_timeseries_from_parquet();
+        
 class ConstraintFromDF(_Constraint, utility._DAQ):
     '''Collects constraint data from a pandas DataFrame object.
 
@@ -2344,6 +2944,56 @@ class PriceFromCSV(_Price, utility._DAQ):
         # Get bulk time series        
         self._read_timeseries_from_csv();                
 
+class PriceFromParquet(_Price, utility._DAQ):
+    '''Collects price data from a parquet file.
+
+    Parameters
+    ----------
+    parquet_file_path : string
+        Path of parquet file.  The time column, or named index, must 
+        contain time stamps without time zone.
+    variable_map : dictionary
+        {"Column Header Name" : ("Price Variable Name", mpcpy.Units.unit)}.
+
+    Attributes
+    ----------
+    data : dictionary
+        {"Price Variable Name" : mpcpy.Variables.Timeseries}.
+    lat : mpcpy.variables.Static
+        Latitude in degrees.  For timezone.
+    lon : mpcpy.variables.Static
+        Longitude in degrees.  For timezone.
+    tz_name : string
+        Timezone name.
+    file_path : string
+        Path of parquet file.
+    
+    '''
+
+    def __init__(self, parquet_file_path, variable_map, **kwargs):
+        '''Constructor of parquet price exodata object.
+        
+        '''
+
+        self.name = 'price_from_parquet';
+        self.file_path = parquet_file_path;
+        self.data = {};   
+        # Dictionary of format {'columnHeader' : (priceVarName, 'key', mpcpyUnit)}
+        self.variable_map = variable_map;
+        # Common kwargs
+        self._parse_daq_kwargs(kwargs);
+        self._parse_time_zone_kwargs(kwargs);
+            
+    def _collect_data(self, start_time, final_time):
+        '''Collect data from the parquet file into data dictionary.
+        
+        '''
+
+        # Set time interval
+        self._set_time_interval(start_time, final_time);
+        # Get bulk time series        
+        self._read_timeseries_from_parquet();                
+
 class PriceFromDF(_Price, utility._DAQ):
     '''Collects price data from a pandas DataFrame object.
 
@@ -2396,4 +3046,207 @@ class PriceFromDF(_Price, utility._DAQ):
         # Set time interval
         self._set_time_interval(start_time, final_time);
         # Get bulk time series        
-        self._read_timeseries_from_df();
\ No newline at end of file
+        self._read_timeseries_from_df();
+
+#%% Epw cache
+def set_epw_cache(cache_dir):
+    '''Set the directory of the on-disk cache of parsed epw data.
+    
+    The data of epw files is parsed once per year and time zone and kept in
+    memory.  When set, the parsed data is also stored in a binary numpy 
+    format under the hash of the file content, time zone, and year, so that 
+    other processes or sessions using the same epw file skip parsing it.  
+    The on-disk cache is disabled by default.
+
+    Parameters
+    ----------
+    cache_dir : string
+        Path to the cache directory.  It is created if it does not exist.
+        None disables the cache.
+    
+    '''
+
+    global _epw_cache_dir
+    if cache_dir is not None:
+        cache_dir = os.path.abspath(cache_dir);
+        if not os.path.exists(cache_dir):
+            os.makedirs(cache_dir);
+    _epw_cache_dir = cache_dir;
+    
+def _write_epw_cache_file(cache_path, df_epw):
+    '''Write parsed epw data to the on-disk cache.
+    
+    Parameters
+    ----------
+    cache_path : string
+        Path of the cache file.
+    df_epw : ``pandas`` DataFrame
+        Data of the epw columns with a localized time index.
+    
+    '''
+    
+    arrays = dict(('column_{0}'.format(i), df_epw[column].values) for i, column in enumerate(df_epw.columns));
+    arrays['columns'] = np.array(df_epw.columns);
+    arrays['time'] = df_epw.index.asi8;
+    # Write to a temporary file first so that concurrent readers never see 
+    # a partially written file
+    tmp_path = '{0}.{1}.tmp'.format(cache_path, os.getpid());
+    with open(tmp_path, 'wb') as f:
+        np.savez(f, **arrays);
+    try:
+        os.rename(tmp_path, cache_path);
+    except OSError:
+        # Another process wrote the same entry first
+        os.remove(tmp_path);
+        
+def _read_epw_cache_file(cache_path, tz_name):
+    '''Read parsed epw data from the on-disk cache.
+    
+    Parameters
+    ----------
+    cache_path : string
+        Path of the cache file.
+    tz_name : string
+        Time zone of the time index.
+        
+    Returns
+    -------
+    df_epw : ``pandas`` DataFrame
+        Data of the epw columns with a localized time index.
+    
+    '''
+    
+    with np.load(cache_path) as arrays:
+        columns = list(arrays['columns']);
+        index = pd.DatetimeIndex(arrays['time'], tz = 'UTC', name = 'Time').tz_convert(tz_name);
+        df_epw = pd.DataFrame(dict((column, arrays['column_{0}'.format(i)]) for i, column in enumerate(columns)), \
+                              index = index, columns = columns);
+    
+    return df_epw
+
+#%% Weather processor functions
+def _smooth_max(x1, x2, deltax):
+    '''Once continuously differentiable approximation of the maximum.
+    
+    See Buildings.Utilities.Math.Functions.smoothMax.
+    
+    '''
+    
+    x = (x1 - x2)/deltax;
+    with np.errstate(invalid='ignore', over='ignore'):
+        y = (np.tanh(np.tan(np.clip(x, -1, 1)*np.pi/2)) + 1)/2;
+    y = np.where(x <= -0.999999999, 0, np.where(x >= 0.999999999, 1, y));
+    
+    return x1*y + (1 - y)*x2
+    
+def _smooth_limit(x, l, u, deltax):
+    '''Once continuously differentiable approximation of the limit function.
+    
+    See Buildings.Utilities.Math.Functions.smoothLimit.
+    
+    '''
+    
+    y = _smooth_max(x, l + deltax, deltax/10);
+    y = -_smooth_max(-y, -(u - deltax), deltax/10);
+    
+    return y
+    
+def _wet_bulb_temperature(TDryBul, phi, p):
+    '''Wet bulb temperature from dry bulb temperature and relative humidity.
+    
+    See Buildings.Utilities.Psychrometrics.TWetBul_TDryBulPhi, which the 
+    weather processor fmu uses without the approximation.  The enthalpies 
+    of the energy balance are referenced to 0 degC.  The implicit equation
+    is solved by bisection, which converges for all points at once.
+    
+    Parameters
+    ----------
+    TDryBul : numpy array
+        Dry bulb temperature in K.
+    phi : numpy array
+        Relative humidity in [0, 1].
+    p : numpy array
+        Atmospheric pressure in Pa.
+        
+    Returns
+    -------
+    TWetBul : numpy array
+        Wet bulb temperature in K.
+    
+    '''
+    
+    cpAir = 1006.0;
+    cpSte = 1860.0;
+    cpWatLiq = 4184.0;
+    h_fg = 2501014.5;
+    k_mair = 0.6219647130774989;
+    def X_pSatpphi(pSat, phi):
+        return phi*k_mair/(p/pSat - phi + k_mair*phi)
+    def pSat(T):
+        return 611.657*np.exp(17.2799 - 4102.99/(T - 35.719))
+    XiDryBul = X_pSatpphi(pSat(TDryBul), phi);
+    def residual(TWetBul):
+        XiSat = X_pSatpphi(pSat(TWetBul), 1);
+        XiSatRefIn = (1 - XiDryBul)*XiSat/(1 - XiSat);
+        return (TWetBul - 273.15)*((1 - XiDryBul)*cpAir + XiSatRefIn*cpSte + (XiDryBul - XiSatRefIn)*cpWatLiq) \
+               - (TDryBul - 273.15)*((1 - XiDryBul)*cpAir + XiDryBul*cpSte) - (XiDryBul - XiSatRefIn)*h_fg
+    lower = TDryBul - 100;
+    upper = TDryBul + 1;
+    for i in range(60):
+        middle = (lower + upper)/2;
+        positive = residual(middle) > 0;
+        upper = np.where(positive, middle, upper);
+        lower = np.where(positive, lower, middle);
+        
+    return (lower + upper)/2
+
+#%% Incremental collection functions
+def _copy_data_structure(data):
+    '''Copy the dictionaries of a data attribute, keeping the variables.
+    
+    '''
+    
+    return dict((key, _copy_data_structure(value) if isinstance(value, dict) else value) for key, value in data.items())
+    
+def _merge_data(data_old, data_new, keep_from, tail_start):
+    '''Merge kept data and the data of a new tail of the collection period.
+    
+    Timeseries in both data are set to the kept data from ``keep_from`` 
+    until ``tail_start`` followed by the new data.  The structure of the new
+    data is kept, so variables that are not in the new data are dropped.
+    
+    Parameters
+    ----------
+    data_old : dictionary
+        Data attribute of the last collection.
+    data_new : dictionary
+        Data attribute of the collection of the new tail.
+    keep_from : ``pandas`` Timestamp
+        Time in utc before which kept data is evicted.
+    tail_start : ``pandas`` Timestamp
+        Time in utc from which the new data is used.
+        
+    Returns
+    -------
+    data : dictionary
+        Merged data attribute.
+    
+    '''
+    
+    data = {};
+    for key, value in data_new.items():
+        if isinstance(value, dict):
+            data[key] = _merge_data(data_old.get(key, {}), value, keep_from, tail_start);
+        elif isinstance(value, variables.Timeseries) and isinstance(data_old.get(key), variables.Timeseries):
+            ts_old = data_old[key].get_base_data();
+            ts_new = value.get_base_data();
+            if value is data_old[key]:
+                ts = ts_old[ts_old.index >= keep_from];
+            else:
+                ts = pd.concat([ts_old[(ts_old.index >= keep_from) & (ts_old.index < tail_start)], ts_new]);
+            value._set_base_data(ts);
+            data[key] = value;
+        else:
+            data[key] = value;
+    
+    return data
@@ -16,8 +16,9 @@ Classes
 
 .. autoclass:: mpcpy.models.Modelica
     :members: parameter_estimate, state_estimate, validate, simulate, set_parameter_estimate_method, 
-              set_state_estimate_method, set_validate_method, display_measurements, 
-              get_base_measurements
+              set_state_estimate_method, set_validate_method, get_validate_options,
+              set_validate_options, get_state_estimate_options, 
+              set_state_estimate_options, display_measurements, get_base_measurements
 
 Parameter Estimate Methods
 ==========================
@@ -65,18 +66,16 @@ from abc import ABCMeta, abstractmethod
 import numpy as np
 from matplotlib import pyplot as plt
 import pandas as pd
-import csv
+import tempfile
 import logging
-import pdb
+import time
 from datetime import timedelta
 from mpcpy import units
 from mpcpy import variables
 from mpcpy import utility
 from mpcpy import optimization
 from occupant.occupancy.queueing.adaptive_breakpoint_placement import adaptive_breakpoint_placement
-from occupant.occupancy.queueing.simulate_queue import simulate_queue
-from occupant.occupancy.queueing.unique_last import unique_last
-from occupant.occupancy.queueing.interp1 import interp1
+from occupant.occupancy.queueing.simulate_queue_batch import simulate_queue_batch
 from occupant.occupancy.queueing.parameter_inference_given_segments import parameter_inference_given_segment
 from estimationpy.fmu_utils import model as ukf_model
 from estimationpy.ukf.ukf_fmu import UkfFmu
@@ -84,6 +83,27 @@ from estimationpy.fmu_utils import estimationpy_logging
 import pyDOE as doe
 import copy
 import os
+import multiprocessing
+
+# Units of the validation metrics, None for the unit of the measurement
+_validation_metric_units = {'RMSE' : None, \
+                            'CVRMSE' : units.unit1, \
+                            'NMBE' : units.unit1, \
+                            'MAE' : None, \
+                            'MaxError' : None};
+
+# Model estimated by global start worker processes, which inherit it when 
+# forked so that each iterates on its own copy of the model
+_global_start_model = None;
+
+def _global_start_task(task):
+    '''Run a global start iteration with the global start model.
+
+    Module level so that it can be called by worker processes.
+
+    '''
+
+    return _global_start_model._global_start_iteration(*task);
 
 #%% Model Class
 class _Model(utility._mpcpyPandas, utility._Measurements):
@@ -279,144 +299,162 @@ class JModelicaParameter(_ParameterEstimate):
         self.opt_problem.optimize(Model.start_time, Model.final_time, measurement_variable_list = Model.measurement_variable_list);
         
 
-class UKFParameter(_ParameterEstimate, utility._FMU):
-    '''Parameter estimation method using the Unscented Kalman Filter.
+class _UKF(utility._FMU):
+    '''Mixin class for the estimation methods using EstimationPy.
     
-    This estimation method uses the UKF implementation EstimationPy_.
+    The inputs, measurements, and free parameters of an estimation are 
+    written to a temporary csv file of the estimation, which is read by the
+    input and output variables of the EstimationPy model and removed after
+    the estimation.
     
-    .. _EstimationPy: https://github.com/lbl-srg/EstimationPy
-
     '''
-
-    def __init__(self, Model):
-        '''Constructor of UKF estimation method.
-        
-        '''
-
-        self.name = 'UKF';
-        self.fmu_version = Model.fmu_version;
-        # Instantiate UKF model
-        self.model = ukf_model.Model(Model.fmupath);
+    
+    def _open_ukf_data(self, Model, start_time_utc = None):
+        '''Write the UKF data file and select its columns in the UKF model.
         
-    def _estimate(self, Model, style='parameter'):
-        '''Perform UKF estimation.
+        Parameters
+        ----------
+        Model : mpcpy.Models.Modelica
+            Model of the estimation.
+        start_time_utc : datetime object, optional
+            Start of the data, at time 0 of the filter.
+            Default is the start time of the model.
 
         '''
-
-        estimationpy_logging.configure_logger(log_level = logging.DEBUG, log_level_console = logging.INFO, log_level_file = logging.DEBUG)
-        # Write the inputs, measurements, and parameters to csv
-        self._writeukfcsv(Model);
+        
+        self._write_ukf_data(Model, start_time_utc = start_time_utc);
         # Select inputs
         for key in Model.input_names:
             inputvar = self.model.get_input_by_name(key);
             inputvar.get_csv_reader().open_csv(self.csv_path);
-            inputvar.get_csv_reader().set_selected_column(key);    
+            inputvar.get_csv_reader().set_selected_column(key);
         # Select outputs
         for key in Model.measurement_variable_list:
             outputvar = self.model.get_output_by_name(key);
             outputvar.get_csv_reader().open_csv(self.csv_path);
-            outputvar.get_csv_reader().set_selected_column(key);        
+            outputvar.get_csv_reader().set_selected_column(key);
             outputvar.set_measured_output()
             outputvar.set_covariance(0.5);
-        # Select the parameters to be identified
-        i = 0;
-        for key in Model.parameter_data.keys():
-            if Model.parameter_data[key]['Free'].get_base_data():
-                self.model.add_parameter(self.model.get_variable_object(key));
-                par = self.model.get_parameters()[i];
-                par.set_initial_value(Model.parameter_data[key]['Value'].get_base_data());
-                par.set_covariance(Model.parameter_data[key]['Covariance'].get_base_data());
-                par.set_min_value(Model.parameter_data[key]['Minimum'].get_base_data());
-                par.set_max_value(Model.parameter_data[key]['Maximum'].get_base_data());
-                par.set_constraint_low(True);
-                par.set_constraint_high(True);
-                i = i + 1;
-        # Initialize the model for the simulation
-        self.model.initialize_simulator();
-        # Set model parameters
-        for name in Model.parameter_data.keys():
-            self.model.set_real(self.model.get_variable_object(name),Model.parameter_data[name]['Value'].get_base_data());
-        # Instantiate the UKF for the FMU
-        ukf_FMU = UkfFmu(self.model);
-        # Start filter
-        t0 = pd.to_datetime(0, unit = "s", utc = True);
-        t1 = pd.to_datetime(Model.elapsed_seconds, unit = "s", utc = True);
-        self.res_est = ukf_FMU.filter(start = t0, stop = t1);
-        # Update parameter results
-        self._get_parameter_results(Model);
         
-    def _writeukfcsv(self, Model):
-        '''Write the UKF csv file.
+    def _write_ukf_data(self, Model, start_time_utc = None):
+        '''Write the UKF data file.
 
         '''
 
-        # Collect additional inputs for csv file     
+        # Collect additional inputs for data file     
         self._additional_inputs = {};
         # Measurements
         for key_mea in Model.measurement_variable_list:
             variable = Model.measurements[key_mea];
-            self._additional_inputs[key_mea] = {};
             self._additional_inputs[key_mea] = variable['Measured'];
         # Parameters
-        free_parameters = [];
         for key_par in Model.parameter_data.keys():
             variable = Model.parameter_data[key_par];
             if variable['Free'].get_base_data():
-                free_parameters.append(key_par)
                 time = self._additional_inputs[key_mea].get_base_data().index.values;
                 data = variable['Value'].get_base_data()*np.ones(len(time));
                 unit = variable['Value'].get_base_unit();
                 ts = pd.Series(index = time, data = data)
                 self._additional_inputs[key_par] = variables.Timeseries(key_par+'_ukf', ts, unit);
-                
         # Create mpcpy ts list
-        self._input_mpcpy_ts_list = [];
-        # Weather
-        for key in Model.weather_data.keys():
-            if key in Model.input_names:
-                self._input_mpcpy_ts_list.append(Model.weather_data[key]);
-        # Internal
-        for zone in Model.internal_data.keys():
-            for intLoad in ['intCon', 'intRad', 'intLat']:
-                if intLoad+'_'+zone in Model.input_names:
-                    self._input_mpcpy_ts_list.append(Model.internal_data[zone][intLoad]);
-        # Controls
-        for key in Model.control_data.keys():
-            if key in Model.input_names:
-                self._input_mpcpy_ts_list.append(Model.control_data[key]);                     
-        # Other inputs                   
-        for key in Model.other_inputs.keys():
-            if key in Model.input_names:
-                self._input_mpcpy_ts_list.append(Model.other_inputs[key]);
+        self._input_mpcpy_ts_list = utility._get_input_mpcpy_ts_list(Model, Model.input_names);
         # Add measurements and parameters
         for key in self._additional_inputs.keys():
             self._input_mpcpy_ts_list.append(self._additional_inputs[key]);
-            
-        # Create input object to write to csv
+        # Create input object to write to file
         # Set timing
-        self.start_time_utc = Model.start_time_utc;
+        if start_time_utc is None:
+            self.start_time_utc = Model.start_time_utc;
+            self._global_start_time_utc = Model._global_start_time_utc
+            self.elapsed_seconds = Model.elapsed_seconds;  
+        else:
+            self.start_time_utc = start_time_utc;
+            self._global_start_time_utc = start_time_utc;
+            self.elapsed_seconds = (Model.final_time_utc - start_time_utc).total_seconds();
         self.final_time_utc = Model.final_time_utc;   
-        self._global_start_time_utc = Model._global_start_time_utc
-        self.elapsed_seconds = Model.elapsed_seconds;  
         self.total_elapsed_seconds = Model.total_elapsed_seconds;
         self._create_input_object_from_input_mpcpy_ts_list(self._input_mpcpy_ts_list)
-        # Write to csv
-        self.csv_path = 'ukf.csv';                                               
-        with open(self.csv_path, 'wb') as f:
-            ukfwriter = csv.writer(f);
-            ukfwriter.writerow(['time'] + list(self._input_object[0]));
-            for i in range(len(self._input_object[1][:,0])):
-                ukfwriter.writerow(self._input_object[1][i]);
+        # Write to a file of this estimation, so that estimations in the 
+        # same working directory do not share it
+        fd, self.csv_path = tempfile.mkstemp(prefix = 'mpcpy_ukf_', suffix = '.csv');
+        os.close(fd);
+        np.savetxt(self.csv_path, self._input_object[1], delimiter = ',', \
+                   header = ','.join(['time'] + list(self._input_object[0])), comments = '');
+                   
+    def _remove_ukf_data(self):
+        '''Remove the UKF data file.
+
+        '''
+        
+        if os.path.exists(self.csv_path):
+            os.remove(self.csv_path);
+
+class UKFParameter(_ParameterEstimate, _UKF):
+    '''Parameter estimation method using the Unscented Kalman Filter.
+    
+    This estimation method uses the UKF implementation EstimationPy_.
+    
+    .. _EstimationPy: https://github.com/lbl-srg/EstimationPy
+
+    '''
+
+    def __init__(self, Model):
+        '''Constructor of UKF estimation method.
+        
+        '''
+
+        self.name = 'UKF';
+        self.fmu_version = Model.fmu_version;
+        # Instantiate UKF model
+        self.model = ukf_model.Model(Model.fmupath);
+        
+    def _estimate(self, Model, style='parameter'):
+        '''Perform UKF estimation.
+
+        '''
 
+        estimationpy_logging.configure_logger(log_level = logging.DEBUG, log_level_console = logging.INFO, log_level_file = logging.DEBUG)
+        # Write the inputs, measurements, and parameters and select them
+        self._open_ukf_data(Model);
+        try:
+            # Select the parameters to be identified
+            i = 0;
+            for key in Model.parameter_data.keys():
+                if Model.parameter_data[key]['Free'].get_base_data():
+                    self.model.add_parameter(self.model.get_variable_object(key));
+                    par = self.model.get_parameters()[i];
+                    par.set_initial_value(Model.parameter_data[key]['Value'].get_base_data());
+                    par.set_covariance(Model.parameter_data[key]['Covariance'].get_base_data());
+                    par.set_min_value(Model.parameter_data[key]['Minimum'].get_base_data());
+                    par.set_max_value(Model.parameter_data[key]['Maximum'].get_base_data());
+                    par.set_constraint_low(True);
+                    par.set_constraint_high(True);
+                    i = i + 1;
+            # Initialize the model for the simulation
+            self.model.initialize_simulator();
+            # Set model parameters
+            for name in Model.parameter_data.keys():
+                self.model.set_real(self.model.get_variable_object(name),Model.parameter_data[name]['Value'].get_base_data());
+            # Instantiate the UKF for the FMU
+            ukf_FMU = UkfFmu(self.model);
+            # Start filter
+            t0 = pd.to_datetime(0, unit = "s", utc = True);
+            t1 = pd.to_datetime(Model.elapsed_seconds, unit = "s", utc = True);
+            self.res_est = ukf_FMU.filter(start = t0, stop = t1);
+        finally:
+            self._remove_ukf_data();
+        # Update parameter results
+        self._get_parameter_results(Model);
+        
     def _get_parameter_results(self, Model):
         '''Update the parameter data dictionary in the model with ukf results.
         
         '''
         
         i = 0;
+        fmu_variable_units = Model._get_fmu_variable_units();
         for key in Model.parameter_data.keys():
             if Model.parameter_data[key]['Free'].get_base_data():
-                fmu_variable_units = Model._get_fmu_variable_units();
                 unit = self._get_unit_class_from_fmu_variable_units(key, fmu_variable_units);
                 if not unit:
                     unit = units.unit1;
@@ -438,6 +476,22 @@ class JModelicaState(_ParameterEstimate):
     Then, the final value of the estimated states are taken as the current 
     state estimates.
     
+    The altered parameter data is a copy of the model parameter data, so 
+    the ``'Free'`` flags of the model parameters are never changed, and the
+    estimation problem is compiled once upon instantiation.
+    
+    In moving horizon mode, each estimation solves over the window of 
+    length ``horizon`` ending at the final time of the estimation period.  
+    If the window starts within the window of the previous estimation, 
+    the problem is warm started from the previous solution shifted to the
+    new start time, with the initial guess of each estimated state taken 
+    from the previous solution at the new start time.  The optimal initial
+    states are kept in the copied parameter data only, so that the 
+    estimation does not change ``Model.parameter_data`` and can run 
+    concurrently with a control optimization of the model.  The iteration
+    and time savings of the warm starts are returned by 
+    ``opt_problem.get_optimization_statistics(warm_start=True)``.
+    
     Based on the state estimator implemented in R. De Coninck and L. Helsen
     (2016). "Practical implementation and evaluation of model predictive
     control for an office building in Brussels." Energy and Buildings 111.
@@ -445,6 +499,15 @@ class JModelicaState(_ParameterEstimate):
     
     .. _JModelica: http://jmodelica.org/
 
+    Attributes
+    ----------
+    estimate_options : dictionary
+        Specifies options for state estimation with the following keys:
+        -moving_horizon : True to use the moving horizon mode.  Default is 
+        False.
+        -horizon : Length of the estimation window in seconds in moving 
+        horizon mode.  None to use the estimation period.  Default is None.
+
     '''
 
     def __init__(self, Model):
@@ -452,30 +515,62 @@ class JModelicaState(_ParameterEstimate):
 
         '''
 
-        self.name = 'Jmo';       
-        # Replace parameter data for state estimation
-        self._replace_parameter_data(Model)
+        self.name = 'Jmo';
+        # Initialize options
+        self.estimate_options = {};
+        self.estimate_options['moving_horizon'] = False;
+        self.estimate_options['horizon'] = None;
+        # Copy parameter data for state estimation
+        self._model = _StateEstimateModel(Model, self._copy_parameter_data(Model));
         # Instantiate state estimation optimization problem
-        self.opt_problem = optimization.Optimization(Model, optimization._ParameterEstimate, optimization.JModelica, {});
-        # Restore original parameter data
-        self._restore_parameter_data(Model)
+        self.opt_problem = optimization.Optimization(self._model, optimization._ParameterEstimate, optimization.JModelica, {});
         
     def _estimate(self, Model):
         '''Perform estimation using JModelica optimization.
 
         '''
 
-        # Replace parameter data for state estimation
-        self._replace_parameter_data(Model)
-        # Solve problem, which updates parameter estimates
-        self.opt_problem.optimize(Model.start_time, Model.final_time, measurement_variable_list = Model.measurement_variable_list);
+        # Copy the current measurements of the model
+        self._model._copy_measurements();
+        if not self.estimate_options['moving_horizon']:
+            # Copy parameter data for state estimation
+            self._model.parameter_data = self._copy_parameter_data(Model);
+            # Solve problem, which updates parameter estimates
+            self.opt_problem.optimize(Model.start_time, Model.final_time, measurement_variable_list = Model.measurement_variable_list);
+            # Update state initialization parameters of the model
+            for key in Model.estimated_state_data.keys():
+                par = Model.estimated_state_data[key]['Parameter'];
+                value = self._model.parameter_data[par]['Value'];
+                Model.parameter_data[par]['Value'].set_display_unit(value.get_display_unit());
+                Model.parameter_data[par]['Value'].set_data(value.display_data());
+        else:
+            # Get the window
+            if self.estimate_options['horizon'] is None:
+                start_time = Model.start_time;
+            else:
+                start_time = Model.final_time - timedelta(seconds = self.estimate_options['horizon']);
+            # Copy parameter data, keeping the previous initial states
+            parameter_data = self._copy_parameter_data(Model);
+            for key in Model.estimated_state_data.keys():
+                par = Model.estimated_state_data[key]['Parameter'];
+                parameter_data[par]['Value'] = self._model.parameter_data[par]['Value'];
+            self._model.parameter_data = parameter_data;
+            # Initial guesses of the states from the previous solution
+            initial_guesses = self._get_initial_guesses(Model, start_time);
+            # Solve problem, which updates the copied parameter estimates
+            self.opt_problem.optimize(start_time, Model.final_time, measurement_variable_list = Model.measurement_variable_list, \
+                                      warm_start = True, initial_guesses = initial_guesses);
         # Update estimated state data with updated parameter estimates
         self._get_state_results(Model)
-        # Restore original parameter data
-        self._restore_parameter_data(Model)
                 
-    def _replace_parameter_data(self, Model):
-        '''Replaces the parameter_data in the Model for state estimation.
+    def _copy_parameter_data(self, Model):
+        '''Copy the parameter_data of the Model for state estimation.
+        
+        Returns
+        -------
+        parameter_data : dictionary
+            Copy of the parameter data with the parameters of state 
+            initialization free and all others not free.
         
         '''
         
@@ -484,30 +579,41 @@ class JModelicaState(_ParameterEstimate):
         for key in Model.estimated_state_data.keys():
             pars_state.append(Model.estimated_state_data[key]['Parameter'])
         # Set parameters of state initialization to free, all others not free
-        # Keep track of which parameters were changed so that can change back
-        self.__change_false_to_true = []
-        self.__change_true_to_false = []
-        for key in Model.parameter_data.keys():
-            if key in pars_state:
-                if not Model.parameter_data[key]['Free'].display_data():    
-                    Model.parameter_data[key]['Free'].set_data(True)
-                    self.__change_false_to_true.append(key)
-            else:
-                if Model.parameter_data[key]['Free'].display_data():
-                    Model.parameter_data[key]['Free'].set_data(False)
-                    self.__change_true_to_false.append(key)
+        parameter_data = copy.deepcopy(Model.parameter_data);
+        for key in parameter_data.keys():
+            parameter_data[key]['Free'].set_data(key in pars_state)
                 
-    def _restore_parameter_data(self, Model):
-        '''Restores the parameter_data in the Model for state estimation.
+        return parameter_data
+        
+    def _get_initial_guesses(self, Model, start_time):
+        '''Get the estimated states of the previous solution at the start time.
+        
+        Also sets the values of the state initialization parameters in the
+        copied parameter data to the initial guesses.
+
+        Returns
+        -------
+        initial_guesses : dictionary
+            {"mpc_model.Parameter Name" : value}.  Empty if the previous 
+            solution does not contain the start time.
         
         '''
         
-        # Change back to how parameters were originally defined
-        for key in Model.parameter_data.keys():
-            if key in self.__change_false_to_true:
-                Model.parameter_data[key]['Free'].set_data(False)
-            if key in self.__change_true_to_false:
-                Model.parameter_data[key]['Free'].set_data(True)
+        initial_guesses = {};
+        package = self.opt_problem._package_type;
+        if not hasattr(package, 'res_opt'):
+            return initial_guesses
+        shift = (start_time.tz_convert('UTC') - package._res_opt_start_time_utc).total_seconds();
+        if shift < 0 or start_time.tz_convert('UTC') >= package._res_opt_final_time_utc:
+            return initial_guesses
+        t = package.res_opt['time'];
+        for key in Model.estimated_state_data.keys():
+            par = Model.estimated_state_data[key]['Parameter'];
+            value = np.interp(t[0] + shift, t, package.res_opt['mpc_model.' + key]);
+            self._model.parameter_data[par]['Value'].set_data(value);
+            initial_guesses['mpc_model.' + par] = self._model.parameter_data[par]['Value'].get_base_data();
+            
+        return initial_guesses
 
     def _get_state_results(self, Model):
         '''Update the state data dictionary in the model with optimization results.
@@ -515,8 +621,8 @@ class JModelicaState(_ParameterEstimate):
         '''
         
         i = 0;
+        fmu_variable_units = Model._get_fmu_variable_units();
         for key in Model.estimated_state_data.keys():
-            fmu_variable_units = Model._get_fmu_variable_units();
             unit = Model._get_unit_class_from_fmu_variable_units(key, fmu_variable_units);
             if not unit:
                 unit = units.unit1;
@@ -525,12 +631,89 @@ class JModelicaState(_ParameterEstimate):
             Model.estimated_state_data[key]['Value'].set_data(data);
             i = i + 1;        
 
-class UKFState(_StateEstimate, utility._FMU):
+class _StateEstimateModel(object):
+    '''Model with its own parameter data and measurements for state estimation.
+
+    Attributes other than the parameter data and measurements are those of
+    the model, so that the estimation always uses the current data of the 
+    model.  The measurements are copies of the measurement dictionaries of
+    the model, so that the simulated measurements of the estimation are not
+    set in the model.
+
+    Parameters
+    ----------
+    Model : mpcpy.models.Modelica object
+        Model of the state estimation.
+    parameter_data : dictionary
+        Parameter data used in place of that of the model.
+
+    '''
+
+    def __init__(self, Model, parameter_data):
+        '''Constructor of the state estimation model.
+
+        '''
+
+        self._Model = Model;
+        self.parameter_data = parameter_data;
+        self._copy_measurements();
+
+    def _copy_measurements(self):
+        '''Copy the measurement dictionaries of the model.
+
+        Yields
+        ------
+        measurements : dictionary
+            Copy of the measurement dictionaries of the model, which refer 
+            to the same variables.
+
+        '''
+
+        self.measurements = dict((key, dict(value)) for key, value in self._Model.measurements.items());
+
+    def __getattr__(self, name):
+        '''Get other attributes from the model.
+
+        '''
+
+        if name == '_Model':
+            raise AttributeError(name);
+
+        return getattr(self._Model, name);
+
+class UKFState(_StateEstimate, _UKF):
     '''State estimation method using the Unscented Kalman Filter.
     
     This estimation method uses the UKF implementation EstimationPy_.
     
     .. _EstimationPy: https://github.com/lbl-srg/EstimationPy
+    
+    In streaming mode, the filter keeps its estimate and the square root 
+    covariance of the estimated states after each estimation.  If the next
+    estimation period contains the final time of the previous one, only 
+    the measurements after it are assimilated, starting from the kept 
+    estimate, so that the cost of an estimation does not grow with the 
+    period.  Cross covariances between states are not kept, since 
+    EstimationPy takes the initial covariance of each state separately.  
+    Otherwise, the whole period is filtered as without streaming.
+
+    Attributes
+    ----------
+    estimate_options : dictionary
+        Specifies options for state estimation with the following keys:
+        -streaming : True to use the streaming mode.  Default is False.
+    update_statistics : list of dictionaries
+        Statistics of each estimation with the following keys:
+        -latency : wall-clock time of the estimation in seconds.
+        -start_time : start of the filtered period in UTC.
+        -samples : number of filter steps after the start.
+        -innovation_mean : {"Measurement Name" : mean of the measured minus
+        predicted output}.
+        -innovation_std : {"Measurement Name" : standard deviation of the 
+        measured minus predicted output}.
+        -normalized_innovation_squared : mean over the steps of the sum of 
+        the squared innovations normalized by the predicted output standard
+        deviations.
 
     '''
 
@@ -544,119 +727,97 @@ class UKFState(_StateEstimate, utility._FMU):
         fmupath = Model.fmupath
         # Instantiate UKF model
         self.model = ukf_model.Model(fmupath);
+        # Initialize options and streaming state
+        self.estimate_options = {};
+        self.estimate_options['streaming'] = False;
+        self.update_statistics = [];
+        self._posterior_time_utc = None;
+        self._posterior_sqrtP = None;
         
     def _estimate(self, Model):
         '''Perform UKF estimation.
 
         '''
 
+        time_start = time.time();
         estimationpy_logging.configure_logger(log_level = logging.INFO, log_level_console = logging.INFO, log_level_file = logging.INFO)
-        # Write the inputs, measurements, and parameters to csv
-        self._writeukfcsv(Model);
-        # Select inputs
-        for key in Model.input_names:
-            inputvar = self.model.get_input_by_name(key);
-            inputvar.get_csv_reader().open_csv(self.csv_path);
-            inputvar.get_csv_reader().set_selected_column(key);    
-        # Select outputs
-        for key in Model.measurement_variable_list:
-            outputvar = self.model.get_output_by_name(key);
-            outputvar.get_csv_reader().open_csv(self.csv_path);
-            outputvar.get_csv_reader().set_selected_column(key);        
-            outputvar.set_measured_output()
-            outputvar.set_covariance(0.5);
-        # Select the states to be estimated
-        i = 0;
-        for key in Model.estimated_state_data.keys():
-            self.model.add_variable(self.model.get_variable_object(key));
-            var = self.model.get_variables()[i];
-            var.set_initial_value(Model.estimated_state_data[key]['Value'].get_base_data());
-            i = i + 1;
-        # Initialize the model for the simulation
-        self.model.initialize_simulator();
-        # Set model parameters
-        for name in Model.parameter_data.keys():
-            self.model.set_real(self.model.get_variable_object(name),Model.parameter_data[name]['Value'].get_base_data());
-        # Instantiate the UKF for the FMU
-        ukf_FMU = UkfFmu(self.model);
-        # Start filter
-        t0 = pd.to_datetime(0, unit = "s", utc = True);
-        t1 = pd.to_datetime(Model.elapsed_seconds, unit = "s", utc = True);
-        self.res_est = ukf_FMU.filter(start = t0, stop = t1);
+        # Continue from the kept estimate if streaming
+        streaming = self.estimate_options['streaming'] and self._posterior_time_utc is not None \
+                    and Model.start_time_utc <= self._posterior_time_utc < Model.final_time_utc;
+        if streaming:
+            start_time_utc = self._posterior_time_utc;
+        else:
+            start_time_utc = Model.start_time_utc;
+        # Write the inputs, measurements, and parameters and select them
+        self._open_ukf_data(Model, start_time_utc = start_time_utc);
+        try:
+            # Select the states to be estimated
+            if not self.model.get_variables():
+                for key in Model.estimated_state_data.keys():
+                    self.model.add_variable(self.model.get_variable_object(key));
+            i = 0;
+            for key in Model.estimated_state_data.keys():
+                var = self.model.get_variables()[i];
+                var.set_initial_value(Model.estimated_state_data[key]['Value'].get_base_data());
+                if streaming:
+                    # EstimationPy takes the covariance of a state as the 
+                    # diagonal of the square root covariance matrix
+                    var.set_covariance(self._posterior_sqrtP[i][i]);
+                i = i + 1;
+            # Initialize the model for the simulation
+            self.model.initialize_simulator();
+            # Set model parameters
+            for name in Model.parameter_data.keys():
+                self.model.set_real(self.model.get_variable_object(name),Model.parameter_data[name]['Value'].get_base_data());
+            # Instantiate the UKF for the FMU
+            ukf_FMU = UkfFmu(self.model);
+            # Start filter
+            t0 = pd.to_datetime(0, unit = "s", utc = True);
+            t1 = pd.to_datetime(self.elapsed_seconds, unit = "s", utc = True);
+            self.res_est = ukf_FMU.filter(start = t0, stop = t1);
+        finally:
+            self._remove_ukf_data();
         # Update parameter results
         self._get_state_results(Model);
+        # Keep the estimate for streaming
+        self._posterior_time_utc = Model.final_time_utc;
+        self._posterior_sqrtP = np.array(self.res_est[2][-1]);
+        self._update_statistics(Model, start_time_utc, time.time() - time_start);
+        
+    def _update_statistics(self, Model, start_time_utc, latency):
+        '''Append the statistics of an estimation to the update statistics.
         
-    def _writeukfcsv(self, Model):
-        '''Write the UKF csv file.
-
         '''
-
-        # Collect additional inputs for csv file     
-        self._additional_inputs = {};
-        # Measurements
-        for key_mea in Model.measurement_variable_list:
-            variable = Model.measurements[key_mea];
-            self._additional_inputs[key_mea] = {};
-            self._additional_inputs[key_mea] = variable['Measured'];
-        # Parameters
-        free_parameters = [];
-        for key_par in Model.parameter_data.keys():
-            variable = Model.parameter_data[key_par];
-            if variable['Free'].get_base_data():
-                free_parameters.append(key_par)
-                time = self._additional_inputs[key_mea].get_base_data().index.values;
-                data = variable['Value'].get_base_data()*np.ones(len(time));
-                unit = variable['Value'].get_base_unit();
-                ts = pd.Series(index = time, data = data)
-                self._additional_inputs[key_par] = variables.Timeseries(key_par+'_ukf', ts, unit);
-                
-        # Create mpcpy ts list
-        self._input_mpcpy_ts_list = [];
-        # Weather
-        for key in Model.weather_data.keys():
-            if key in Model.input_names:
-                self._input_mpcpy_ts_list.append(Model.weather_data[key]);
-        # Internal
-        for zone in Model.internal_data.keys():
-            for intLoad in ['intCon', 'intRad', 'intLat']:
-                if intLoad+'_'+zone in Model.input_names:
-                    self._input_mpcpy_ts_list.append(Model.internal_data[zone][intLoad]);
-        # Controls
-        for key in Model.control_data.keys():
-            if key in Model.input_names:
-                self._input_mpcpy_ts_list.append(Model.control_data[key]);                     
-        # Other inputs                   
-        for key in Model.other_inputs.keys():
-            if key in Model.input_names:
-                self._input_mpcpy_ts_list.append(Model.other_inputs[key]);
-        # Add measurements and parameters
-        for key in self._additional_inputs.keys():
-            self._input_mpcpy_ts_list.append(self._additional_inputs[key]);
-            
-        # Create input object to write to csv
-        # Set timing
-        self.start_time_utc = Model.start_time_utc;
-        self.final_time_utc = Model.final_time_utc;   
-        self._global_start_time_utc = Model._global_start_time_utc
-        self.elapsed_seconds = Model.elapsed_seconds;  
-        self.total_elapsed_seconds = Model.total_elapsed_seconds;
-        self._create_input_object_from_input_mpcpy_ts_list(self._input_mpcpy_ts_list)
-        # Write to csv
-        self.csv_path = 'ukf.csv';                                               
-        with open(self.csv_path, 'wb') as f:
-            ukfwriter = csv.writer(f);
-            ukfwriter.writerow(['time'] + list(self._input_object[0]));
-            for i in range(len(self._input_object[1][:,0])):
-                ukfwriter.writerow(self._input_object[1][i]);
-
+        
+        # Times of the filter steps after the start
+        seconds = np.array([(t - self.res_est[0][0]).total_seconds() for t in self.res_est[0][1:]]);
+        times = start_time_utc + pd.to_timedelta(seconds, unit = 's');
+        y = np.array(self.res_est[3][1:]).reshape(len(seconds), -1);
+        sy = np.array([np.diag(np.atleast_2d(x)) for x in self.res_est[4][1:]]).reshape(len(seconds), -1);
+        statistics = {'latency' : latency, \
+                      'start_time' : start_time_utc, \
+                      'samples' : len(seconds), \
+                      'innovation_mean' : {}, \
+                      'innovation_std' : {}};
+        normalized = np.zeros(len(seconds));
+        for j, key in enumerate(Model.measurement_variable_list):
+            measured = Model.measurements[key]['Measured'].get_base_data().reindex(times).values;
+            innovation = measured - y[:, j];
+            statistics['innovation_mean'][key] = np.nanmean(innovation) if len(seconds) else np.nan;
+            statistics['innovation_std'][key] = np.nanstd(innovation) if len(seconds) else np.nan;
+            with np.errstate(divide = 'ignore', invalid = 'ignore'):
+                normalized = normalized + (innovation/sy[:, j])**2;
+        statistics['normalized_innovation_squared'] = np.nanmean(normalized) if len(seconds) else np.nan;
+        self.update_statistics.append(statistics);
+        
     def _get_state_results(self, Model):
         '''Update the state data dictionary in the model with ukf results.
         
         '''
         
         i = 0;
+        fmu_variable_units = Model._get_fmu_variable_units();
         for key in Model.estimated_state_data.keys():
-            fmu_variable_units = Model._get_fmu_variable_units();
             unit = self._get_unit_class_from_fmu_variable_units(key, fmu_variable_units);
             if not unit:
                 unit = units.unit1;
@@ -670,8 +831,27 @@ class RMSE(_Validate):
     '''Validation method that computes the RMSE between estimated and measured data.
     
     Only modeled values with measurements corresponding to the same time
-    are considered in the calculation of RMSE.  If a measurement is 
-    detected as missing, a warning is printed.
+    are considered in the calculation of RMSE.  If measurements are 
+    detected as missing, one warning is printed for each measurement 
+    variable.
+    
+    The metrics listed in the ``'metrics'`` key of ``validate_options`` are
+    computed in the same pass as the RMSE, from the errors e = estimated - 
+    measured at the n considered times and the mean m of the measured data 
+    at those times:
+    
+    - RMSE - sqrt(sum(e**2)/n)
+    - CVRMSE - RMSE/m
+    - NMBE - sum(e)/(n*m)
+    - MAE - sum(abs(e))/n
+    - MaxError - max(abs(e))
+    
+    Attributes
+    ----------
+    validate_options : dictionary
+        Specifies options for validation with the following keys:
+        -metrics : list of the names of the metrics to compute.  Default is 
+        all of the above.
     
     Yields
     ------
@@ -679,6 +859,14 @@ class RMSE(_Validate):
         {"Measurement Name" : mpcpy.Variables.Static}.
         Attribute of the model object that contains the RMSE for each 
         measurement variable used to perform the validation in base units.
+    validation_metrics : dictionary
+        {"Measurement Name" : {"Metric Name" : mpcpy.Variables.Static}}.
+        Attribute of the model object that contains the metrics for each
+        measurement variable in base units.  CVRMSE and NMBE are unitless.
+    missing_times : dictionary
+        {"Measurement Name" : pandas DatetimeIndex}.
+        Attribute of the model object that contains the times of modeled 
+        values missing in the measured data.
     
     '''
 
@@ -687,30 +875,52 @@ class RMSE(_Validate):
         
         '''
 
-        pass;
+        self.validate_options = {};
+        self.validate_options['metrics'] = ['RMSE', 'CVRMSE', 'NMBE', 'MAE', 'MaxError'];
 
     def _validate(self, Model, validate_filename, plot = 1):
         '''Perform the validation.
         
         '''
 
+        for metric in self.validate_options['metrics']:
+            if metric not in _validation_metric_units:
+                raise NameError('Validation metric "{0}" unknown.  Choose from {1}.'.format(metric, sorted(_validation_metric_units.keys())));
         Model.RMSE = {};
+        Model.validation_metrics = {};
+        Model.missing_times = {};
         for key in Model.measurements.keys():
             data = Model.measurements[key]['Measured'].get_base_data().loc[Model.start_time_utc:Model.final_time_utc];
             data_est = Model.measurements[key]['Simulated'].get_base_data().loc[Model.start_time_utc:Model.final_time_utc];
-            summed = 0;
-            length = 0;
-            for i in range(len(data_est)):
-                t = data_est.index.values[i]
-                try:
-                    diff = (data_est.loc[t] - data.loc[t])**2
-                    summed = summed + diff;
-                    length = length + 1;
-                except KeyError:
-                    print('WARNING: Time {0} missing in measured data.  Model value at time is {1}.'.format(t,data_est.loc[t]));
-            RMSE = np.sqrt(summed/length);
+            # Align measured data on estimated data
+            times = data.index.asi8;
+            order = np.argsort(times, kind = 'mergesort');
+            times = times[order];
+            times_est = data_est.index.asi8;
+            i = np.minimum(np.searchsorted(times, times_est), max(len(times) - 1, 0));
+            if len(times):
+                found = times[i] == times_est;
+            else:
+                found = np.zeros(len(times_est), dtype = bool);
+            if not found.all():
+                Model.missing_times[key] = data_est.index[~found];
+                print('WARNING: {0} times missing in measured data of {1} between {2} and {3}.  See missing_times attribute of model.'.format( \
+                      (~found).sum(), key, Model.missing_times[key][0], Model.missing_times[key][-1]));
+            else:
+                Model.missing_times[key] = data_est.index[:0];
+            measured = data.values[order][i[found]].astype(float);
+            error = data_est.values[found].astype(float) - measured;
+            # Compute metrics
             unit_class = Model.measurements[key]['Measured'].get_base_unit();
-            Model.RMSE[key] = variables.Static('RMSE_'+key, RMSE, unit_class);
+            values = _get_validation_metrics(error, measured);
+            Model.RMSE[key] = variables.Static('RMSE_'+key, values['RMSE'], unit_class);
+            Model.validation_metrics[key] = {};
+            for metric in self.validate_options['metrics']:
+                if _validation_metric_units[metric] is None:
+                    metric_unit = unit_class;
+                else:
+                    metric_unit = _validation_metric_units[metric];
+                Model.validation_metrics[key][metric] = variables.Static(metric+'_'+key, values[metric], metric_unit);
         if plot == 1:
             self._plot_simple(Model, validate_filename);
             
@@ -734,6 +944,9 @@ class QueueModel(_OccupancyMethod):
     simulate_options : dictionary
         Specifies options for model simulation.  
         -iter_num : defines the number of iterations for monte-carlo simulation.
+        -seed : defines the seed of the random numbers of the monte-carlo 
+        simulation, so that simulations are reproducible.  None to use the 
+        global numpy random state.
 
     '''
 
@@ -749,6 +962,7 @@ class QueueModel(_OccupancyMethod):
         self.estimate_options['n_max'] = 24;
         self.simulate_options = {};
         self.simulate_options['iter_num'] = 100;
+        self.simulate_options['seed'] = None;
         
     def _estimate(self, Model):
         '''Use measured occupancy data to estimate the queue model parameters.
@@ -828,6 +1042,11 @@ class QueueModel(_OccupancyMethod):
 
         # Set the number of simulations for the Monte Carlo 
         iter_num = self.simulate_options['iter_num'];
+        # Set the random state of the Monte Carlo
+        if 'seed' in self.simulate_options and self.simulate_options['seed'] is not None:
+            random_state = np.random.RandomState(self.simulate_options['seed']);
+        else:
+            random_state = None;
         # Initialize variables 
         ts_pred = pd.Series();
         ts_std = pd.Series();
@@ -841,41 +1060,14 @@ class QueueModel(_OccupancyMethod):
             lam_vec[:] = np.NAN
             mu_vec = np.empty((self.points_per_day,))
             mu_vec[:] = np.NAN
-            jmptimes_mc = [None]*iter_num # create an empty list of size iter_num
-            syssize_mc = np.empty((self.points_per_day,iter_num))
-            syssize_mc[:] = np.NAN
-            time_int = np.arange(self.points_per_day)
             nstart = 0
             for i in range(len(seg_point_added)-1):
                 lam = Model.parameters_data['lam'][day]['Value'].get_base_data()[i];
                 mu = Model.parameters_data['mu'][day]['Value'].get_base_data()[i];
                 lam_vec[seg_point_added[i]:seg_point_added[i+1]] = lam;
                 mu_vec[seg_point_added[i]:seg_point_added[i+1]] = mu;
-            for iter_idx in range(iter_num):
-                jmptimes, syssize = simulate_queue(self.points_per_day, lam_vec, mu_vec, nstart, self.empty_time[day])
-                if syssize is None:
-                    jmptimes_mc[iter_idx] = None
-                    syssize_mc[:, iter_idx] = np.zeros((self.points_per_day,))
-                    continue
-                if np.any(syssize <0):
-                    pdb.set_trace()
-                    raise ValueError('negative syssize')
-                if jmptimes is None:
-                    jmptimes_mc[iter_idx] = 0
-                    syssize_mc[:, iter_idx] = 0
-                else:
-                    # round jmptimes to the nearest integer
-                    jmptimes_d, ia = unique_last(np.round(jmptimes))
-                    syssize_d = syssize[ia]
-                    if jmptimes_d[0] != 0:
-                        jmptimes_int = np.insert(jmptimes_d, 0, 0)
-                        syssize_int = np.insert(syssize_d, 0, 0)
-                    else:
-                        jmptimes_int = jmptimes_d
-                        syssize_int = syssize_d
-                    vq = interp1(jmptimes_int, syssize_int, time_int)
-                    jmptimes_mc[iter_idx] = jmptimes_d
-                    syssize_mc[:, iter_idx] = vq
+            # Simulate all replicates of the day at once
+            syssize_mc = simulate_queue_batch(self.points_per_day, lam_vec, mu_vec, nstart, self.empty_time[day], iter_num, random_state);
             prediction = np.mean(syssize_mc, axis=1);
             std = np.std(syssize_mc, axis=1);
             # Convert current prediction to pandas timeseries
@@ -958,7 +1150,7 @@ class Modelica(_Model, utility._FMU, utility._Building):
         ``'from_geography'``, then geography kwarg is required.
     geography : list or tuple, optional
         List or tuple with (latitude, longitude) in degrees.   
-    save_parameter_input_data: boolean
+    save_parameter_input_data: boolean or string
         True to output the parameter and input data set for simulations and optimizations
         Saved files are:
         "mpcpy_simulation_parameters_model.csv"
@@ -967,7 +1159,12 @@ class Modelica(_Model, utility._FMU, utility._Building):
         "mpcpy_simulation_inputs_optimization_initial.csv"
         "mpcpy_optimization_parameters.csv"
         "mpcpy_optimization_inputs.csv"
+        "mpcpy_simulation_results_model.csv"
+        "mpcpy_simulation_results_optimization_initial.csv"
+        "mpcpy_optimization_results.csv"
         Times will be in UTC.
+        If ``'parquet'``, the inputs and results are saved to parquet files 
+        with the extension ".parquet" instead.
         Default is False.
 
     Attributes
@@ -1017,7 +1214,7 @@ class Modelica(_Model, utility._FMU, utility._Building):
         self.set_state_estimate_method(state_estimate_method);
         self.set_validate_method(validate_method);
         
-    def parameter_estimate(self, start_time, final_time, measurement_variable_list, global_start=0, seed=None, use_initial_values=True):
+    def parameter_estimate(self, start_time, final_time, measurement_variable_list, global_start=0, seed=None, use_initial_values=True, processes=1, target_J=None):
         '''Estimate the parameters of the model.
         
         The estimation of the parameters is based on the data in the 
@@ -1064,11 +1261,30 @@ class Modelica(_Model, utility._FMU, utility._Building):
         use_initial_values : boolean, optional
             True to include initial parameter values in the estimation iterations.
             Default is True.
+        processes : int, optional
+            Number of worker processes for the global start algorithm.  The 
+            workers are forked from the current process, which requires a 
+            Unix operating system, so each iterates on its own copy of the 
+            model.  The iterations and the chosen estimate for a given seed 
+            are the same for any number of processes.
+            Default is 1, which runs the iterations in the current process.
+        target_J : float, optional
+            Objective value at which the global start algorithm stops.  
+            The iterations after the first one in order of iteration that 
+            reaches the target are not included in the global estimate 
+            data.
+            Default is None, which runs all iterations.
 
         Yields
         ------
         Updates the ``'Value'`` key for each estimated parameter in the 
         parameter_data attribute.
+        
+        With global start, the chosen estimate is validated, so that the 
+        RMSE attribute and the simulated measurements are those of the 
+        chosen estimate, and the optimization statistics of the estimation 
+        method are those from before the global start.  The iterations are 
+        saved in the glo_est_data attribute.
 
         '''
         
@@ -1117,44 +1333,109 @@ class Modelica(_Model, utility._FMU, utility._Building):
                 if use_initial_values:
                     par_vals[par].append(self.parameter_data[par]['Value'].display_data())
             # Estimate for each sample
-            J = float('inf');
-            par_best = dict();
-            glo_est_data = dict()
             if use_initial_values:
                 iterations = range(global_start+1)
             else:
                 iterations = range(global_start)
-            for i in iterations:
-                # Create dictionary to save all estimation iteration data
-                glo_est_data[i] = dict()
-                # Set lhs sample values for each parameter
-                for par in par_vals.keys():
-                    # Use latin hypercube selections
-                    self.parameter_data[par]['Value'].set_data(par_vals[par][i]);
-                    glo_est_data[i][par] = par_vals[par][i]
-                # Make estimate for iteration
-                self._parameter_estimate_method._estimate(self);
-                # Validate estimate for iteration
-                self.validate(start_time, final_time, 'validate', plot = 0);
-                # Save RMSE for initial_guess
-                for key in self.RMSE:
-                    glo_est_data[i]['RMSE_{0}'.format(key)] = self.RMSE[key].display_data();
-                # If solve succeeded, compare objective and if less, save best par values
-                solver_message = self._parameter_estimate_method.opt_problem.get_optimization_statistics()[0]
-                J_curr = self._parameter_estimate_method.opt_problem.get_optimization_statistics()[2]
-                glo_est_data[i]['Message'] = solver_message
-                glo_est_data[i]['J'] = J_curr
+            tasks = [(i, dict([(par, par_vals[par][i]) for par in free_pars]), start_time, final_time) for i in iterations];
+            values_init = dict([(par, self.parameter_data[par]['Value'].display_data()) for par in free_pars]);
+            opt_problem = self._parameter_estimate_method.opt_problem;
+            solve_state = opt_problem._get_solve_state();
+            results = self._run_global_start(tasks, processes, target_J);
+            # Restore the solve state, which only the current process changes
+            opt_problem._set_solve_state(solve_state);
+            # Choose best estimate in order of iteration
+            J = float('inf');
+            par_best = dict();
+            glo_est_data = dict()
+            for i, data, par_est in sorted(results):
+                glo_est_data[i] = data;
+                J_curr = data['J'];
+                solver_message = data['Message'];
                 if ((J_curr < J) and (J_curr > 0.0)) or ((J_curr < J) and (solver_message == 'Solve_Succeeded')):
                     J = J_curr;
-                    for par in free_pars:
-                        par_best[par] = self.parameter_data[par]['Value'].display_data();
+                    par_best = par_est;
             # Save all estimates
             glo_est_data['J_Best'] = J
             self.glo_est_data = glo_est_data
-            # Set best parameters in model if found
-            if par_best:
-                for par in par_vals.keys():
-                    self.parameter_data[par]['Value'].set_data(par_best[par]);
+            # Set best parameters in model if found, otherwise initial values
+            if not par_best:
+                par_best = values_init;
+            for par in par_vals.keys():
+                self.parameter_data[par]['Value'].set_data(par_best[par]);
+            # Validate the chosen estimate in this process
+            self.validate(start_time, final_time, 'validate', plot = 0);
+        
+    def _run_global_start(self, tasks, processes, target_J):
+        '''Run global start estimation iterations until done or target reached.
+
+        Returns a list of (iteration, glo_est_data entry, estimated free 
+        parameter values) for the completed iterations.
+
+        '''
+
+        global _global_start_model
+        results = [];
+        if processes == 1:
+            for task in tasks:
+                results.append(self._global_start_iteration(*task));
+                if self._global_start_target_reached(results[-1][1], target_J):
+                    break
+            return results
+        _global_start_model = self;
+        pool = multiprocessing.Pool(processes);
+        try:
+            # Results in order of iteration, so that the same iterations
+            # are kept for any number of processes
+            for result in pool.imap(_global_start_task, tasks):
+                results.append(result);
+                if self._global_start_target_reached(result[1], target_J):
+                    pool.terminate();
+                    break
+            else:
+                pool.close();
+        finally:
+            pool.join();
+            _global_start_model = None;
+
+        return results
+
+    def _global_start_iteration(self, i, initial_values, start_time, final_time):
+        '''Estimate and validate from one set of initial parameter guesses.
+
+        '''
+
+        # Create dictionary to save all estimation iteration data
+        data = dict();
+        # Set lhs sample values for each parameter
+        for par in initial_values.keys():
+            self.parameter_data[par]['Value'].set_data(initial_values[par]);
+            data[par] = initial_values[par];
+        # Make estimate for iteration
+        self._parameter_estimate_method._estimate(self);
+        # Validate estimate for iteration
+        self.validate(start_time, final_time, 'validate', plot = 0);
+        # Save RMSE for initial_guess
+        for key in self.RMSE:
+            data['RMSE_{0}'.format(key)] = self.RMSE[key].display_data();
+        # Save solver message and objective
+        opt_statistics = self._parameter_estimate_method.opt_problem.get_optimization_statistics();
+        data['Message'] = opt_statistics[0];
+        data['J'] = opt_statistics[2];
+        par_est = dict([(par, self.parameter_data[par]['Value'].display_data()) for par in initial_values.keys()]);
+
+        return (i, data, par_est)
+
+    def _global_start_target_reached(self, data, target_J):
+        '''Check if an iteration reached the target objective.
+
+        '''
+
+        if target_J is None:
+            return False
+        valid = (data['J'] > 0.0) or (data['Message'] == 'Solve_Succeeded');
+
+        return valid and data['J'] <= target_J
         
     def state_estimate(self, start_time, final_time, measurement_variable_list):
         '''Estimate the states of the model.
@@ -1184,7 +1465,8 @@ class Modelica(_Model, utility._FMU, utility._Building):
         each parameter corresponding to an estimated state in the 
         parameter_data attribute is also updated with the optimal result.
         Note that this is not the estimated state value at the current time, 
-        rather at the initial (historic) time of the state estimation.
+        rather at the initial (historic) time of the state estimation.  In 
+        moving horizon mode, the parameter_data attribute is not updated.
 
         '''
         
@@ -1296,6 +1578,60 @@ class Modelica(_Model, utility._FMU, utility._Building):
 
         self._validate_method = validate_method(self);
         
+    def get_validate_options(self):
+        '''Get the validation options for the model.
+
+        Returns
+        -------
+        validate_options : dictionary
+            Options for validation.  Please see documentation for specific 
+            validation method for more information.
+
+        '''
+
+        return self._validate_method.validate_options;
+        
+    def set_validate_options(self, validate_options):
+        '''Set the validation options for the model.
+
+        Parameters
+        ----------
+        validate_options : dictionary
+            Options for validation.  Please see documentation for specific 
+            validation method for more information.
+
+        '''
+
+        for key in self._validate_method.validate_options.keys():
+            self._validate_method.validate_options[key] = validate_options[key];
+        
+    def get_state_estimate_options(self):
+        '''Get the state estimation options for the model.
+
+        Returns
+        -------
+        estimate_options : dictionary
+            Options for state estimation.  Please see documentation for 
+            specific state estimation method for more information.
+
+        '''
+
+        return self._state_estimate_method.estimate_options;
+        
+    def set_state_estimate_options(self, estimate_options):
+        '''Set the state estimation options for the model.
+
+        Parameters
+        ----------
+        estimate_options : dictionary
+            Options for state estimation.  Please see documentation for 
+            specific state estimation method for more information.
+
+        '''
+
+        for key in self._state_estimate_method.estimate_options.keys():
+            self._state_estimate_method.estimate_options[key] = estimate_options[key];
+        
     def set_state_estimate_method(self, state_estimate_method):
         '''Set the state estimation method for the model.
 
@@ -1584,5 +1920,36 @@ class Occupancy(utility._mpcpyPandas, utility._Measurements):
         '''
 
         return self._occupancy_method.estimate_options;
-        
-        
\ No newline at end of file
+
+#%% Validation metric functions
+def _get_validation_metrics(error, measured):
+    '''Compute the validation metrics from aligned errors in one pass.
+    
+    Parameters
+    ----------
+    error : ``numpy`` array
+        Estimated minus measured values.
+    measured : ``numpy`` array
+        Measured values.
+        
+    Returns
+    -------
+    values : dictionary
+        {"Metric Name" : float}.  Metrics are NaN if there are no values.
+    
+    '''
+    
+    n = len(error);
+    if n == 0:
+        return dict((metric, np.nan) for metric in _validation_metric_units);
+    abs_error = np.abs(error);
+    mean = np.mean(measured);
+    rmse = np.sqrt(np.dot(error, error)/n);
+    with np.errstate(divide = 'ignore', invalid = 'ignore'):
+        values = {'RMSE' : rmse, \
+                  'CVRMSE' : rmse/mean, \
+                  'NMBE' : np.sum(error)/(n*mean), \
+                  'MAE' : np.sum(abs_error)/n, \
+                  'MaxError' : np.max(abs_error)};
+    
+    return values
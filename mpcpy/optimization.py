@@ -11,7 +11,7 @@ Classes
 =======
 
 .. autoclass:: mpcpy.optimization.Optimization
-    :members: optimize, set_problem_type, set_package_type,
+    :members: optimize, optimize_batch, set_problem_type, set_package_type,
               get_optimization_options, set_optimization_options,
               get_optimization_statistics,
 
@@ -39,11 +39,29 @@ import pandas as pd
 from mpcpy import utility
 from mpcpy import variables
 from mpcpy import units
-from pymodelica import compile_fmu
-from pyjmi import transfer_optimization_problem;
 from pyjmi.optimization.casadi_collocation import ExternalData
 import copy
 import os
+import multiprocessing
+import hashlib
+import time
+from pyfmi.common.io import Trajectory
+
+# Optimization object solved by batch worker processes, which inherit it 
+# when forked so that the compiled problem is not loaded again
+_batch_optimization = None;
+
+# Exodata attributes that batch scenarios can change, with their owner
+_batch_attributes = {'weather_data' : 'Model', 
+                     'internal_data' : 'Model', 
+                     'control_data' : 'Model', 
+                     'other_inputs' : 'Model', 
+                     'parameter_data' : 'Model', 
+                     'constraint_data' : 'Optimization'};
+# Attributes of the solver package and optimization changed by a solve
+_batch_package_attributes = ['res_opt', 'res_init', '_warm_start', '_res_opt_start_time_utc', \
+                             '_res_opt_final_time_utc', '_solve_log'];
+_batch_optimization_attributes = ['measurements', 'opt_input'];
 
 #%% Optimization Class
 class Optimization(utility._mpcpyPandas, utility._Measurements):
@@ -191,9 +209,17 @@ class Optimization(utility._mpcpyPandas, utility._Measurements):
 
         return self._package_type._set_optimization_options(opt_options);
 
-    def get_optimization_statistics(self):
+    def get_optimization_statistics(self, warm_start = False):
         '''Get the optimization result statistics from the solver package.
 
+        Parameters
+        ----------
+        warm_start : boolean, optional
+            True to get the statistics comparing warm-started and cold-started
+            solves instead of the statistics of the last solve.  See specific
+            documentation on solver package for more information.
+            Default is False.
+
         Returns
         -------
         opt_statistics : dictionary
@@ -201,8 +227,184 @@ class Optimization(utility._mpcpyPandas, utility._Measurements):
             documentation on solver package for more information.
 
         '''
-        opt_statistics = self._package_type._get_optimization_statistics();
+        opt_statistics = self._package_type._get_optimization_statistics(warm_start = warm_start);
         return opt_statistics;
+
+    def optimize_batch(self, start_time, final_time, scenarios, processes = None, **kwargs):
+        '''Solve the optimization problem for a batch of exodata scenarios.
+
+        The scenarios are solved in parallel worker processes.  The workers
+        are forked from the current process, so each inherits the compiled 
+        optimization problem instead of loading it again.  Forking requires
+        a Unix operating system unless ``processes`` is 1.  The model and
+        optimization exodata, measurements, and solutions are not changed by
+        solving the batch.  Each scenario is solved from a simulation of 
+        the model, so ``warm_start`` is not applied to any scenario and the
+        results do not depend on the order or number of processes.
+
+        Parameters
+        ----------
+        start_time : string
+            Start time of optimization period.
+        final_time : string
+            Final time of optimization period.
+        scenarios : list of dictionaries
+            Each scenario is a dictionary where the keys are any of 
+            ``'weather_data'``, ``'internal_data'``, ``'control_data'``, 
+            ``'other_inputs'``, ``'parameter_data'``, ``'constraint_data'``,
+            and ``'price_data'``, and the values are ``exodata`` data 
+            attributes.  The variables in a scenario replace those of the
+            same name in the model or optimization for that scenario only.
+        processes : int, optional
+            Number of worker processes.  1 solves the scenarios in the 
+            current process.
+            Default is None, which uses the number of cpus.
+        **kwargs
+            Keyword arguments passed to ``optimize()`` for all scenarios.
+
+        Returns
+        -------
+        results : dictionary
+            ``'control'`` is a dataframe of the optimal control timeseries 
+            and ``'measurements'`` is a dataframe of the optimization 
+            solution measurements, both in base units with columns indexed
+            by (scenario index, variable name).  ``'statistics'`` is a list
+            of the optimization statistics of each scenario.
+
+        '''
+
+        global _batch_optimization
+        if not scenarios:
+            raise ValueError('The batch needs at least one scenario.');
+        for scenario in scenarios:
+            for key in scenario.keys():
+                if key not in _batch_attributes and key != 'price_data':
+                    raise KeyError('Scenario key {0} is not one of {1}.'.format(key, sorted(_batch_attributes.keys()) + ['price_data']));
+        self._batch_state = self._get_batch_state();
+        self._batch_solve_state = self._get_solve_state();
+        _batch_optimization = self;
+        tasks = [(start_time, final_time, scenario, kwargs) for scenario in scenarios];
+        try:
+            if processes == 1:
+                scenario_results = [_optimize_scenario(task) for task in tasks];
+            else:
+                pool = multiprocessing.Pool(processes);
+                try:
+                    scenario_results = pool.map(_optimize_scenario, tasks, chunksize = 1);
+                finally:
+                    pool.close();
+                    pool.join();
+        finally:
+            _batch_optimization = None;
+            self._restore_batch_state(self._batch_state);
+            self._set_solve_state(self._batch_solve_state);
+        # Aggregate results
+        keys = range(len(scenario_results));
+        results = {'control' : pd.concat([result['control'] for result in scenario_results], axis = 1, keys = keys),
+                   'measurements' : pd.concat([result['measurements'] for result in scenario_results], axis = 1, keys = keys),
+                   'statistics' : [result['statistics'] for result in scenario_results]};
+
+        return results;
+
+    def _get_batch_state(self):
+        '''Get the exodata attributes that batch scenarios can change.
+
+        '''
+
+        state = {};
+        for key, owner in _batch_attributes.items():
+            if owner == 'Model':
+                state[key] = getattr(self.Model, key);
+            else:
+                state[key] = getattr(self, key);
+
+        return state;
+
+    def _set_batch_state(self, state, scenario):
+        '''Set the exodata attributes to copies of a state updated by a scenario.
+
+        '''
+
+        for key, owner in _batch_attributes.items():
+            data = dict(state[key]);
+            if key in scenario:
+                data.update(scenario[key]);
+            if owner == 'Model':
+                setattr(self.Model, key, data);
+            else:
+                setattr(self, key, data);
+
+    def _restore_batch_state(self, state):
+        '''Restore the original exodata attributes of a state.
+
+        '''
+
+        for key, owner in _batch_attributes.items():
+            if owner == 'Model':
+                setattr(self.Model, key, state[key]);
+            else:
+                setattr(self, key, state[key]);
+
+    def _get_solve_state(self):
+        '''Get the solutions and measurements that a solve changes.
+
+        '''
+
+        state = {'package' : {}, 'optimization' : {}, 'measurements' : {}};
+        for key in _batch_package_attributes:
+            if hasattr(self._package_type, key):
+                state['package'][key] = copy.copy(getattr(self._package_type, key)) if key == '_solve_log' else getattr(self._package_type, key);
+        for key in _batch_optimization_attributes:
+            if hasattr(self, key):
+                state['optimization'][key] = getattr(self, key);
+        for key in self.Model.measurements.keys():
+            state['measurements'][key] = dict(self.Model.measurements[key]);
+
+        return state;
+
+    def _set_solve_state(self, state):
+        '''Set the solutions and measurements to those of a state.
+
+        The measurement dictionaries of the model are updated in place, so
+        that they remain the objects of the caller.
+
+        '''
+
+        for owner, keys, saved in [(self._package_type, _batch_package_attributes, state['package']), \
+                                   (self, _batch_optimization_attributes, state['optimization'])]:
+            for key in keys:
+                if key in saved:
+                    setattr(owner, key, copy.copy(saved[key]) if key == '_solve_log' else saved[key]);
+                elif hasattr(owner, key):
+                    delattr(owner, key);
+        for key in state['measurements'].keys():
+            self.Model.measurements[key].clear();
+            self.Model.measurements[key].update(state['measurements'][key]);
+
+    def _optimize_scenario(self, start_time, final_time, scenario, kwargs):
+        '''Solve the optimization problem for one batch scenario.
+
+        '''
+
+        self._set_batch_state(self._batch_state, scenario);
+        # Solve independently of other scenarios, without a previous solution
+        self._set_solve_state(self._batch_solve_state);
+        if hasattr(self._package_type, 'res_opt'):
+            del self._package_type.res_opt;
+        kwargs = dict(kwargs);
+        if 'price_data' in scenario:
+            price_data = dict(kwargs.get('price_data', {}));
+            price_data.update(scenario['price_data']);
+            kwargs['price_data'] = price_data;
+        self.optimize(start_time, final_time, **kwargs);
+        # Get results for the time horizon
+        control_list = [self.Model.control_data[key] for key in self.Model.control_data.keys() if key in self.Model.input_names];
+        control = self._mpcpy_ts_list_to_dataframe(control_list);
+        result = {'control' : control.loc[self.start_time_utc:self.final_time_utc],
+                  'measurements' : self.get_base_measurements('Simulated'),
+                  'statistics' : self.get_optimization_statistics()};
+
+        return result;
         
     def _create_slack_variables(self):
         '''Create slack variables and their expressions from constraint data.
@@ -251,6 +453,17 @@ class Optimization(utility._mpcpyPandas, utility._Measurements):
 
         return slack_variables
 
+def _optimize_scenario(task):
+    '''Solve a batch scenario with the batch optimization object.
+
+    Module level so that it can be called by worker processes.
+
+    '''
+
+    start_time, final_time, scenario, kwargs = task;
+
+    return _batch_optimization._optimize_scenario(start_time, final_time, scenario, kwargs);
+
 #%% Problem Type Abstract Interface
 class _Problem(object):
     '''Interface for a problem type.
@@ -389,7 +602,7 @@ class _Package(object):
         pass;
 
     @abstractmethod
-    def _get_optimization_statistics(self):
+    def _get_optimization_statistics(self, warm_start = False):
         '''Get the optimization result statistics from the solver package.
 
         '''
@@ -563,7 +776,7 @@ class _ParameterEstimate(_Problem):
 
         '''
 
-        Optimization._package_type._parameterestimate(Optimization, kwargs['measurement_variable_list']);
+        Optimization._package_type._parameterestimate(Optimization, **kwargs);
 
     def _setup_jmodelica(self, JModelica, Optimization):
         '''Setup the optimization problem for JModelica.
@@ -593,6 +806,12 @@ class JModelica(_Package, utility._FMU):
     length of optimization horizon (same as if model is simulated).
     However, editing this option will overwrite this default.
 
+    The optimization problem is saved next to the model .mo file as 
+    <name>_<hash>.mop, where the hash is of the content of the problem, so
+    there is one file for each distinct problem of the model.  The files 
+    are kept for reuse by the compile cache and are not removed by MPCPy.
+    They can be deleted when no optimization is being instantiated.
+
     Notes
     -----
     ``optimize()`` kwargs:
@@ -608,6 +827,19 @@ class JModelica(_Package, utility._FMU):
     price_data : dictionary
         ``exodata`` price object data attribute.
         For EnergyCostMin problems only.
+    warm_start : boolean, optional
+        True to initialize the solution with the solution of the previous
+        ``optimize()`` call shifted forward to the new start time, instead 
+        of with a simulation of the model.  Used only if the previous time 
+        horizon contains the new start time, as in a receding horizon.  The 
+        iteration and time savings are returned by 
+        ``get_optimization_statistics(warm_start=True)``.
+        Default is False.
+    initial_guesses : dictionary, optional
+        {"Variable Name" : value} of constant initial guesses that replace
+        the trajectories of the previous solution in a warm start, such as 
+        for free parameters whose previous value no longer applies at the 
+        new start time.  Used only if ``warm_start`` is applied.
 
     '''
 
@@ -616,6 +848,8 @@ class JModelica(_Package, utility._FMU):
 
         '''
 
+        # Log of solves for warm start statistics
+        self._solve_log = [];
         # Setup JModelica optimization problem
         Optimization._problem_type._setup_jmodelica(self, Optimization);
         # Set default optimization options
@@ -626,7 +860,7 @@ class JModelica(_Package, utility._FMU):
 
         '''
 
-        self._simulate_initial(Optimization);
+        self._simulate_initial(Optimization, **kwargs);
         self._solve(Optimization);
         self._get_control_results(Optimization, **kwargs);
 
@@ -637,7 +871,7 @@ class JModelica(_Package, utility._FMU):
 
         price_data = kwargs['price_data'];
         self.other_inputs['pi_e'] = price_data['pi_e'];
-        self._simulate_initial(Optimization);
+        self._simulate_initial(Optimization, **kwargs);
         self._solve(Optimization);
         self._get_control_results(Optimization, **kwargs);
         
@@ -724,17 +958,17 @@ class JModelica(_Package, utility._FMU):
                 self.opt_problem.set('pi_d_{0}'.format(i+j), 0);
         print(self.demand_df)
         # Solve optimization problem
-        self._simulate_initial(Optimization);
+        self._simulate_initial(Optimization, **kwargs);
         self._solve(Optimization);   
         self._get_control_results(Optimization, **kwargs);
         
-    def _parameterestimate(self, Optimization, measurement_variable_list):
+    def _parameterestimate(self, Optimization, measurement_variable_list, **kwargs):
         '''Perform the parameter estimation.
 
         '''
 
         self.measurement_variable_list = measurement_variable_list;
-        self._simulate_initial(Optimization);
+        self._simulate_initial(Optimization, **kwargs);
         self._solve(Optimization);
         self._get_parameter_results(Optimization);
 
@@ -745,42 +979,41 @@ class JModelica(_Package, utility._FMU):
 
         # Open .mo
         mofile = open(self.Model.mopath,'r');
-        # Initiate .mop
-        self.moppath = self.Model.mopath+'p';
-        self.mopfile = open(self.moppath,'w');
+        # Initiate .mop in memory, saved by _save_mop when complete
+        self._mop_lines = [];
         # Copy .mo
         for line in mofile:
             # Write line to file
             if 'end ' + self.Model.modelpath.split('.')[0] in line:
                 break;
             elif 'within ;' not in line and 'annotation (uses' not in line and '(version="' not in line:
-                self.mopfile.write(line);
+                self._mop_lines.append(line);
         mofile.close();
         # Add initialization model to package.mop (must be same name as model in optimization)
-        self.mopfile.write('\n');
-        self.mopfile.write('  model ' + self.Model.modelpath.split('.')[-1] + '_initialize\n');
+        self._mop_lines.append('\n');
+        self._mop_lines.append('  model ' + self.Model.modelpath.split('.')[-1] + '_initialize\n');
         package = self.Model.modelpath.split('.')[1:];
-        self.mopfile.write('    ' + '.'.join(package) + ' mpc_model();\n');
+        self._mop_lines.append('    ' + '.'.join(package) + ' mpc_model();\n');
         # Instantiate optimization model inputs
         for key in self.Model.input_names:
-            self.mopfile.write('    input Real ' + key + '= mpc_model.' + key + ';\n');
+            self._mop_lines.append('    input Real ' + key + '= mpc_model.' + key + ';\n');
         # Add extra inputs required for optimization problem
         self._init_input_names = self.Model.input_names;
         self.other_inputs = copy.deepcopy(self.Model.other_inputs);
         for key in self.extra_inputs.keys():
             self._init_input_names.append(key);
             self.other_inputs[key] = self.extra_inputs[key];
-            self.mopfile.write('    input Real ' + key+';\n');
+            self._mop_lines.append('    input Real ' + key+';\n');
         # Add slack variable inputs required for optimization probelm (initial guess is 0 by default)
         for key in Optimization._slack_variables.keys():
-            self.mopfile.write('    input Real ' + Optimization._slack_variables[key]['Variable']+';\n');           
+            self._mop_lines.append('    input Real ' + Optimization._slack_variables[key]['Variable']+';\n');           
         # Instantiate cost function
-        self.mopfile.write('    Real J(start = 0, fixed=true);\n');
+        self._mop_lines.append('    Real J(start = 0, fixed=true);\n');
         # Define cost function
-        self.mopfile.write('  equation\n');
-        self.mopfile.write('    der(J) = '+self.objective+';\n');  
+        self._mop_lines.append('  equation\n');
+        self._mop_lines.append('    der(J) = '+self.objective+';\n');  
         # End initalization model
-        self.mopfile.write('  end ' + self.Model.modelpath.split('.')[-1] + '_initialize;\n');
+        self._mop_lines.append('  end ' + self.Model.modelpath.split('.')[-1] + '_initialize;\n');
         # Save the model path of the initialization and optimziation models
         self.mopmodelpath = self.Model.modelpath.split('.')[0] + '.' + self.Model.modelpath.split('.')[-1];
 
@@ -789,25 +1022,25 @@ class JModelica(_Package, utility._FMU):
 
         '''
 
-        self.mopfile.write('\n');
+        self._mop_lines.append('\n');
         if not demand_periods:
-            self.mopfile.write('  optimization ' + self.Model.modelpath.split('.')[-1] + '_optimize (objective = (J(finalTime)), startTime=start_time, finalTime=final_time)\n');
+            self._mop_lines.append('  optimization ' + self.Model.modelpath.split('.')[-1] + '_optimize (objective = (J(finalTime)), startTime=start_time, finalTime=final_time)\n');
         else:
             if demand_periods:
-                self.mopfile.write('  optimization ' + self.Model.modelpath.split('.')[-1] + '_optimize (objective = (J(finalTime) + z_0*pi_d_0')
+                self._mop_lines.append('  optimization ' + self.Model.modelpath.split('.')[-1] + '_optimize (objective = (J(finalTime) + z_0*pi_d_0')
                 for period in range(demand_periods-1):
-                    self.mopfile.write(' + z_{0}*pi_d_{0}'.format(period+1));
-                self.mopfile.write('), startTime=start_time, finalTime=final_time)\n');
+                    self._mop_lines.append(' + z_{0}*pi_d_{0}'.format(period+1));
+                self._mop_lines.append('), startTime=start_time, finalTime=final_time)\n');
         # Instantiate optimization model
-        self.mopfile.write('    extends ' + self.Model.modelpath.split('.')[-1] + '_initialize;\n');
+        self._mop_lines.append('    extends ' + self.Model.modelpath.split('.')[-1] + '_initialize;\n');
         # Add start time and final time parameter
-        self.mopfile.write('    parameter Real start_time = 0;\n');
-        self.mopfile.write('    parameter Real final_time = 86400;\n');
+        self._mop_lines.append('    parameter Real start_time = 0;\n');
+        self._mop_lines.append('    parameter Real final_time = 86400;\n');
         # If demand, add demand parameter
         if demand_periods:
             for period in range(demand_periods):
-                self.mopfile.write('    parameter Real z_{0}(free=true, min=0)=1e8;\n'.format(period));
-                self.mopfile.write('    parameter Real pi_d_{0};\n'.format(period));
+                self._mop_lines.append('    parameter Real z_{0}(free=true, min=0)=1e8;\n'.format(period));
+                self._mop_lines.append('    parameter Real pi_d_{0};\n'.format(period));
         # Remove control variables from input_names for optimization
         self.opt_input_names = [];
         for key in self._init_input_names:
@@ -820,55 +1053,53 @@ class JModelica(_Package, utility._FMU):
                     key_new = key.replace('.', '_') + '_' + field;
                     self.opt_input_names.append(key_new);
                     self.other_inputs[key_new] = Optimization.constraint_data[key][field]['Value'];
-                    self.mopfile.write('    input Real ' + key_new + ';\n');                    
+                    self._mop_lines.append('    input Real ' + key_new + ';\n');                    
         # Define constraint_data
-        self.mopfile.write('  constraint\n');
+        self._mop_lines.append('  constraint\n');
         for key in Optimization.constraint_data.keys():
             for field in Optimization.constraint_data[key]:
                 key_new = key.replace('.', '_') + '_' + field;
                 if field == 'GTE':
-                    self.mopfile.write('    mpc_model.' + key + ' >= ' + key_new + ';\n');
+                    self._mop_lines.append('    mpc_model.' + key + ' >= ' + key_new + ';\n');
                 elif field == 'dGTE':
-                    self.mopfile.write('    der(mpc_model.' + key + ') >= ' + key_new + ';\n');
+                    self._mop_lines.append('    der(mpc_model.' + key + ') >= ' + key_new + ';\n');
                 elif field == 'sGTE':
-                    self.mopfile.write('    mpc_model.' + key + ' + ' + Optimization._slack_variables[key_new]['Variable'] + ' >= ' + key_new + ';\n')
+                    self._mop_lines.append('    mpc_model.' + key + ' + ' + Optimization._slack_variables[key_new]['Variable'] + ' >= ' + key_new + ';\n')
                 elif field == 'LTE':
-                    self.mopfile.write('    mpc_model.' + key + ' <= ' + key_new + ';\n');
+                    self._mop_lines.append('    mpc_model.' + key + ' <= ' + key_new + ';\n');
                 elif field == 'dLTE':
-                    self.mopfile.write('    der(mpc_model.' + key + ') <= ' + key_new + ';\n');
+                    self._mop_lines.append('    der(mpc_model.' + key + ') <= ' + key_new + ';\n');
                 elif field == 'sLTE':
-                    self.mopfile.write('    mpc_model.' + key + ' - ' + Optimization._slack_variables[key_new]['Variable'] + ' <= ' + key_new + ';\n')
+                    self._mop_lines.append('    mpc_model.' + key + ' - ' + Optimization._slack_variables[key_new]['Variable'] + ' <= ' + key_new + ';\n')
                 elif field == 'Initial':
-                    self.mopfile.write('    mpc_model.' + key + '(startTime)=' + str(Optimization.constraint_data[key][field]['Value'].get_base_data()) + ';\n');
+                    self._mop_lines.append('    mpc_model.' + key + '(startTime)=' + str(Optimization.constraint_data[key][field]['Value'].get_base_data()) + ';\n');
                 elif field == 'Final':
-                    self.mopfile.write('    mpc_model.' + key + '(finalTime)=' + str(Optimization.constraint_data[key][field]['Value'].get_base_data()) + ';\n');
+                    self._mop_lines.append('    mpc_model.' + key + '(finalTime)=' + str(Optimization.constraint_data[key][field]['Value'].get_base_data()) + ';\n');
                 elif field == 'Cyclic':
-                    self.mopfile.write('    mpc_model.' + key + '(startTime)=mpc_model.' + key + '(finalTime);\n');
+                    self._mop_lines.append('    mpc_model.' + key + '(startTime)=mpc_model.' + key + '(finalTime);\n');
         # Add any slack variables
         for key in Optimization._slack_variables.keys():
-            self.mopfile.write('   ' + Optimization._slack_variables[key]['Variable'] + ' >= 0;\n');
+            self._mop_lines.append('   ' + Optimization._slack_variables[key]['Variable'] + ' >= 0;\n');
         # Add any demand contraints
         if demand_periods:
             for period in range(demand_periods):
-                self.mopfile.write('    mpc_model.' + Optimization.objective_variable + ' <= ' + 'z_{0} + z_hat_{0}'.format(period) + ';\n');
+                self._mop_lines.append('    mpc_model.' + Optimization.objective_variable + ' <= ' + 'z_{0} + z_hat_{0}'.format(period) + ';\n');
         # End optimization portion of package.mop
-        self.mopfile.write('  end ' + self.Model.modelpath.split('.')[-1] + '_optimize;\n');
+        self._mop_lines.append('  end ' + self.Model.modelpath.split('.')[-1] + '_optimize;\n');
         # End package.mop and save
-        self.mopfile.write('end ' + self.Model.modelpath.split('.')[0] + ';\n');
-
-        # Close files
-        self.mopfile.close();
+        self._mop_lines.append('end ' + self.Model.modelpath.split('.')[0] + ';\n');
+        self._save_mop();
 
     def _write_parameter_estimate_mop(self):
         '''Complete the mop file for a parameter estimation problem.
 
         '''
 
-        self.mopfile.write('\n');
-        self.mopfile.write('optimization ' + self.Model.modelpath.split('.')[-1] + '_optimize (startTime=start_time, finalTime=final_time)\n');
+        self._mop_lines.append('\n');
+        self._mop_lines.append('optimization ' + self.Model.modelpath.split('.')[-1] + '_optimize (startTime=start_time, finalTime=final_time)\n');
         # Add start time and final time parameter
-        self.mopfile.write('    parameter Real start_time = 0;\n');
-        self.mopfile.write('    parameter Real final_time = 86400;\n');
+        self._mop_lines.append('    parameter Real start_time = 0;\n');
+        self._mop_lines.append('    parameter Real final_time = 86400;\n');
         #  Instantiate MPC model with free parameters
         i = 1;
         free_parameters = [];
@@ -889,17 +1120,52 @@ class JModelica(_Package, utility._FMU):
                 else:
                     line = '      mpc_model.' + key + '(free=true, initialGuess='+str(self.Model.parameter_data[key]['Value'].get_base_data())+', min='+str(self.Model.parameter_data[key]['Minimum'].get_base_data())+', max='+str(self.Model.parameter_data[key]['Maximum'].get_base_data())+'),\n';
                 i = i + 1;
-            self.mopfile.write(line);
+            self._mop_lines.append(line);
         # End optimization portion of package.mop
-        self.mopfile.write('end ' + self.Model.modelpath.split('.')[-1] + '_optimize;\n');
+        self._mop_lines.append('end ' + self.Model.modelpath.split('.')[-1] + '_optimize;\n');
         # End package.mop and save
-        self.mopfile.write('end ' + self.Model.modelpath.split('.')[0] + ';\n');
-        # Close files
-        self.mopfile.close();
+        self._mop_lines.append('end ' + self.Model.modelpath.split('.')[0] + ';\n');
+        self._save_mop();
+
+    def _save_mop(self):
+        '''Save the mop file next to the .mo under a name unique to its content.
+
+        The file name ends with the hash of its text, so optimizations of 
+        different problems never overwrite each other's file and an 
+        unchanged problem keeps the same file for the compile cache.  It is
+        saved in the directory of the .mo so that relative resource paths 
+        and other files of the package still resolve.  It is written to a 
+        temporary file first and renamed into place so that concurrent 
+        processes never read a partial file.
+
+        Yields
+        ------
+        moppath : string
+            Attribute for path to the mop file.
+
+        '''
 
-    def _simulate_initial(self, Optimization):
+        mop = ''.join(self._mop_lines);
+        key = hashlib.sha1(mop).hexdigest();
+        self.moppath = '{0}_{1}.mop'.format(os.path.splitext(self.Model.mopath)[0], key[:12]);
+        if os.path.exists(self.moppath):
+            return
+        tmp_path = '{0}.{1}.tmp'.format(self.moppath, os.getpid());
+        with open(tmp_path, 'w') as f:
+            f.write(mop);
+        try:
+            os.rename(tmp_path, self.moppath);
+        except OSError:
+            # Another process wrote the same file first
+            os.remove(tmp_path);
+
+    def _simulate_initial(self, Optimization, **kwargs):
         '''Simulate the model for an initial guess of the optimization solution.
 
+        If ``warm_start`` is True in kwargs and the previous solution covers 
+        the new start time, the previous solution shifted to the new start
+        time is used as the initial guess instead.
+
         '''
 
         # Update exogenous except constraints and only other inputs that are in model
@@ -939,10 +1205,25 @@ class JModelica(_Package, utility._FMU):
         self._global_start_time_utc = Optimization._global_start_time_utc
         self.elapsed_seconds = Optimization.elapsed_seconds;
         self.total_elapsed_seconds = Optimization.total_elapsed_seconds;
+        # Warm start from previous solution if it covers the new start time
+        self._warm_start = False;
+        if 'warm_start' in kwargs and kwargs['warm_start'] and hasattr(self, 'res_opt'):
+            shift = (self.start_time_utc - self._res_opt_start_time_utc).total_seconds();
+            if shift >= 0 and self.start_time_utc < self._res_opt_final_time_utc:
+                self._sim_opts['ncp'] = self._get_simulation_ncp();
+                if 'initial_guesses' in kwargs:
+                    self.res_init = _ShiftedResult(self.res_opt, shift, kwargs['initial_guesses']);
+                else:
+                    self.res_init = _ShiftedResult(self.res_opt, shift);
+                self._warm_start = True;
+                self._initial_time = 0.0;
+                return
         # Simulate fmu
         self._save_parameter_input_data = self.Model._save_parameter_input_data
         self._save_parameter_input_filename = 'optimization_initial'
+        time_start = time.time();
         self._simulate_fmu();
+        self._initial_time = time.time() - time_start;
         # Store initial simulation
         self.res_init = self._res;
 
@@ -957,7 +1238,7 @@ class JModelica(_Package, utility._FMU):
         self._create_input_object_from_input_mpcpy_ts_list(self._input_mpcpy_ts_list_opt);
         # Save inputs if wanted
         if self.Model._save_parameter_input_data:
-            self._input_df.to_csv('mpcpy_optimization_inputs.csv')
+            utility._save_df(self._input_df, 'mpcpy_optimization_inputs', self.Model._save_parameter_input_data);
         # Create ExternalData structure
         self._create_external_data(Optimization);
         # Set optimization options
@@ -991,7 +1272,15 @@ class JModelica(_Package, utility._FMU):
         self.opt_problem.set('start_time', start_time);
         self.opt_problem.set('final_time', final_time);
         # Optimize
+        time_start = time.time();
         self.res_opt = self.opt_problem.optimize(options=self.opt_options);
+        # Log solve for warm start statistics
+        self._res_opt_start_time_utc = self.start_time_utc;
+        self._res_opt_final_time_utc = self.final_time_utc;
+        self._solve_log.append({'warm_start' : self._warm_start, \
+                                'iterations' : self.res_opt.get_solver_statistics()[1], \
+                                'initial_time' : self._initial_time, \
+                                'solve_time' : time.time() - time_start});
 
     def _create_external_data(self, Optimization):
         '''Define external data inputs to optimization problem.
@@ -1043,6 +1332,8 @@ class JModelica(_Package, utility._FMU):
             time = self.res_opt['time']
         # Get fmu variables units
         fmu_variable_units = self._get_fmu_variable_units();
+        # Optimal control and measurement trajectories for saving
+        results = {};
         # Update model control data
         for key in self.Model.control_data.keys():
             # Check variable is model input
@@ -1060,17 +1351,9 @@ class JModelica(_Package, utility._FMU):
                 ts_opt = pd.Series(data = data, index = timeindex).tz_localize('UTC');
                 # Get old control data
                 ts_old = self.Model.control_data[key].get_base_data();
-                # Remove rows with updated data
-                first = (ts_old.index == self.start_time_utc).tolist().index(True)
-                if ts_old.index[-1] >= self.final_time_utc:
-                    # If final time is before end of timeseries, replace only
-                    # specific location
-                    last = (ts_old.index == self.final_time_utc).tolist().index(True)
-                    drop_list = ts_old.index[first:last+1]
-                else:
-                    # If final time is after end of timeseries, add control to end
-                    drop_list = ts_old.index[first:]
-                ts_old = ts_old.drop(drop_list);
+                # Remove rows with updated data, if final time is after end 
+                # of timeseries the control is added to the end
+                ts_old = ts_old[(ts_old.index < self.start_time_utc) | (ts_old.index > self.final_time_utc)];
                 # Append opt to old
                 ts = ts_old.append(ts_opt)
                 # Sort by index
@@ -1081,6 +1364,7 @@ class JModelica(_Package, utility._FMU):
                 if not unit:
                     unit = units.unit1;
                 self.Model.control_data[key] = variables.Timeseries(key, ts, unit);
+                results[key] = ts_opt;
                 # Get opt input object tuple (names, collocation polynomials f(t))
                 Optimization.opt_input = opt_input
         # Create optimization measurement dictionary
@@ -1093,32 +1377,40 @@ class JModelica(_Package, utility._FMU):
             timedelta = pd.to_timedelta(time, 's');
             timeindex = self._global_start_time_utc + timedelta;
             ts_opt = pd.Series(data = data, index = timeindex).tz_localize('UTC');
-            # Get old measurement data
-            ts_old = self.Model.measurements[key]['Simulated'].get_base_data();
-            # Remove rows with updated data
-            first = (ts_old.index == self.start_time_utc).tolist().index(True)
-            last = (ts_old.index == self.final_time_utc).tolist().index(True)
-            drop_list = ts_old.index[first:last+1]
-            ts_old = ts_old.drop(drop_list);
-            # Append opt to old
-            ts = ts_old.append(ts_opt)
-            # Sort by index
-            ts = ts.sort_index()
+            if self._warm_start:
+                # The model was not simulated for the horizon, so its 
+                # measurement data is from a previous horizon
+                ts = ts_opt;
+            else:
+                # Get old measurement data
+                ts_old = self.Model.measurements[key]['Simulated'].get_base_data();
+                # Remove rows with updated data
+                ts_old = ts_old[(ts_old.index < self.start_time_utc) | (ts_old.index > self.final_time_utc)];
+                # Append opt to old
+                ts = ts_old.append(ts_opt)
+                # Sort by index
+                ts = ts.sort_index()
             # Update control_data
             ts.name = key;
             unit = self._get_unit_class_from_fmu_variable_units('mpc_model.' + key,fmu_variable_units);
             if not unit:
                 unit = units.unit1;
             Optimization.measurements[key]['Simulated'] = variables.Timeseries(key, ts, unit);
+            results[key] = ts_opt;
+        # Save results if wanted
+        if self.Model._save_parameter_input_data:
+            df = pd.DataFrame(results);
+            df.index.name = 'Time';
+            utility._save_df(df, 'mpcpy_optimization_results', self.Model._save_parameter_input_data);
 
     def _get_parameter_results(self, Optimization):
         '''Update the parameter data dictionary in the model with optimization results.
 
         '''
 
+        self.fmu_variable_units = self._get_fmu_variable_units();
         for key in Optimization.Model.parameter_data.keys():
             if Optimization.Model.parameter_data[key]['Free'].get_base_data():
-                self.fmu_variable_units = self._get_fmu_variable_units();
                 unit = self._get_unit_class_from_fmu_variable_units('mpc_model.'+key, self.fmu_variable_units);
                 if not unit:
                     unit = units.unit1;
@@ -1132,16 +1424,17 @@ class JModelica(_Package, utility._FMU):
         '''
 
         # Compile the optimization initializaiton model
-        self.fmupath = compile_fmu(self.mopmodelpath + '_initialize', \
-                                   self.moppath, \
-                                   compiler_options = {'extra_lib_dirs':self.Model.libraries});
+        self.fmupath = utility._compile_cache.compile_fmu(self.mopmodelpath + '_initialize', \
+                                                          self.moppath, \
+                                                          compiler_options = {'extra_lib_dirs':self.Model.libraries});
         kwargs = {};
         kwargs['fmupath'] = self.fmupath;
         self._create_fmu(kwargs);
         # Transfer optimization problem to casADi
-        self.opt_problem = transfer_optimization_problem(self.mopmodelpath + '_optimize', \
-                                                         self.moppath, \
-                                                         compiler_options = {'extra_lib_dirs':self.Model.libraries});
+        self.opt_problem = utility._compile_cache.transfer_optimization_problem(self, \
+                                                                                self.mopmodelpath + '_optimize', \
+                                                                                self.moppath, \
+                                                                                compiler_options = {'extra_lib_dirs':self.Model.libraries});
 
     def _get_optimization_options(self):
         '''Get the JModelica optimization options in a dictionary.
@@ -1174,9 +1467,95 @@ class JModelica(_Package, utility._FMU):
         # Set options
         self.opt_options = copy.deepcopy(opt_options);
 
-    def _get_optimization_statistics(self):
+    def _get_optimization_statistics(self, warm_start = False):
         '''Get the JModelica optimization result statistics.
 
+        If warm_start is False, returns the solver statistics of the last
+        solve as (return status, number of iterations, objective, execution 
+        time).  If warm_start is True, returns a dictionary with the number
+        of cold and warm solves (keys ``'cold_solves'``, ``'warm_solves'``), 
+        the mean iterations, initial guess time, and solve time in seconds 
+        of each (keys ``'cold_iterations'``, ``'cold_initial_time'``, 
+        ``'cold_solve_time'``, and the same for warm), and the estimated
+        total savings of the warm solves (keys ``'iterations_saved'``, 
+        ``'time_saved'``).  Means and savings are None without solves to 
+        compare.
+
         '''
 
-        return self.res_opt.get_solver_statistics();
+        if not warm_start:
+            return self.res_opt.get_solver_statistics();
+        opt_statistics = {};
+        for mode in ['cold', 'warm']:
+            solves = [solve for solve in self._solve_log if solve['warm_start'] == (mode == 'warm')];
+            opt_statistics[mode + '_solves'] = len(solves);
+            for key in ['iterations', 'initial_time', 'solve_time']:
+                if solves:
+                    opt_statistics[mode + '_' + key] = float(np.mean([solve[key] for solve in solves]));
+                else:
+                    opt_statistics[mode + '_' + key] = None;
+        if opt_statistics['cold_solves'] and opt_statistics['warm_solves']:
+            n_warm = opt_statistics['warm_solves'];
+            opt_statistics['iterations_saved'] = (opt_statistics['cold_iterations'] - opt_statistics['warm_iterations'])*n_warm;
+            cold_time = opt_statistics['cold_initial_time'] + opt_statistics['cold_solve_time'];
+            warm_time = opt_statistics['warm_initial_time'] + opt_statistics['warm_solve_time'];
+            opt_statistics['time_saved'] = (cold_time - warm_time)*n_warm;
+        else:
+            opt_statistics['iterations_saved'] = None;
+            opt_statistics['time_saved'] = None;
+
+        return opt_statistics;
+
+#%% Warm Start
+class _ShiftedResult(object):
+    '''Optimization result with its time shifted for use as an initial guess.
+
+    The trajectories of a previous solution are returned with time 
+    ``t - shift``, so that the time of the new start time is zero.  Times 
+    past the end of the previous solution hold its final values when 
+    interpolated by JModelica.  Other attributes are those of the result.
+
+    Parameters
+    ----------
+    result : JModelica optimization result object
+        Result of the previous solve.
+    shift : float
+        Seconds from the start time of the previous solve to the new start
+        time.
+    initial_guesses : dictionary, optional
+        {"Variable Name" : value} of variables whose trajectory is replaced
+        by a constant value over the time of the previous solution.
+
+    '''
+
+    def __init__(self, result, shift, initial_guesses = None):
+        '''Constructor of the shifted result.
+
+        '''
+
+        self._result_data = getattr(result, 'result_data', result);
+        self._shift = shift;
+        if initial_guesses is None:
+            initial_guesses = {};
+        self._initial_guesses = initial_guesses;
+
+    def get_variable_data(self, name):
+        '''Get the shifted trajectory of a variable.
+
+        '''
+
+        data = self._result_data.get_variable_data(name);
+        if name in self._initial_guesses:
+            return Trajectory(data.t - self._shift, self._initial_guesses[name]*np.ones(len(data.t)));
+
+        return Trajectory(data.t - self._shift, data.x);
+
+    def __getattr__(self, name):
+        '''Get other public attributes from the result data.
+
+        '''
+
+        if name.startswith('_'):
+            raise AttributeError(name);
+
+        return getattr(self._result_data, name);
@@ -53,6 +53,8 @@ Classes
 
 .. autoclass:: mpcpy.systems.RealFromCSV
     :members: collect_measurements, display_measurements, get_base_measurements
+.. autoclass:: mpcpy.systems.RealFromParquet
+    :members: collect_measurements, display_measurements, get_base_measurements
 .. autoclass:: mpcpy.systems.RealFromDF
     :members: collect_measurements, display_measurements, get_base_measurements
 
@@ -187,12 +189,15 @@ class EmulationFromFMU(_Emulation, utility._FMU):
         ``'from_geography'``, then geography kwarg is required.
     geography : list or tuple, optional
         List or tuple with (latitude, longitude) in degrees. 
-    save_parameter_input_data: boolean
+    save_parameter_input_data: boolean or string
         True to output the parameter and input data set for simulations and optimizations.
         Saved files are:
         "mpcpy_simulation_parameters_system.csv"
         "mpcpy_simulation_inputs_system.csv"
+        "mpcpy_simulation_results_system.csv"
         Times will be in UTC.
+        If ``'parquet'``, the inputs and results are saved to parquet files 
+        with the extension ".parquet" instead.
         Default is False.
 
     Attributes
@@ -280,6 +285,56 @@ class RealFromCSV(_Real, utility._DAQ):
 
         self._read_timeseries_from_csv();            
                                                                                       
+class RealFromParquet(_Real, utility._DAQ):
+    '''System measured data located in parquet file.
+    
+    Parameters
+    ----------
+    parquet_file_path : string
+        Path of parquet file.  The time column, or named index, must 
+        contain time stamps without time zone.
+    measurements : dictionary
+        {"Measurement Name" : {"Sample" : mpcpy.Variables.Static}}.
+    variable_map : dictionary
+        {"Column Header Name" : ("Measurement Variable Name", mpcpy.Units.unit)}.
+    tz_name : string, optional
+        Name of timezone according to the package ``tzwhere``.  If 
+        ``'from_geography'``, then geography kwarg is required.
+    geography : list or tuple, optional
+        List or tuple with (latitude, longitude) in degrees. 
+
+    Attributes
+    ----------
+    measurements : dictionary
+        {"Measurement Variable Name" : {{"Measurement Key_" : mpcpy.Variables.Timeseries/Static}}.
+    file_path : string
+        Path of parquet file. 
+    lat : numeric
+        Latitude in degrees.  For timezone.
+    lon : numeric
+        Longitude in degrees.  For timezone.
+        
+    '''
+
+    def __init__(self, parquet_file_path, measurements, variable_map, **kwargs):
+        '''Constructor of a system parquet source.
+        
+        '''
+
+        self.name = 'real_from_parquet';
+        self.file_path = parquet_file_path;
+        self.measurements = measurements;
+        self.variable_map = variable_map;
+        self._parse_daq_kwargs(kwargs);
+        self._parse_time_zone_kwargs(kwargs);
+        
+    def _collect_data(self):
+        '''Collect data from parquet file into measurement dictionary.
+        
+        '''
+
+        self._read_timeseries_from_parquet();            
+                                                                                      
 class RealFromDF(_Real, utility._DAQ):
     '''System measured data located in DataFrame.
 
@@ -8,21 +8,62 @@ documentation on ``variables`` for more information.
 from abc import ABCMeta, abstractmethod
 import numpy as np
 
+#%% Array conversion
+def _to_float_array(data):
+    '''Cast list, ``numpy`` array, or ``pandas`` data to float.
+    
+    '''
+    
+    if hasattr(data, 'astype'):
+        float_data = data.astype(float);
+    else:
+        float_data = np.array(data, dtype = float);
+    
+    return float_data;
+
 #%% Display unit abstract interface
 class _DisplayUnit(object):
+    '''Base class for display units.
+    
+    Display units are affine in their quantity base unit, such that
+    ``base = display*_scale + _offset``.  A display unit declares its 
+    ``_scale`` and ``_offset`` in ``_define_display_unit``, which allows 
+    whole arrays of data to be converted in one ``numpy`` operation.  Units 
+    that are not affine override the conversion methods.
+    
+    '''
+    
     __metaclass__ = ABCMeta; 
+    _scale = 1.0;
+    _offset = 0.0;
     @abstractmethod
     def _define_quantity(self):
         pass;
     @abstractmethod
     def _define_display_unit(self):
         pass;           
-    @abstractmethod
-    def _convert_to_base(self):
-        pass;
-    @abstractmethod
-    def _convert_from_base(self):
-        pass;
+    def _convert_to_base(self, display_data):
+        base_data = display_data*self._scale + self._offset;
+        return base_data;
+    def _convert_from_base(self, base_data):
+        display_data = (base_data - self._offset)/self._scale;
+        return display_data;
+    def _convert_to_base_array(self, display_data):
+        '''Convert list, ``numpy`` array, or ``pandas`` data to base units.
+        
+        Data is cast to float and converted in a single vectorized 
+        operation.  Lists are returned as ``numpy`` arrays and ``pandas`` 
+        objects keep their index.
+        
+        '''
+        base_data = self._convert_to_base(_to_float_array(display_data));
+        return base_data;
+    def _convert_from_base_array(self, base_data):
+        '''Convert list, ``numpy`` array, or ``pandas`` data from base units.
+        
+        '''
+        display_data = self._convert_from_base(_to_float_array(base_data));
+        return display_data;
     def __init__(self, variable):
         self._define_quantity(variable);
         self._define_display_unit();       
@@ -178,6 +219,12 @@ class boolean_integer(_Boolean):
     def _convert_from_base(self, base_data):
         display_data = base_data;
         return display_data;
+    def _convert_to_base_array(self, display_data):
+        base_data = _to_float_array(display_data).astype(int);
+        return base_data;
+    def _convert_from_base_array(self, base_data):
+        display_data = _to_float_array(base_data).astype(int);
+        return display_data;
         
 class boolean(_Boolean):
     def _define_display_unit(self):
@@ -188,880 +235,467 @@ class boolean(_Boolean):
     def _convert_from_base(self, base_data):
         display_data = bool(base_data);
         return display_data;
+    def _convert_to_base_array(self, display_data):
+        base_data = _to_float_array(display_data).astype(int);
+        return base_data;
+    def _convert_from_base_array(self, base_data):
+        display_data = _to_float_array(base_data).astype(bool);
+        return display_data;
         
 #%% Temperature display unit implementation
 class K(_Temperature):
     def _define_display_unit(self):
         self.name = 'K';
-    def _convert_to_base(self, display_data):
-        base_data = display_data;
-        return base_data;
-    def _convert_from_base(self, base_data):
-        display_data = base_data;
-        return display_data;
-        
+
 class degC(_Temperature):
     def _define_display_unit(self):
         self.name = 'degC';
-    def _convert_to_base(self, display_data):
-        base_data = display_data + 273.15;
-        return base_data;
-    def _convert_from_base(self, base_data):
-        display_data = base_data - 273.15;
-        return display_data;
-        
+        self._offset = 273.15;
+
 class degF(_Temperature):
     def _define_display_unit(self):
         self.name = 'degF';
-    def _convert_to_base(self, display_data):
-        base_data = (display_data-32)*5/9 + 273.15;
-        return base_data;
-    def _convert_from_base(self, base_data):
-        display_data = (base_data-273.15)*9/5 + 32;
-        return display_data;
+        self._scale = 5.0/9;
+        self._offset = 273.15 - 32*5.0/9;
 
 class degR(_Temperature):
     def _define_display_unit(self):
         self.name = 'degR';
-    def _convert_to_base(self, display_data):
-        base_data = ((display_data - 459.67)-32)*5/9 + 273.15;
-        return base_data;
-    def _convert_from_base(self, base_data):
-        display_data = (base_data-273.15)*9/5 + 32 + 459.67;
-        return display_data;
+        self._scale = 5.0/9;
+        self._offset = 273.15 - (459.67+32)*5.0/9;
         
 #%% Power display unit implementation     
 class W(_Power):
     def _define_display_unit(self):
         self.name = 'W';
-    def _convert_to_base(self, display_data):
-        base_data = display_data;
-        return base_data;
-    def _convert_from_base(self, base_data):
-        display_data = base_data;
-        return display_data;
-        
+
 class kW(_Power):
     def _define_display_unit(self):
         self.name = 'kW';
-    def _convert_to_base(self, display_data):
-        base_data = display_data*1e3;
-        return base_data;
-    def _convert_from_base(self, base_data):
-        display_data = base_data/1e3;
-        return display_data;
-        
+        self._scale = 1e3;
+
 class MW(_Power):
     def _define_display_unit(self):
         self.name = 'MW';
-    def _convert_to_base(self, display_data):
-        base_data = display_data*1e6;
-        return base_data;
-    def _convert_from_base(self, base_data):
-        display_data = base_data/1e6;
-        return display_data;        
-        
+        self._scale = 1e6;
+
 class Btuh(_Power):
     def _define_display_unit(self):
         self.name = 'Btuh';
-    def _convert_to_base(self, display_data):
-        base_data = display_data*0.29307107;
-        return base_data;
-    def _convert_from_base(self, base_data):
-        display_data = base_data/0.29307107;
-        return display_data;
-        
+        self._scale = 0.29307107;
+
 class kBtuh(_Power):
     def _define_display_unit(self):
         self.name = 'kBtuh';
-    def _convert_to_base(self, display_data):
-        base_data = (display_data*1e3)*0.29307107;
-        return base_data;
-    def _convert_from_base(self, base_data):
-        display_data = base_data/0.29307107/1e3;
-        return display_data;
-        
+        self._scale = 1e3*0.29307107;
+
 class hp(_Power):
     def _define_display_unit(self):
         self.name = 'hp';
-    def _convert_to_base(self, display_data):
-        base_data = display_data*745.699872;
-        return base_data;
-    def _convert_from_base(self, base_data):
-        display_data = base_data/745.699872;
-        return display_data;
+        self._scale = 745.699872;
         
 #%% Energy display unit implementation     
 class J(_Energy):
     def _define_display_unit(self):
         self.name = 'J';
-    def _convert_to_base(self, display_data):
-        base_data = display_data;
-        return base_data;
-    def _convert_from_base(self, base_data):
-        display_data = base_data;
-        return display_data;
-        
+
 class kJ(_Energy):
     def _define_display_unit(self):
         self.name = 'kJ';
-    def _convert_to_base(self, display_data):
-        base_data = display_data*1e3;
-        return base_data;
-    def _convert_from_base(self, base_data):
-        display_data = base_data/1e3;
-        return display_data;
+        self._scale = 1e3;
 
 class MJ(_Energy):
     def _define_display_unit(self):
         self.name = 'MJ';
-    def _convert_to_base(self, display_data):
-        base_data = display_data*1e6;
-        return base_data;
-    def _convert_from_base(self, base_data):
-        display_data = base_data/1e6;
-        return display_data;
-        
+        self._scale = 1e6;
+
 class Btu(_Energy):
     def _define_display_unit(self):
         self.name = 'Btu';
-    def _convert_to_base(self, display_data):
-        base_data = display_data*1055.05585;
-        return base_data;
-    def _convert_from_base(self, base_data):
-        display_data = base_data/1055.05585;
-        return display_data;
+        self._scale = 1055.05585;
 
 class kBtu(_Energy):
     def _define_display_unit(self):
         self.name = 'kBtu';
-    def _convert_to_base(self, display_data):
-        base_data = (display_data*1e3)*1055.05585;
-        return base_data;
-    def _convert_from_base(self, base_data):
-        display_data = base_data/1055.05585/1e3;
-        return display_data;
-        
+        self._scale = 1e3*1055.05585;
+
 class Wh(_Energy):
     def _define_display_unit(self):
         self.name = 'Wh';
-    def _convert_to_base(self, display_data):
-        base_data = display_data*3600;
-        return base_data;
-    def _convert_from_base(self, base_data):
-        display_data = base_data/3600;
-        return display_data; 
-        
+        self._scale = 3600;
+
 class kWh(_Energy):
     def _define_display_unit(self):
         self.name = 'kWh';
-    def _convert_to_base(self, display_data):
-        base_data = display_data*1e3*3600;
-        return base_data;
-    def _convert_from_base(self, base_data):
-        display_data = base_data/3600/1e3;
-        return display_data;
+        self._scale = 1e3*3600;
 
 class MWh(_Energy):
     def _define_display_unit(self):
         self.name = 'MWh';
-    def _convert_to_base(self, display_data):
-        base_data = display_data*1e6*3600;
-        return base_data;
-    def _convert_from_base(self, base_data):
-        display_data = base_data/3600/1e6;
-        return display_data;
+        self._scale = 1e6*3600;
         
 #%% Power Flux display unit implementation     
 class W_m2(_PowerFlux):
     def _define_display_unit(self):
         self.name = 'W/m2';
-    def _convert_to_base(self, display_data):
-        base_data = display_data;
-        return base_data;
-    def _convert_from_base(self, base_data):
-        display_data = base_data;
-        return display_data;
-        
+
 class kW_m2(_PowerFlux):
     def _define_display_unit(self):
         self.name = 'kW/m2';
-    def _convert_to_base(self, display_data):
-        base_data = display_data*1e3;
-        return base_data;
-    def _convert_from_base(self, base_data):
-        display_data = base_data/1e3;
-        return display_data;        
+        self._scale = 1e3;
 
 class W_sf(_PowerFlux):
     def _define_display_unit(self):
         self.name = 'W/sf';
-    def _convert_to_base(self, display_data):
-        base_data = display_data*10.7639;
-        return base_data;
-    def _convert_from_base(self, base_data):
-        display_data = base_data/10.7639;
-        return display_data;
-        
+        self._scale = 10.7639;
+
 class kW_sf(_PowerFlux):
     def _define_display_unit(self):
         self.name = 'kW/sf';
-    def _convert_to_base(self, display_data):
-        base_data = display_data*1e3*10.7639;
-        return base_data;
-    def _convert_from_base(self, base_data):
-        display_data = base_data/10.7639/1e3;
-        return display_data;        
-        
+        self._scale = 1e3*10.7639;
+
 class Btuh_sf(_PowerFlux):
     def _define_display_unit(self):
         self.name = 'Btuh/sf';
-    def _convert_to_base(self, display_data):
-        base_data = display_data*3.154594;
-        return base_data;
-    def _convert_from_base(self, base_data):
-        display_data = base_data/3.154594;
-        return display_data;
-        
+        self._scale = 3.154594;
+
 class kBtuh_sf(_PowerFlux):
     def _define_display_unit(self):
         self.name = 'kBtuh/sf';
-    def _convert_to_base(self, display_data):
-        base_data = display_data*1e3*3.154594;
-        return base_data;
-    def _convert_from_base(self, base_data):
-        display_data = base_data/3.154594/1e3;
-        return display_data;        
+        self._scale = 1e3*3.154594;
         
 #%% Energy Intensity display unit implementation     
 class J_m2(_EnergyIntensity):
     def _define_display_unit(self):
         self.name = 'J/m2';
-    def _convert_to_base(self, display_data):
-        base_data = display_data;
-        return base_data;
-    def _convert_from_base(self, base_data):
-        display_data = base_data;
-        return display_data;
 
 class Wh_m2(_EnergyIntensity):
     def _define_display_unit(self):
         self.name = 'Wh/m2';
-    def _convert_to_base(self, display_data):
-        base_data = display_data*3600;
-        return base_data;
-    def _convert_from_base(self, base_data):
-        display_data = base_data/3600;
-        return display_data;
-        
+        self._scale = 3600;
+
 class kWh_m2(_EnergyIntensity):
     def _define_display_unit(self):
         self.name = 'kWh/m2';
-    def _convert_to_base(self, display_data):
-        base_data = display_data*1e3*3600;
-        return base_data;
-    def _convert_from_base(self, base_data):
-        display_data = base_data/3600/1e3;
-        return display_data;
-        
+        self._scale = 1e3*3600;
+
 class Wh_sf(_EnergyIntensity):
     def _define_display_unit(self):
         self.name = 'Wh/sf';
-    def _convert_to_base(self, display_data):
-        base_data = display_data*3600*10.7639;
-        return base_data;
-    def _convert_from_base(self, base_data):
-        display_data = base_data/3600/10.7639;
-        return display_data;
-        
+        self._scale = 3600*10.7639;
+
 class kWh_sf(_EnergyIntensity):
     def _define_display_unit(self):
         self.name = 'kWh/sf';
-    def _convert_to_base(self, display_data):
-        base_data = display_data*1e3*3600*10.7639;
-        return base_data;
-    def _convert_from_base(self, base_data):
-        display_data = base_data/3600/10.7639/1e3;
-        return display_data;
-        
+        self._scale = 1e3*3600*10.7639;
+
 class Btu_sf(_EnergyIntensity):
     def _define_display_unit(self):
         self.name = 'Btu/sf';
-    def _convert_to_base(self, display_data):
-        base_data = display_data*1055.05585*10.7639;
-        return base_data;
-    def _convert_from_base(self, base_data):
-        display_data = base_data/1055.05585/10.7639;
-        return display_data;
-        
+        self._scale = 1055.05585*10.7639;
+
 class kBtu_sf(_EnergyIntensity):
     def _define_display_unit(self):
         self.name = 'kBtu/sf';
-    def _convert_to_base(self, display_data):
-        base_data = display_data*1e3*1055.05585*10.7639;
-        return base_data;
-    def _convert_from_base(self, base_data):
-        display_data = base_data/1055.05585/10.7639/1e3;
-        return display_data;
+        self._scale = 1e3*1055.05585*10.7639;
         
 #%% Pressure display unit implementation     
 class Pa(_Pressure):
     def _define_display_unit(self):
         self.name = 'Pa';
-    def _convert_to_base(self, display_data):
-        base_data = display_data;
-        return base_data;
-    def _convert_from_base(self, base_data):
-        display_data = base_data;
-        return display_data;
-        
+
 class kPa(_Pressure):
     def _define_display_unit(self):
         self.name = 'kPa';
-    def _convert_to_base(self, display_data):
-        base_data = display_data*1e3;
-        return base_data;
-    def _convert_from_base(self, base_data):
-        display_data = base_data/1e3;
-        return display_data; 
+        self._scale = 1e3;
 
-class MPa(_Pressure):        
+class MPa(_Pressure):
     def _define_display_unit(self):
         self.name = 'MPa';
-    def _convert_to_base(self, display_data):
-        base_data = display_data*1e6;
-        return base_data;
-    def _convert_from_base(self, base_data):
-        display_data = base_data/1e6;
-        return display_data;        
-        
+        self._scale = 1e6;
+
 class bar(_Pressure):
     def _define_display_unit(self):
         self.name = 'bar';
-    def _convert_to_base(self, display_data):
-        base_data = display_data*1e5;
-        return base_data;
-    def _convert_from_base(self, base_data):
-        display_data = base_data/1e5;
-        return display_data;
+        self._scale = 1e5;
 
 class inwg(_Pressure):
     def _define_display_unit(self):
         self.name = 'inwg';
-    def _convert_to_base(self, display_data):
-        base_data = display_data*248.84;
-        return base_data;
-    def _convert_from_base(self, base_data):
-        display_data = base_data/248.84;
-        return display_data;
-        
+        self._scale = 248.84;
+
 class inHg(_Pressure):
     def _define_display_unit(self):
         self.name = 'inHg';
-    def _convert_to_base(self, display_data):
-        base_data = display_data*3386.389;
-        return base_data;
-    def _convert_from_base(self, base_data):
-        display_data = base_data/3386.389;
-        return display_data; 
-        
+        self._scale = 3386.389;
+
 class psi(_Pressure):
     def _define_display_unit(self):
         self.name = 'psi';
-    def _convert_to_base(self, display_data):
-        base_data = display_data*6894.757;
-        return base_data;
-    def _convert_from_base(self, base_data):
-        display_data = base_data/6894.757;
-        return display_data;
-        
+        self._scale = 6894.757;
+
 class atm(_Pressure):
     def _define_display_unit(self):
         self.name = 'atm';
-    def _convert_to_base(self, display_data):
-        base_data = display_data*101325;
-        return base_data;
-    def _convert_from_base(self, base_data):
-        display_data = base_data/101325;
-        return display_data;
+        self._scale = 101325;
         
 #%% Dimensionless Ratio display unit implementation     
 class unit1(_DimensionlessRatio):
     def _define_display_unit(self):
         self.name = '1';
-    def _convert_to_base(self, display_data):
-        base_data = display_data;
-        return base_data;
-    def _convert_from_base(self, base_data):
-        display_data = base_data;
-        return display_data;
-        
+
 class percent(_DimensionlessRatio):
     def _define_display_unit(self):
         self.name = 'percent';
-    def _convert_to_base(self, display_data):
-        base_data = display_data/100;
-        return base_data;
-    def _convert_from_base(self, base_data):
-        display_data = base_data*100;
-        return display_data;
-        
+        self._scale = 1.0/100;
+
 class unit10(_DimensionlessRatio):
     def _define_display_unit(self):
         self.name = '10';
-    def _convert_to_base(self, display_data):
-        base_data = display_data/10;
-        return base_data;
-    def _convert_from_base(self, base_data):
-        display_data = base_data*10;
-        return display_data;        
+        self._scale = 1.0/10;
         
 #%% Angle display unit implementation     
 class rad(_Angle):
     def _define_display_unit(self):
         self.name = 'rad';
-    def _convert_to_base(self, display_data):
-        base_data = display_data;
-        return base_data;
-    def _convert_from_base(self, base_data):
-        display_data = base_data;
-        return display_data;
 
 class deg(_Angle):
     def _define_display_unit(self):
         self.name = 'deg';
-    def _convert_to_base(self, display_data):
-        base_data = display_data/180*np.pi;
-        return base_data;
-    def _convert_from_base(self, base_data):
-        display_data = base_data*180/np.pi;
-        return display_data;
+        self._scale = np.pi/180;
         
 #%% Time display unit implementation     
 class s(_Time):
     def _define_display_unit(self):
         self.name = 's';
-    def _convert_to_base(self, display_data):
-        base_data = display_data;
-        return base_data;
-    def _convert_from_base(self, base_data):
-        display_data = base_data;
-        return display_data;
-        
+
 class minute(_Time):
     def _define_display_unit(self):
         self.name = 'min';
-    def _convert_to_base(self, display_data):
-        base_data = display_data*60;
-        return base_data;
-    def _convert_from_base(self, base_data):
-        display_data = base_data/60;
-        return display_data;
+        self._scale = 60;
 
 class hour(_Time):
     def _define_display_unit(self):
         self.name = 'h';
-    def _convert_to_base(self, display_data):
-        base_data = display_data*3600;
-        return base_data;
-    def _convert_from_base(self, base_data):
-        display_data = base_data/3600;
-        return display_data;
-        
+        self._scale = 3600;
+
 class day(_Time):
     def _define_display_unit(self):
         self.name = 'd';
-    def _convert_to_base(self, display_data):
-        base_data = display_data*86400;
-        return base_data;
-    def _convert_from_base(self, base_data):
-        display_data = base_data/86400;
-        return display_data;
+        self._scale = 86400;
         
 #%% Mass display unit implementation     
 class kg(_Mass):
     def _define_display_unit(self):
         self.name = 'kg';
-    def _convert_to_base(self, display_data):
-        base_data = display_data;
-        return base_data;
-    def _convert_from_base(self, base_data):
-        display_data = base_data;
-        return display_data;  
         
 #%% Length display unit implementation     
 class m(_Length):
     def _define_display_unit(self):
         self.name = 'm';
-    def _convert_to_base(self, display_data):
-        base_data = display_data;
-        return base_data;
-    def _convert_from_base(self, base_data):
-        display_data = base_data;
-        return display_data;
 
 class cm(_Length):
     def _define_display_unit(self):
         self.name = 'cm';
-    def _convert_to_base(self, display_data):
-        base_data = display_data/1e2;
-        return base_data;
-    def _convert_from_base(self, base_data):
-        display_data = base_data*1e2;
-        return display_data;
-        
+        self._scale = 1.0/1e2;
+
 class mm(_Length):
     def _define_display_unit(self):
         self.name = 'mm';
-    def _convert_to_base(self, display_data):
-        base_data = display_data/1e3;
-        return base_data;
-    def _convert_from_base(self, base_data):
-        display_data = base_data*1e3;
-        return display_data;        
-        
+        self._scale = 1.0/1e3;
+
 class km(_Length):
     def _define_display_unit(self):
         self.name = 'km';
-    def _convert_to_base(self, display_data):
-        base_data = display_data*1e3;
-        return base_data;
-    def _convert_from_base(self, base_data):
-        display_data = base_data/1e3;
-        return display_data;
-        
+        self._scale = 1e3;
+
 class inch(_Length):
     def _define_display_unit(self):
         self.name = 'inch';
-    def _convert_to_base(self, display_data):
-        base_data = display_data*0.0254;
-        return base_data;
-    def _convert_from_base(self, base_data):
-        display_data = base_data/0.0254;
-        return display_data;
-        
+        self._scale = 0.0254;
+
 class ft(_Length):
     def _define_display_unit(self):
         self.name = 'ft';
-    def _convert_to_base(self, display_data):
-        base_data = display_data*12*0.0254;
-        return base_data;
-    def _convert_from_base(self, base_data):
-        display_data = base_data/0.0254/12;
-        return display_data;
-        
+        self._scale = 12*0.0254;
+
 class yd(_Length):
     def _define_display_unit(self):
         self.name = 'yd';
-    def _convert_to_base(self, display_data):
-        base_data = display_data*12*0.0254*3;
-        return base_data;
-    def _convert_from_base(self, base_data):
-        display_data = base_data/0.0254/12/3;
-        return display_data;
+        self._scale = 12*0.0254*3;
         
 #%% Area display unit implementation     
 class m2(_Area):
     def _define_display_unit(self):
         self.name = 'm2';
-    def _convert_to_base(self, display_data):
-        base_data = display_data;
-        return base_data;
-    def _convert_from_base(self, base_data):
-        display_data = base_data;
-        return display_data;
 
 class sf(_Area):
     def _define_display_unit(self):
         self.name = 'sf';
-    def _convert_to_base(self, display_data):
-        base_data = display_data/10.7639;
-        return base_data;
-    def _convert_from_base(self, base_data):
-        display_data = base_data*10.7639;
-        return display_data;
+        self._scale = 1.0/10.7639;
         
 #%% Volume display unit implementation     
 class m3(_Volume):
     def _define_display_unit(self):
         self.name = 'm3';
-    def _convert_to_base(self, display_data):
-        base_data = display_data;
-        return base_data;
-    def _convert_from_base(self, base_data):
-        display_data = base_data;
-        return display_data;
-        
+
 class cf(_Volume):
     def _define_display_unit(self):
         self.name = 'cf';
-    def _convert_to_base(self, display_data):
-        base_data = display_data/35.3147;
-        return base_data;
-    def _convert_from_base(self, base_data):
-        display_data = base_data*35.3147;
-        return display_data; 
+        self._scale = 1.0/35.3147;
         
 #%% Mass Flow display unit implementation     
 class kg_s(_MassFlow):
     def _define_display_unit(self):
         self.name = 'kg/s';
-    def _convert_to_base(self, display_data):
-        base_data = display_data;
-        return base_data;
-    def _convert_from_base(self, base_data):
-        display_data = base_data;
-        return display_data;
         
 #%% Volumetric Flow display unit implementation     
 class m3_s(_VolumetricFlow):
     def _define_display_unit(self):
         self.name = 'm3/s';
-    def _convert_to_base(self, display_data):
-        base_data = display_data;
-        return base_data;
-    def _convert_from_base(self, base_data):
-        display_data = base_data;
-        return display_data;
-   
+
 class cfm(_VolumetricFlow):
     def _define_display_unit(self):
         self.name = 'cfm';
-    def _convert_to_base(self, display_data):
-        base_data = display_data/2118.88;
-        return base_data;
-    def _convert_from_base(self, base_data):
-        display_data = base_data*2118.88;
-        return display_data;
+        self._scale = 1.0/2118.88;
         
 #%% Velocity display unit implementation     
 class m_s(_Velocity):
     def _define_display_unit(self):
         self.name = 'm/s';
-    def _convert_to_base(self, display_data):
-        base_data = display_data;
-        return base_data;
-    def _convert_from_base(self, base_data):
-        display_data = base_data;
-        return display_data;
-        
+
 class mph(_Velocity):
     def _define_display_unit(self):
         self.name = 'mph';
-    def _convert_to_base(self, display_data):
-        base_data = display_data*0.44704;
-        return base_data;
-    def _convert_from_base(self, base_data):
-        display_data = base_data/0.44704;
-        return display_data;
+        self._scale = 0.44704;
 
 class km_h(_Velocity):
     def _define_display_unit(self):
         self.name = 'km/h';
-    def _convert_to_base(self, display_data):
-        base_data = display_data*0.277778;
-        return base_data;
-    def _convert_from_base(self, base_data):
-        display_data = base_data/0.277778;
-        return display_data;
+        self._scale = 0.277778;
         
 #%% Illuminance display unit implementation     
 class lx(_Illuminance):
     def _define_display_unit(self):
         self.name = 'lx';
-    def _convert_to_base(self, display_data):
-        base_data = display_data;
-        return base_data;
-    def _convert_from_base(self, base_data):
-        display_data = base_data;
-        return display_data;
-        
+
 class fc(_Illuminance):
     def _define_display_unit(self):
         self.name = 'fc';
-    def _convert_to_base(self, display_data):
-        base_data = display_data*10.764 ;
-        return base_data;
-    def _convert_from_base(self, base_data):
-        display_data = base_data/10.764 ;
-        return display_data;
+        self._scale = 10.764;
         
 #%% Luminance display unit implementation     
 class cd_m2(_Luminance):
     def _define_display_unit(self):
         self.name = 'cd/m2';
-    def _convert_to_base(self, display_data):
-        base_data = display_data;
-        return base_data;
-    def _convert_from_base(self, base_data):
-        display_data = base_data;
-        return display_data;
-        
+
 class nt(_Luminance):
     def _define_display_unit(self):
         self.name = 'nt';
-    def _convert_to_base(self, display_data):
-        base_data = display_data;
-        return base_data;
-    def _convert_from_base(self, base_data):
-        display_data = base_data;
-        return display_data;
         
 #%% EnergyPrice unit implementation     
 class cents_kWh(_EnergyPrice):
     def _define_display_unit(self):
         self.name = 'cents/kWh';
-    def _convert_to_base(self, display_data):
-        base_data = display_data/3.6e8;
-        return base_data;
-    def _convert_from_base(self, base_data):
-        display_data = base_data*3.6e8;
-        return display_data;
-        
+        self._scale = 1.0/3.6e8;
+
 class dol_kWh(_EnergyPrice):
     def _define_display_unit(self):
         self.name = '$/kWh';
-    def _convert_to_base(self, display_data):
-        base_data = display_data/3.6e6;
-        return base_data;
-    def _convert_from_base(self, base_data):
-        display_data = base_data*3.6e6;
-        return display_data;
-        
+        self._scale = 1.0/3.6e6;
+
 class dol_MWh(_EnergyPrice):
     def _define_display_unit(self):
         self.name = '$/MWh';
-    def _convert_to_base(self, display_data):
-        base_data = display_data/3.6e9;
-        return base_data;
-    def _convert_from_base(self, base_data):
-        display_data = base_data*3.6e9;
-        return display_data;
+        self._scale = 1.0/3.6e9;
 
 class dol_J(_EnergyPrice):
     def _define_display_unit(self):
         self.name = '$/J';
-    def _convert_to_base(self, display_data):
-        base_data = display_data;
-        return base_data;
-    def _convert_from_base(self, base_data):
-        display_data = base_data;
-        return display_data;
         
 #%% PowerPrice unit implementation     
 class cents_kW(_PowerPrice):
     def _define_display_unit(self):
         self.name = 'cents/kW';
-    def _convert_to_base(self, display_data):
-        base_data = display_data/1e5;
-        return base_data;
-    def _convert_from_base(self, base_data):
-        display_data = base_data*1e5;
-        return display_data;
-        
+        self._scale = 1.0/1e5;
+
 class dol_kW(_PowerPrice):
     def _define_display_unit(self):
         self.name = '$/kW';
-    def _convert_to_base(self, display_data):
-        base_data = display_data/1e3;
-        return base_data;
-    def _convert_from_base(self, base_data):
-        display_data = base_data*1e3;
-        return display_data;
-        
+        self._scale = 1.0/1e3;
+
 class dol_MW(_PowerPrice):
     def _define_display_unit(self):
         self.name = '$/MW';
-    def _convert_to_base(self, display_data):
-        base_data = display_data/1e6;
-        return base_data;
-    def _convert_from_base(self, base_data):
-        display_data = base_data*1e6;
-        return display_data;
+        self._scale = 1.0/1e6;
 
 class dol_W(_PowerPrice):
     def _define_display_unit(self):
         self.name = '$/W';
-    def _convert_to_base(self, display_data):
-        base_data = display_data;
-        return base_data;
-    def _convert_from_base(self, base_data):
-        display_data = base_data;
-        return display_data;
         
 #%% Specific heat capacity unit implementation     
 class J_kgK(_SpecificHeatCapacity):
     def _define_display_unit(self):
         self.name = 'J/(kg.K)';
-    def _convert_to_base(self, display_data):
-        base_data = display_data;
-        return base_data;
-    def _convert_from_base(self, base_data):
-        display_data = base_data;
-        return display_data;
         
 #%% Heat capacity unit implementation     
 class J_K(_HeatCapacity):
     def _define_display_unit(self):
         self.name = 'J/K';
-    def _convert_to_base(self, display_data):
-        base_data = display_data;
-        return base_data;
-    def _convert_from_base(self, base_data):
-        display_data = base_data;
-        return display_data;           
-
+        
 #%% Heat capacity coefficient unit implementation     
 class J_m2K(_HeatCapacityCoefficient):
     def _define_display_unit(self):
         self.name = 'J/(m2.K)';
-    def _convert_to_base(self, display_data):
-        base_data = display_data;
-        return base_data;
-    def _convert_from_base(self, base_data):
-        display_data = base_data;
-        return display_data;
         
 #%% Heat resistance unit implementation     
 class K_W(_HeatResistance):
     def _define_display_unit(self):
         self.name = 'K/W';
-    def _convert_to_base(self, display_data):
-        base_data = display_data;
-        return base_data;
-    def _convert_from_base(self, base_data):
-        display_data = base_data;
-        return display_data;     
-
+        
 #%% Heat resistance coefficient unit implementation     
 class m2K_W(_HeatResistanceCoefficient):
     def _define_display_unit(self):
         self.name = '(m2.K)/W';
-    def _convert_to_base(self, display_data):
-        base_data = display_data;
-        return base_data;
-    def _convert_from_base(self, base_data):
-        display_data = base_data;
-        return display_data;
-
+        
 #%% Heat transfer coefficient unit implementation     
 class W_m2K(_HeatTransferCoefficient):
     def _define_display_unit(self):
         self.name = 'W/(m2.K)';
-    def _convert_to_base(self, display_data):
-        base_data = display_data;
-        return base_data;
-    def _convert_from_base(self, base_data):
-        display_data = base_data;
-        return display_data;
         
 #%% Density unit implementation     
 class kg_m3(_Density):
     def _define_display_unit(self):
-        self.name = 'kg/m3';
-    def _convert_to_base(self, display_data):
-        base_data = display_data;
-        return base_data;
-    def _convert_from_base(self, base_data):
-        display_data = base_data;
-        return display_data;
\ No newline at end of file
+        self.name = 'kg/m3';        
+#%% Unit registry
+class _RegistryVariable(object):
+    '''Placeholder variable used to define display units for the registry.
+    
+    '''
+    
+    pass;
+
+def _register_units():
+    '''Register display unit classes by unit name and quantity name.
+    
+    Returns
+    -------
+    unit_registry : dictionary
+        {"Unit Name" : mpcpy.units.unit}.
+    quantity_registry : dictionary
+        {"Quantity Name" : [mpcpy.units.unit]}.
+    
+    '''
+    
+    unit_registry = {};
+    quantity_registry = {};
+    for name, obj in sorted(globals().items()):
+        if isinstance(obj, type) and issubclass(obj, _DisplayUnit) and not name.startswith('_'):
+            variable = _RegistryVariable();
+            unit = obj(variable);
+            unit_registry[unit.name] = obj;
+            quantity_registry.setdefault(variable.quantity_name, []).append(obj);
+            
+    return unit_registry, quantity_registry;
+
+_unit_registry, _quantity_registry = _register_units();
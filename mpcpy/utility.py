@@ -15,16 +15,35 @@ Functions
 
 .. automethod:: mpcpy.utility.get_MPCPy_path
 
+.. automethod:: mpcpy.utility.set_model_description_cache
+
+.. automethod:: mpcpy.utility.set_compile_cache
+
+.. automethod:: mpcpy.utility.get_compile_cache_statistics
+
+=======
+Classes
+=======
+
+.. autoclass:: mpcpy.utility.ModelDescription
+    :members: get_variable_names, get_units, get_unit, get_causality, 
+              get_declared_type, get_start
+
 """
 
 from abc import ABCMeta
 import os
 import numpy as np
 import pandas as pd
-from pyfmi.common import core
-from pyfmi.common import xmlparser
+import zipfile
+import hashlib
+import pickle
 import shutil
-import inspect
+import threading
+import time
+import weakref
+import csv
+from xml.etree import ElementTree
 from mpcpy import variables
 from mpcpy import units
 from tzwhere import tzwhere
@@ -32,8 +51,19 @@ from dateutil.relativedelta import relativedelta
 from pytz import exceptions as pytz_exceptions
 from pyfmi import load_fmu
 from pymodelica import compile_fmu
+from pyjmi import transfer_optimization_problem
 import math
 
+# Directory of the on-disk cache of parsed model descriptions, None if disabled
+_model_description_cache_dir = None;
+# Version of the cached model description format, part of the cache key
+_model_description_cache_version = 1;
+# Content hashes of files by (path, size, modification time)
+_file_hashes = {};
+# Number of rows between entries of the sidecar time index of csv files
+_csv_time_index_block = 10000;
+# Number of rows read at a time when streaming a csv file by default
+_csv_chunksize = 100000;
 
 #%%
 class _mpcpyPandas(object):
@@ -279,7 +309,7 @@ class _FMU(_mpcpyPandas):
         self._create_input_object_from_input_mpcpy_ts_list(self._input_mpcpy_ts_list);
         # Save inputs if wanted
         if self._save_parameter_input_data:
-            self._input_df.to_csv('mpcpy_simulation_inputs_{0}.csv'.format(self._save_parameter_input_filename))
+            _save_df(self._input_df, 'mpcpy_simulation_inputs_{0}'.format(self._save_parameter_input_filename), self._save_parameter_input_data);
         # Get simulation options
         self._sim_opts = self.fmu.simulate_options();
         # Set simulation fmu with start
@@ -311,14 +341,8 @@ class _FMU(_mpcpyPandas):
                         with open(file_name, 'w') as f:
                             f.write('parameter,value\n')
                             f.write('{0},{1}\n'.format(key,value))
-        # Get minimum measurement sample rate for simulation
-        min_sample = 3600;
-        for key in self.measurements.keys():
-            sample = self.measurements[key]['Sample'].get_base_data();
-            if sample < min_sample:
-                min_sample = sample; 
         # Set sample rate for simulation
-        self._sim_opts['ncp'] = int(self.elapsed_seconds/min_sample);
+        self._sim_opts['ncp'] = self._get_simulation_ncp();
         # Set cvode solver tolerance if model exchange fmu
         if self.fmu_target is 'me':
             self._sim_opts['CVode_options']['rtol'] = 1e-6;
@@ -340,65 +364,66 @@ class _FMU(_mpcpyPandas):
             if not unit:
                 unit = units.unit1;                
             self.measurements[key]['Simulated'] = variables.Timeseries(key, ts, unit);
+        # Save results if wanted
+        if self._save_parameter_input_data:
+            df = pd.DataFrame({key : self.measurements[key]['Simulated'].get_base_data() for key in self.measurements.keys()});
+            df.index.name = 'Time';
+            _save_df(df, 'mpcpy_simulation_results_{0}'.format(self._save_parameter_input_filename), self._save_parameter_input_data);
+            
+    def _get_simulation_ncp(self):
+        '''Get the number of simulation output points.
+        
+        Returns
+        -------
+        ncp : int
+            Number of points in the time period at the minimum measurement 
+            sample rate, which is at most 3600 seconds.
+        
+        '''
+        
+        # Get minimum measurement sample rate for simulation
+        min_sample = 3600;
+        for key in self.measurements.keys():
+            sample = self.measurements[key]['Sample'].get_base_data();
+            if sample < min_sample:
+                min_sample = sample; 
+        ncp = int(self.elapsed_seconds/min_sample);
+        
+        return ncp
             
     def _create_input_mpcpy_ts_list_sim(self):
         '''Create a list of mpcpy timeseries for input into fmu for simulation.
         
         '''
         
-        self._input_mpcpy_ts_list = [];
-        # Weather
-        for key in self.weather_data.keys():
-            if key in self.input_names:
-                self._input_mpcpy_ts_list.append(self.weather_data[key]);
-        # Internal
-        for zone in self.internal_data.keys():
-            for intLoad in ['intCon', 'intRad', 'intLat']:
-                if intLoad+'_'+zone in self.input_names:
-                    self._input_mpcpy_ts_list.append(self.internal_data[zone][intLoad]);
-        # Controls
-        for key in self.control_data.keys():
-            if key in self.input_names:
-                self._input_mpcpy_ts_list.append(self.control_data[key]);                     
-        # Other inputs                   
-        for key in self.other_inputs.keys():
-            if key in self.input_names:
-                self._input_mpcpy_ts_list.append(self.other_inputs[key]);
+        self._input_mpcpy_ts_list = _get_input_mpcpy_ts_list(self, self.input_names);
 
     def _create_input_mpcpy_ts_list_opt(self):
         '''Create a list of mpcpy timeseries for input into fmu for optimization.
         
         '''
         
-        self._input_mpcpy_ts_list_opt = [];
-        # Weather
-        for key in self.weather_data.keys():
-            if key in self.opt_input_names:
-                self._input_mpcpy_ts_list_opt.append(self.weather_data[key]);
-        # Internal
-        for zone in self.internal_data.keys():
-            for intLoad in ['intCon', 'intRad', 'intLat']:
-                if intLoad+'_'+zone in self.input_names:
-                    self._input_mpcpy_ts_list_opt.append(self.internal_data[zone][intLoad]);
-        # Controls
-        for key in self.control_data.keys():
-            if key in self.opt_input_names:
-                self._input_mpcpy_ts_list_opt.append(self.control_data[key]);                     
-        # Other inputs                   
-        for key in self.other_inputs.keys():
-            if key in self.opt_input_names:
-                self._input_mpcpy_ts_list_opt.append(self.other_inputs[key]);
+        self._input_mpcpy_ts_list_opt = _get_input_mpcpy_ts_list(self, self.opt_input_names, \
+                                                                 internal_input_names = self.input_names);
 
     def _create_input_object_from_input_mpcpy_ts_list(self, input_mpcpy_ts_list):
         '''Create a fmu input object from list of mpcpy timeseries.
         
+        The timeseries are aligned on the int64 union of their time stamps
+        as by ``_mpcpy_ts_list_to_dataframe``, without assembling a 
+        dataframe from them.
+        
         '''
         
         # Check if empty
         if input_mpcpy_ts_list:
             # If not, fill input object
-            self._input_df = self._mpcpy_ts_list_to_dataframe(input_mpcpy_ts_list);
-            self._input_object = self._dataframe_to_input_object(self._input_df, self.start_time_utc, self.final_time_utc);
+            input_names, grid, data = _align_mpcpy_ts_list(input_mpcpy_ts_list);
+            index = pd.DatetimeIndex(grid.view('datetime64[ns]')).tz_localize('UTC');
+            self._input_df = pd.DataFrame(data, index = index.tz_convert(input_mpcpy_ts_list[0].get_base_data().index.tz), \
+                                          columns = input_names);
+            self._input_df.index.name = 'Time';
+            self._input_object = self._array_to_input_object(input_names, grid, data, self.start_time_utc, self.final_time_utc);
         else:
             # Otherwise, create empty input object
             self._input_object = ();
@@ -426,11 +451,15 @@ class _FMU(_mpcpyPandas):
         libraries : list
             Attribute for list of paths to required modelica libraries.
         fmu : ``pyfmi`` fmu object
-            Attribute for fmu object using the load_fmu method of pyfmi.
+            Attribute for fmu object using the load_fmu method of pyfmi.  
+            The object is lent from a process-wide pool of fmu instances and
+            is returned to the pool when this object is garbage collected.
         fmu_version : string
             Attribute for version of fmu.  ``'1.0'`` or ``'2.0'``.
         fmu_target : string
             Attribute for version of fmu.  ``'cs'`` or ``'me'``.
+        model_description : ModelDescription
+            Attribute for the parsed variable metadata of the fmu.
 
         '''
         
@@ -439,9 +468,10 @@ class _FMU(_mpcpyPandas):
             self.mopath = None;
             self.modelpath = None
             self.libraries = None;
-            self.fmu = load_fmu(self.fmupath);
+            self._release_fmu();
+            self.fmu = _fmu_pool.acquire(self.fmupath, self);
             self.fmu_version = self.fmu.get_version();
-            self._xml_root = self._load_xml_root();
+            self.model_description = self._load_model_description();
             self.fmu_target = self._get_fmu_target();
         if 'moinfo' in kwargs:
             self.mopath = kwargs['moinfo'][0];
@@ -455,21 +485,29 @@ class _FMU(_mpcpyPandas):
                 self.fmu_target = kwargs['target'];
             else:
                 self.fmu_target = 'me';
-            self.fmupath = compile_fmu(self.modelpath, \
-                                       self.mopath, \
-                                       compiler_options = {'extra_lib_dirs':self.libraries}, 
-                                       version = self.fmu_version,
-                                       target = self.fmu_target);
-            self.fmu = load_fmu(self.fmupath);
-            self._xml_root = self._load_xml_root();
+            self.fmupath = _compile_cache.compile_fmu(self.modelpath, \
+                                                      self.mopath, \
+                                                      compiler_options = {'extra_lib_dirs':self.libraries}, 
+                                                      version = self.fmu_version,
+                                                      target = self.fmu_target);
+            self._release_fmu();
+            self.fmu = _fmu_pool.acquire(self.fmupath, self);
+            self.model_description = self._load_model_description();
 
-    def _dataframe_to_input_object(self, df, start_time, final_time):
-        '''Create a fmu input object from dataframe.
+    def _array_to_input_object(self, input_names, grid, data, start_time, final_time):
+        '''Create a fmu input object from aligned input data.
+        
+        The simulation time is 0 at the first time of the grid at or after 
+        the global start time.
         
         Parameters
         ----------
-        df : ``pandas`` dataframe object
-            Dataframe to convert to fmu input_object.
+        input_names : list of strings
+            Names of the inputs.
+        grid : ``numpy`` array
+            Times of the input data as int64 nanoseconds in UTC.
+        data : ``numpy`` array
+            Input data with a row for each time and a column for each input.
         start_time : datetime object
             Start of input object data
         final_time : datetime object
@@ -482,13 +520,14 @@ class _FMU(_mpcpyPandas):
 
         '''
 
-        input_names = tuple(df);
-        df_simtime = self._add_simtime_column(df, self._global_start_time_utc);
-        input_df = df_simtime.loc[start_time:final_time]
-        input_trajectory = input_df['SimTime'].get_values();
-        for header in input_names:
-            input_trajectory = np.vstack((input_trajectory, input_df[header].get_values()));
-        input_object = (input_names, np.transpose(input_trajectory));
+        i0 = np.searchsorted(grid, pd.Timestamp(self._global_start_time_utc).value);
+        i1 = max(np.searchsorted(grid, pd.Timestamp(start_time).value), i0);
+        i2 = np.searchsorted(grid, pd.Timestamp(final_time).value, side = 'right');
+        input_trajectory = np.empty((max(i2 - i1, 0), len(input_names) + 1));
+        if i2 > i1:
+            input_trajectory[:, 0] = (grid[i1:i2] - grid[i0])/1e9;
+            input_trajectory[:, 1:] = data[i1:i2];
+        input_object = (tuple(input_names), input_trajectory);
         
         return input_object;
                           
@@ -502,12 +541,9 @@ class _FMU(_mpcpyPandas):
         
         '''
         
-        if self.fmu_version == '1.0':
-            input_names = self.fmu.get_model_variables(causality = 0).keys();
-        elif self.fmu_version == '2.0':
-            input_names = self.fmu.get_model_variables(causality = 2).keys();
-        else:
+        if self.fmu_version not in ['1.0', '2.0']:
             raise TypeError ('fmu version {0} is not compatable.'.format(self.fmu_version));
+        input_names = self.model_description.get_variable_names(causality = 'input');
 
         return input_names;
         
@@ -520,41 +556,12 @@ class _FMU(_mpcpyPandas):
             Dictionary where the keys are variable names and values are unit
             strings.  These unit strings can be used by 
             ``_get_unit_class_from_fmu_variable_units`` to get the 
-            corresponding mpcpy unit class.
+            corresponding mpcpy unit class.  The dictionary is parsed once 
+            when the fmu is loaded and should not be modified.
         
         '''
         
-        model_variables = self._xml_root.find('ModelVariables');
-        type_definitions = self._xml_root.find('TypeDefinitions');
-        variables = model_variables.getchildren();
-        if type_definitions is not None:
-            types = type_definitions.getchildren();
-        fmu_variable_units = {};
-        for variable in variables:
-            real = variable.find('Real');
-            if real is not None:
-                items = real.items();
-                attributes = [];
-                for attribute in items:
-                    attributes.append(attribute[0]);
-                if 'unit' in attributes:
-                    unit = real.get('unit');
-                elif 'declaredType' in attributes and 'unit' not in attributes:
-                    variable_type = real.get('declaredType');
-                    for type_instance in types:
-                        if variable_type == type_instance.get('name'):
-                            if self.fmu_version == '1.0':
-                                sub_type = type_instance.find('RealType');
-                            elif self.fmu_version == '2.0':
-                                sub_type = type_instance.find('Real');
-                            else:
-                                raise TypeError('Cannot get variable units for fmu {0}.'.format(self.fmu_version));
-                            if sub_type is not None:
-                                unit = sub_type.get('unit');
-                else:
-                    unit = None;
-                
-                fmu_variable_units[variable.get('name')] = unit;
+        fmu_variable_units = self.model_description.get_units();
             
         return fmu_variable_units
         
@@ -569,18 +576,7 @@ class _FMU(_mpcpyPandas):
         '''
         
         if self.fmu_version == '2.0':
-            try:
-                tag = self._xml_root.find('ModelExchange').tag
-            except:
-                pass
-            try:
-                tag = self._xml_root.find('CoSimulation').tag
-            except:
-                pass
-            if tag == 'ModelExchange':
-                target = 'me'
-            else:
-                target = 'cs'
+            target = self.model_description.fmu_target;
         else:
             target = None
             
@@ -604,35 +600,696 @@ class _FMU(_mpcpyPandas):
         
         '''
         
-        unit_class_items = inspect.getmembers(units);
-        unit_class = [];
-        for unit_class_item in unit_class_items:
-            try:
-                temp_var = variables.Static('tempvar', 1, unit_class_item[1]);   
-                if fmu_variable_units[variable_name] == temp_var.get_display_unit_name():
-                    unit_class = unit_class_item[1];
-                    break
-            except:
-                continue
+        unit_class = get_unit_class_from_unit_string(fmu_variable_units.get(variable_name));
             
         return unit_class
         
-    def _load_xml_root(self):
-        '''Load the xml root.
+    def _load_model_description(self):
+        '''Load the model description of the fmu.
+        
+        The model description is parsed once per fmu content in a process 
+        and shared by all objects using the fmu.
+        
+        Returns
+        -------
+        model_description : ModelDescription
+            Parsed variable metadata of the fmu.
+        
+        '''
+        
+        key = _fmu_pool.get_key(self.fmupath);
+        if key not in _fmu_pool.model_descriptions:
+            _fmu_pool.model_descriptions[key] = self._read_model_description();
+            
+        return _fmu_pool.model_descriptions[key]
+        
+    def _read_model_description(self):
+        '''Read the model description from the fmu file.
+        
+        Only modelDescription.xml is read from the fmu archive, without 
+        extracting the binaries.  If a cache directory is set by 
+        ``set_model_description_cache``, the parsed model description is 
+        stored there under the hash of the xml content and reused by later 
+        loads of any fmu with the same model description.
+        
+        Returns
+        -------
+        model_description : ModelDescription
+            Parsed variable metadata of the fmu.
+        
+        '''
+        
+        with zipfile.ZipFile(self.fmupath) as fmu_archive:
+            xml_string = fmu_archive.read('modelDescription.xml');
+        if _model_description_cache_dir is None:
+            return ModelDescription(ElementTree.fromstring(xml_string))
+        # Look for the parsed model description in the cache
+        key = hashlib.sha1(xml_string).hexdigest();
+        file_name = 'md{0}_{1}.pkl'.format(_model_description_cache_version, key);
+        cache_path = os.path.join(_model_description_cache_dir, file_name);
+        if os.path.exists(cache_path):
+            with open(cache_path, 'rb') as f:
+                return pickle.load(f)
+        # Parse and write to a temporary file first so that concurrent 
+        # readers never see a partially written file
+        model_description = ModelDescription(ElementTree.fromstring(xml_string));
+        tmp_path = '{0}.{1}.tmp'.format(cache_path, os.getpid());
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(model_description, f, pickle.HIGHEST_PROTOCOL);
+        try:
+            os.rename(tmp_path, cache_path);
+        except OSError:
+            # Another process wrote the same entry first
+            os.remove(tmp_path);
+        
+        return model_description
+        
+    def _release_fmu(self):
+        '''Return the fmu instance of the object to the fmu pool.
+        
+        '''
+        
+        if getattr(self, 'fmu', None) is not None:
+            _fmu_pool.release(self.fmu);
+            self.fmu = None;
+        
+#%%
+class ModelDescription(object):
+    '''Variable metadata parsed from the modelDescription.xml of an fmu.
+    
+    The xml is parsed once and indexed by variable name so that the units, 
+    causality, declared type, and start value of any variable can be looked 
+    up without walking the xml tree again.  The ``model_description`` 
+    attribute of objects using an fmu, such as ``models.Modelica`` or 
+    ``systems.EmulationFromFMU``, is an instance of this class.
+    
+    Parameters
+    ----------
+    xml_root : xml root object
+        Root of the modelDescription.xml element tree.
+        
+    Attributes
+    ----------
+    fmu_version : string
+        Version of fmu.  ``'1.0'`` or ``'2.0'``.
+    fmu_target : string
+        ``'me'`` or ``'cs'`` for fmu version 2.0.  None for version 1.0.
+    variables : dictionary
+        {"Variable Name" : {"causality" : string, "type" : string, 
+        "declared_type" : string, "unit" : string, "start" : value}}.
+        Values that are not defined in the xml are None.
+
+    '''
+    
+    def __init__(self, xml_root):
+        '''Constructor of model description object.
+        
+        '''
+        
+        self.fmu_version = xml_root.get('fmiVersion');
+        if self.fmu_version == '2.0':
+            if xml_root.find('ModelExchange') is not None:
+                self.fmu_target = 'me';
+            else:
+                self.fmu_target = 'cs';
+        else:
+            self.fmu_target = None;
+        self._parse_type_units(xml_root);
+        self._parse_variables(xml_root);
+        
+    def get_variable_names(self, causality = None):
+        '''Get the names of the variables, in order of the model description.
+        
+        Parameters
+        ----------
+        causality : string, optional
+            Return only variables with this causality, for example 
+            ``'input'``, ``'output'``, or ``'parameter'``.
+            Default is None, which returns all variables.
+            
+        Returns
+        -------
+        variable_names : list
+            List of variable names.
+        
+        '''
+        
+        if causality is None:
+            variable_names = list(self._variable_names);
+        else:
+            variable_names = [name for name in self._variable_names if self.variables[name]['causality'] == causality];
+            
+        return variable_names
+        
+    def get_units(self):
+        '''Get the unit strings of the Real variables.
+        
+        Returns
+        -------
+        variable_units : dictionary
+            {"Variable Name" : unit string or None}.  The dictionary is 
+            shared and should not be modified.
+        
+        '''
+        
+        return self._variable_units
+        
+    def get_unit(self, variable_name):
+        '''Get the unit string of a variable.
+        
+        Parameters
+        ----------
+        variable_name : string
+            Name of variable.
+            
+        Returns
+        -------
+        unit : string
+            Unit string of variable, or None if not defined.
+        
+        '''
+        
+        return self.variables[variable_name]['unit']
+        
+    def get_causality(self, variable_name):
+        '''Get the causality of a variable.
+        
+        Parameters
+        ----------
+        variable_name : string
+            Name of variable.
+            
+        Returns
+        -------
+        causality : string
+            Causality of variable, or None if not defined.
+        
+        '''
+        
+        return self.variables[variable_name]['causality']
+        
+    def get_declared_type(self, variable_name):
+        '''Get the declared type of a variable.
+        
+        Parameters
+        ----------
+        variable_name : string
+            Name of variable.
+            
+        Returns
+        -------
+        declared_type : string
+            Declared type of variable, or None if not defined.
+        
+        '''
+        
+        return self.variables[variable_name]['declared_type']
+        
+    def get_start(self, variable_name):
+        '''Get the start value of a variable.
+        
+        Parameters
+        ----------
+        variable_name : string
+            Name of variable.
+            
+        Returns
+        -------
+        start : float, int, bool, or string
+            Start value of variable, or None if not defined.
+        
+        '''
+        
+        return self.variables[variable_name]['start']
+        
+    def _parse_type_units(self, xml_root):
+        '''Index the units of the type definitions by type name.
+        
+        '''
+        
+        if self.fmu_version == '1.0':
+            real_tag = 'RealType';
+        elif self.fmu_version == '2.0':
+            real_tag = 'Real';
+        else:
+            raise TypeError('Cannot get variable units for fmu {0}.'.format(self.fmu_version));
+        self._type_units = {};
+        type_definitions = xml_root.find('TypeDefinitions');
+        if type_definitions is not None:
+            for type_instance in type_definitions:
+                sub_type = type_instance.find(real_tag);
+                if sub_type is not None:
+                    self._type_units[type_instance.get('name')] = sub_type.get('unit');
+                
+    def _parse_variables(self, xml_root):
+        '''Index the model variables by name.
+        
+        '''
+        
+        self.variables = {};
+        self._variable_names = [];
+        self._variable_units = {};
+        model_variables = xml_root.find('ModelVariables');
+        for variable in model_variables:
+            name = variable.get('name');
+            for value_type in ['Real', 'Integer', 'Boolean', 'String', 'Enumeration']:
+                element = variable.find(value_type);
+                if element is not None:
+                    break
+            info = {'causality' : variable.get('causality'),
+                    'type' : None,
+                    'declared_type' : None,
+                    'unit' : None,
+                    'start' : None};
+            if element is not None:
+                info['type'] = value_type;
+                info['declared_type'] = element.get('declaredType');
+                info['start'] = self._parse_start(value_type, element.get('start'));
+                if value_type == 'Real':
+                    if element.get('unit') is not None:
+                        info['unit'] = element.get('unit');
+                    elif info['declared_type'] is not None:
+                        info['unit'] = self._type_units.get(info['declared_type']);
+                    self._variable_units[name] = info['unit'];
+            self.variables[name] = info;
+            self._variable_names.append(name);
+            
+    def _parse_start(self, value_type, start):
+        '''Convert a start attribute string to the variable type.
+        
+        '''
+        
+        if start is None:
+            return None
+        if value_type == 'Real':
+            start = float(start);
+        elif value_type in ['Integer', 'Enumeration']:
+            start = int(start);
+        elif value_type == 'Boolean':
+            start = start in ['true', '1'];
+            
+        return start
+        
+#%%
+class _InstancePool(object):
+    '''Process-wide pool of reusable instances keyed by content.
+    
+    An instance is lent to one owner object at a time and returns to the 
+    pool when the owner releases it or is garbage collected.  Instances 
+    are only created by subclasses when no idle instance of a key exists.
+    
+    Attributes
+    ----------
+    loads : int
+        Number of instances created.
+    reuses : int
+        Number of times an idle instance was lent again.
+    
+    '''
+    
+    def __init__(self):
+        '''Constructor of instance pool object.
+        
+        '''
+        
+        self.loads = 0;
+        self.reuses = 0;
+        self._idle = {};
+        self._lent = {};
+        self._lock = threading.Lock();
+        
+    def release(self, instance):
+        '''Return a lent instance to the pool.
+        
+        Parameters
+        ----------
+        instance : object
+            Instance lent by the pool.
+        
+        '''
+        
+        self._return(id(instance));
+        
+    def clear(self):
+        '''Drop the idle instances.
+        
+        '''
+        
+        with self._lock:
+            self._idle = {};
+        
+    def _take(self, key):
+        '''Take an idle instance of a key from the pool.
+        
+        Returns None if there is no idle instance.
+        
+        '''
+        
+        with self._lock:
+            idle = self._idle.get(key);
+            instance = idle.pop() if idle else None;
+        if instance is None:
+            self.loads = self.loads + 1;
+        else:
+            self.reuses = self.reuses + 1;
+            
+        return instance
+        
+    def _lend(self, key, instance, owner):
+        '''Record an instance of a key as lent to an owner.
+        
+        '''
+        
+        instance_id = id(instance);
+        owner_ref = weakref.ref(owner, lambda ref: self._return(instance_id, ref));
+        with self._lock:
+            self._lent[instance_id] = (key, instance, owner_ref);
+        
+    def _return(self, instance_id, owner_ref = None):
+        '''Move a lent instance to the idle instances of its key.
+        
+        If an owner reference is given, the instance is only returned if it
+        is still lent to that owner.
+        
+        '''
+        
+        with self._lock:
+            entry = self._lent.get(instance_id);
+            if entry is None:
+                return
+            if owner_ref is not None and entry[2] is not owner_ref:
+                return
+            del self._lent[instance_id];
+            self._idle.setdefault(entry[0], []).append(entry[1]);
+            
+class _FMUPool(_InstancePool):
+    '''Process-wide pool of loaded fmu instances.
+    
+    Instances are keyed by the path and content hash of the fmu file, so a 
+    recompiled fmu at the same path is never confused with the old one.  
+    Returned instances are reset before they are lent again.  A new 
+    instance is loaded only when all instances of an fmu are lent.
+    
+    Attributes
+    ----------
+    model_descriptions : dictionary
+        {key : ModelDescription} for the fmus loaded in the process.
+    
+    '''
+    
+    def __init__(self):
+        '''Constructor of fmu pool object.
+        
+        '''
+        
+        super(_FMUPool, self).__init__();
+        self.model_descriptions = {};
+        
+    def get_key(self, fmupath):
+        '''Get the pool key of an fmu file.
+        
+        Parameters
+        ----------
+        fmupath : string
+            Path to fmu file.
+            
+        Returns
+        -------
+        key : tuple
+            (absolute path, sha1 of file content).
+        
+        '''
+        
+        fmupath = os.path.abspath(fmupath);
+            
+        return (fmupath, _hash_file(fmupath))
+        
+    def acquire(self, fmupath, owner):
+        '''Lend an fmu instance to an owner object.
+        
+        Parameters
+        ----------
+        fmupath : string
+            Path to fmu file.
+        owner : object
+            Object using the instance.  The instance returns to the pool
+            when the owner is garbage collected.
+            
+        Returns
+        -------
+        fmu : ``pyfmi`` fmu object
+            Reset or newly loaded fmu instance.
+        
+        '''
+        
+        key = self.get_key(fmupath);
+        fmu = self._take(key);
+        if fmu is None:
+            fmu = load_fmu(fmupath);
+        else:
+            fmu.reset();
+        self._lend(key, fmu, owner);
+        
+        return fmu
+        
+    def clear(self):
+        '''Drop the idle instances and the parsed model descriptions.
+        
+        '''
+        
+        super(_FMUPool, self).clear();
+        self.model_descriptions = {};
+                
+_fmu_pool = _FMUPool();
+
+#%%
+class _CompileCache(object):
+    '''Content-addressed cache of compiled fmus and optimization problems.
+    
+    Compiled fmus are stored in a directory per key, where the key is a 
+    hash of the model class name, the content of the source file, the 
+    modification state of the library files, and the compiler arguments.
+    Transferred optimization problems cannot be serialized, so they are 
+    reused within the process only, lent to one owner at a time.  The cache
+    is disabled until a directory is set with ``set_compile_cache``.
+    
+    Attributes
+    ----------
+    cache_dir : string
+        Path to the cache directory, None if the cache is disabled.
+    max_size : int
+        Maximum total size of the cached fmus in bytes, None for no limit.
+    max_age : float
+        Maximum time in seconds since the last use of a cached fmu, None 
+        for no limit.
+    hits : int
+        Number of fmus found in the cache.
+    misses : int
+        Number of fmus compiled.
+    evictions : int
+        Number of fmus removed from the cache.
+    
+    '''
+    
+    def __init__(self):
+        '''Constructor of compile cache object.
+        
+        '''
+        
+        self.cache_dir = None;
+        self.max_size = None;
+        self.max_age = None;
+        self.hits = 0;
+        self.misses = 0;
+        self.evictions = 0;
+        self._problems = _InstancePool();
+        
+    def get_key(self, class_name, file_name, kwargs):
+        '''Get the cache key of a compilation.
+        
+        Parameters
+        ----------
+        class_name : string
+            Modelica path to the model class.
+        file_name : string or list
+            Path or list of paths to the .mo or .mop source files or 
+            directories of package sources, which are hashed by content.
+        kwargs : dictionary
+            Keyword arguments of the compilation.  Library paths in the
+            ``'extra_lib_dirs'`` compiler option are fingerprinted by the 
+            size and modification time of their files.
+            
+        Returns
+        -------
+        key : string
+            sha1 hex digest.
+        
+        '''
+        
+        sha1 = hashlib.sha1();
+        sha1.update(class_name.encode('utf-8'));
+        if isinstance(file_name, basestring):
+            file_name = [file_name];
+        for path in file_name:
+            if os.path.isdir(path):
+                for root, dirs, files in os.walk(path):
+                    dirs.sort();
+                    for name in sorted(files):
+                        sha1.update(os.path.relpath(os.path.join(root, name), path).encode('utf-8'));
+                        sha1.update(_hash_file(os.path.join(root, name)).encode('utf-8'));
+            else:
+                sha1.update(_hash_file(path).encode('utf-8'));
+        sha1.update(repr(sorted((k, repr(v)) for k, v in kwargs.items() if k != 'compiler_options')).encode('utf-8'));
+        compiler_options = kwargs.get('compiler_options', {});
+        sha1.update(repr(sorted((k, repr(v)) for k, v in compiler_options.items())).encode('utf-8'));
+        libraries = compiler_options.get('extra_lib_dirs');
+        if isinstance(libraries, basestring):
+            libraries = [libraries];
+        for library in (libraries or []):
+            for root, dirs, files in os.walk(library):
+                dirs.sort();
+                for name in sorted(files):
+                    stat = os.stat(os.path.join(root, name));
+                    sha1.update('{0}|{1}|{2}'.format(os.path.join(root, name), stat.st_size, stat.st_mtime).encode('utf-8'));
+        sha1.update(os.environ.get('MODELICAPATH', '').encode('utf-8'));
+        
+        return sha1.hexdigest()
+        
+    def compile_fmu(self, class_name, file_name, **kwargs):
+        '''Compile an fmu or get it from the cache.
+        
+        Parameters
+        ----------
+        class_name : string
+            Modelica path to the model class.
+        file_name : string or list
+            Path or list of paths to the .mo or .mop source files.
+        **kwargs
+            Keyword arguments of ``pymodelica.compile_fmu``.
+            
+        Returns
+        -------
+        fmupath : string
+            Path to the compiled fmu.
+        
+        '''
+        
+        if self.cache_dir is None:
+            return compile_fmu(class_name, file_name, **kwargs)
+        key = self.get_key(class_name, file_name, kwargs);
+        entry_dir = os.path.join(self.cache_dir, key);
+        if os.path.isdir(entry_dir):
+            fmu_names = [name for name in os.listdir(entry_dir) if name.endswith('.fmu')];
+            if fmu_names:
+                self.hits = self.hits + 1;
+                os.utime(entry_dir, None);
+                return os.path.join(entry_dir, fmu_names[0])
+        # Compile into a temporary directory and move it into place so that
+        # concurrent processes never see a partial entry
+        self.misses = self.misses + 1;
+        tmp_dir = '{0}.{1}.tmp'.format(entry_dir, os.getpid());
+        os.makedirs(tmp_dir);
+        kwargs['compile_to'] = tmp_dir;
+        fmu_name = os.path.basename(compile_fmu(class_name, file_name, **kwargs));
+        try:
+            os.rename(tmp_dir, entry_dir);
+        except OSError:
+            # Another process wrote the same entry first
+            shutil.rmtree(tmp_dir);
+        self.evict(keep = key);
+        
+        return os.path.join(entry_dir, fmu_name)
+        
+    def transfer_optimization_problem(self, owner, class_name, file_name, **kwargs):
+        '''Transfer an optimization problem or reuse an idle one.
+        
+        Reused problems are only lent when the cache is enabled.  All 
+        parameters, times, and options of a reused problem must be set 
+        again by the owner before it is solved.
+        
+        Parameters
+        ----------
+        owner : object
+            Object using the problem.  The problem returns to the cache
+            when the owner is garbage collected.
+        class_name : string
+            Modelica path to the optimization class.
+        file_name : string or list
+            Path or list of paths to the .mop source files.
+        **kwargs
+            Keyword arguments of ``pyjmi.transfer_optimization_problem``.
+            
+        Returns
+        -------
+        opt_problem : ``pyjmi`` optimization problem object
+            Transferred optimization problem.
+        
+        '''
+        
+        if self.cache_dir is None:
+            return transfer_optimization_problem(class_name, file_name, **kwargs)
+        key = self.get_key(class_name, file_name, kwargs);
+        opt_problem = self._problems._take(key);
+        if opt_problem is None:
+            opt_problem = transfer_optimization_problem(class_name, file_name, **kwargs);
+        self._problems._lend(key, opt_problem, owner);
+        
+        return opt_problem
+        
+    def evict(self, keep = None):
+        '''Remove cached fmus by age, then by size, least recently used first.
+        
+        Parameters
+        ----------
+        keep : string, optional
+            Key of an entry that is not removed.
+        
+        '''
+        
+        if self.cache_dir is None or (self.max_size is None and self.max_age is None):
+            return
+        entries = [];
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name);
+            if name.endswith('.tmp') or not os.path.isdir(path):
+                continue
+            size = 0;
+            for root, dirs, files in os.walk(path):
+                for file_name in files:
+                    size = size + os.path.getsize(os.path.join(root, file_name));
+            entries.append((os.path.getmtime(path), size, name));
+        entries.sort();
+        total_size = sum([entry[1] for entry in entries]);
+        now = time.time();
+        for mtime, size, name in entries:
+            too_old = self.max_age is not None and now - mtime > self.max_age;
+            too_big = self.max_size is not None and total_size > self.max_size;
+            if name == keep or (not too_old and not too_big):
+                continue
+            shutil.rmtree(os.path.join(self.cache_dir, name), ignore_errors = True);
+            total_size = total_size - size;
+            self.evictions = self.evictions + 1;
+            
+    def get_statistics(self):
+        '''Get the statistics of the cache.
         
         Returns
         -------
-        _xml_root : xml root object
-            From element_tree.getroot().
+        statistics : dictionary
+            {"hits" : int, "misses" : int, "evictions" : int, 
+            "problem_transfers" : int, "problem_reuses" : int}.
         
         '''
         
-        tmpdir = core.unzip_unit(self.fmupath);
-        element_tree = xmlparser._parse_XML(tmpdir+os.sep + 'modelDescription.xml');
-        shutil.rmtree(tmpdir)
-        _xml_root = element_tree.getroot();
+        statistics = {'hits' : self.hits,
+                      'misses' : self.misses,
+                      'evictions' : self.evictions,
+                      'problem_transfers' : self._problems.loads,
+                      'problem_reuses' : self._problems.reuses};
+                      
+        return statistics
         
-        return _xml_root
+_compile_cache = _CompileCache();
         
 #%%
 class _Building(object):
@@ -718,6 +1375,12 @@ class _DAQ(object):
             Attribute to specify data cleaning.  
             { 'csvHeader' : 'cleaning_type' = variables.Timeseries.cleaning_type,
             'cleaning_args' = (cleaning_args)}
+        chunksize : int
+            Attribute for the number of rows read at a time when streaming a
+            csv file, or None to read the whole file.
+        time_index : boolean
+            Attribute to use a sidecar time index to seek close to the start
+            time when streaming a csv file.
         
         '''
     
@@ -738,6 +1401,17 @@ class _DAQ(object):
             self.clean_data = kwargs['clean_data'];
         else:
             self.clean_data = None;
+        # Streaming
+        if 'time_index' in kwargs:
+            self.time_index = kwargs['time_index'];
+        else:
+            self.time_index = False;
+        if 'chunksize' in kwargs:
+            self.chunksize = kwargs['chunksize'];
+        elif self.time_index:
+            self.chunksize = _csv_chunksize;
+        else:
+            self.chunksize = None;
         
     def _search_variable_map(self, mpcpy_varname):
         '''Search variable map for column name matching the mpcpy variable name.
@@ -768,12 +1442,94 @@ class _DAQ(object):
         
         '''
         
-        # Set time index from default or user-specified time header
+        # Read only the time and mapped columns
+        time_headers = self._get_time_headers();
+        header = list(pd.read_csv(self.file_path, nrows = 0).columns);
+        usecols = [key for key in header if key in time_headers or key in self.variable_map];
+        time_columns = [key for key in usecols if key in time_headers];
+        if getattr(self, 'chunksize', None) is not None and time_columns:
+            self._df = self._stream_csv(header, usecols, time_columns[0]);
+        else:
+            self._df = pd.read_csv(self.file_path, usecols = usecols);
+        self._read_timeseries_from_table(time_headers);
+        
+    def _read_timeseries_from_parquet(self):
+        '''Read timeseries data from a parquet file into mpcpy data.
+        
+        Only the time and mapped columns are read.  The time column, which 
+        may also be the named index of the file, must contain time stamps 
+        without time zone in the time zone of the object.  Its filter to
+        within one day of the time interval is pushed down to the parquet 
+        reader, which skips the row groups outside of it.
+        
+        This method assumes the concrete class will define the method
+        ``_translate_variable_map``.
+        
+        '''
+        
+        import pyarrow.parquet as pq
+        time_headers = self._get_time_headers();
+        header = [field.name for field in pq.ParquetFile(self.file_path).schema.to_arrow_schema()];
+        usecols = [key for key in header if key in time_headers or key in self.variable_map];
+        time_columns = [key for key in usecols if key in time_headers];
+        if time_columns and hasattr(self, 'start_time'):
+            start_time, final_time = self._get_read_interval();
+            self._df = _read_parquet(self.file_path, columns = usecols, time_column = time_columns[0], \
+                                     start_time = start_time, final_time = final_time);
+        else:
+            self._df = _read_parquet(self.file_path, columns = usecols);
+        self._read_timeseries_from_table(time_headers);
+        
+    def _get_time_headers(self):
+        '''Get the default or user-specified time headers.
+        
+        Returns
+        -------
+        time_headers : list of strings or string
+            Headers that may contain the time stamps.
+            
+        '''
+        
         if self.time_header is not None:
             time_headers = self.time_header;
         else:
             time_headers = ['Time', 'time', 'Timestamp', 'timestamp']; 
-        self._df = pd.read_csv(self.file_path);        
+            
+        return time_headers
+        
+    def _get_read_interval(self):
+        '''Get the time interval of rows to read from a file.
+        
+        The interval is extended by one day on each side, so that daylight 
+        savings time can be treated as for a whole file.
+        
+        Returns
+        -------
+        start_time : ``pandas`` Timestamp
+            Start of the interval in the time zone of the object, without 
+            time zone.
+        final_time : ``pandas`` Timestamp
+            Final of the interval in the time zone of the object, without 
+            time zone.
+            
+        '''
+        
+        margin = pd.Timedelta(days = 1);
+        start_time = self.start_time.tz_convert(self.tz_name).tz_localize(None) - margin;
+        final_time = self.final_time.tz_convert(self.tz_name).tz_localize(None) + margin;
+        
+        return start_time, final_time
+        
+    def _read_timeseries_from_table(self, time_headers):
+        '''Set the time index of a read table and translate its columns.
+        
+        Parameters
+        ----------
+        time_headers : list of strings or string
+            Headers that may contain the time stamps.
+            
+        '''
+        
         for key in self._df.columns.values:
             if key in time_headers:
                 time = pd.to_datetime(self._df[key], format = self.time_format);
@@ -802,6 +1558,108 @@ class _DAQ(object):
                     self._cleaning_args = None;   
                 self._translate_variable_map();
                 
+    def _stream_csv(self, header, usecols, time_column):
+        '''Read the rows of a csv file around the time interval in chunks.
+        
+        Reading stops after the first chunk past the final time, so the 
+        rows of the csv file must be sorted by time.  If the time index 
+        attribute is True, reading starts at the entry of the sidecar time
+        index before the start time.  Only the rows within the read 
+        interval are kept.
+        
+        Parameters
+        ----------
+        header : list of strings
+            Column headers of the csv file.
+        usecols : list of strings
+            Column headers to read.
+        time_column : string
+            Column header of the time stamps.
+            
+        Returns
+        -------
+        df : ``pandas`` DataFrame
+            Rows of the csv file around the time interval.
+        
+        '''
+        
+        start_time, final_time = self._get_read_interval();
+        chunks = [];
+        with open(self.file_path, 'r') as f:
+            if self.time_index:
+                f.seek(self._get_csv_time_index_offset(header, time_column, start_time));
+            else:
+                f.readline();
+            reader = pd.read_csv(f, header = None, names = header, usecols = usecols, chunksize = self.chunksize);
+            for chunk in reader:
+                time = pd.to_datetime(chunk[time_column], format = self.time_format);
+                chunks.append(chunk[((time >= start_time) & (time <= final_time)).values]);
+                if len(time) and time.iloc[-1] > final_time:
+                    break
+        if chunks:
+            df = pd.concat(chunks, axis = 0, ignore_index = True);
+        else:
+            df = pd.DataFrame(columns = usecols);
+            
+        return df
+        
+    def _get_csv_time_index_offset(self, header, time_column, time):
+        '''Get the file offset of the csv row to start reading before a time.
+        
+        The offsets and time stamps of every ``_csv_time_index_block`` rows
+        are stored in a sidecar file next to the csv file, which is built
+        if it does not exist or if the csv file changed.
+        
+        Parameters
+        ----------
+        header : list of strings
+            Column headers of the csv file.
+        time_column : string
+            Column header of the time stamps.
+        time : ``pandas`` Timestamp
+            Time before which to start reading, in the time of the csv file.
+            
+        Returns
+        -------
+        offset : int
+            File offset of the first row to read.
+        
+        '''
+        
+        index_path = self.file_path + '.tidx.npz';
+        stat = os.stat(self.file_path);
+        offsets = None;
+        if os.path.exists(index_path):
+            with np.load(index_path) as index:
+                if index['size'] == stat.st_size and index['mtime'] == stat.st_mtime and index['column'] == time_column:
+                    offsets = index['offsets'];
+                    times = index['times'];
+        if offsets is None:
+            # Build the time index
+            position = header.index(time_column);
+            offsets = [];
+            fields = [];
+            with open(self.file_path, 'r') as f:
+                f.readline();
+                offset = f.tell();
+                for i, line in enumerate(iter(f.readline, '')):
+                    if i % _csv_time_index_block == 0:
+                        offsets.append(offset);
+                        fields.append(next(csv.reader([line]))[position]);
+                    offset = offset + len(line);
+            offsets = np.array(offsets, dtype = np.int64);
+            times = pd.to_datetime(fields, format = self.time_format).values.astype(np.int64);
+            # Write to a temporary file first so that concurrent readers 
+            # never see a partially written file
+            tmp_path = '{0}.{1}.tmp'.format(index_path, os.getpid());
+            with open(tmp_path, 'wb') as f:
+                np.savez(f, offsets = offsets, times = times, size = stat.st_size, \
+                         mtime = stat.st_mtime, column = time_column);
+            os.rename(tmp_path, index_path);
+        i = max(np.searchsorted(times, time.value, side = 'right') - 1, 0);
+        
+        return int(offsets[i]) if len(offsets) else 0
+                
     def _read_timeseries_from_df(self):
         '''Read timeseries data from a pandas DataFrame into mpcpy data.
         
@@ -924,19 +1782,333 @@ def get_unit_class_from_unit_string(unit_string):
     -------
     unit_class : units.unit class
         The mpcpy unit class for the given unit string.  This class can be used
-        to define an mpcpy variable object.  See ``variables``.
+        to define an mpcpy variable object.  See ``variables``.  An empty list
+        is returned if no unit class is found.
+    
+    '''
+
+    try:
+        unit_class = units._unit_registry.get(unit_string, []);
+    except TypeError:
+        unit_class = [];
+
+    return unit_class
+    
+#%% Set the model description cache
+def set_model_description_cache(cache_dir):
+    '''Set the directory of the on-disk cache of parsed fmu model descriptions.
+    
+    When set, the metadata parsed from the modelDescription.xml of an fmu is
+    stored under the hash of the xml content, so that constructing objects 
+    from the same fmu, for example in other processes or sessions, skips 
+    parsing the xml.  The cache is disabled by default.
+
+    Parameters
+    ----------
+    cache_dir : string
+        Path to the cache directory.  It is created if it does not exist.
+        None disables the cache.
     
     '''
 
-    unit_class_items = inspect.getmembers(units);
-    unit_class = [];
-    for unit_class_item in unit_class_items:
+    global _model_description_cache_dir
+    if cache_dir is not None:
+        cache_dir = os.path.abspath(cache_dir);
+        if not os.path.exists(cache_dir):
+            os.makedirs(cache_dir);
+    _model_description_cache_dir = cache_dir;
+    
+#%% Set the compile cache
+def set_compile_cache(cache_dir, max_size = None, max_age = None):
+    '''Set the directory and eviction policy of the compile cache.
+    
+    When set, fmus compiled from Modelica code by ``models.Modelica``, 
+    ``systems.EmulationFromFMU``, and ``optimization.Optimization`` objects 
+    are stored under a hash of the source, libraries, and compiler options, 
+    and are reused instead of compiled again.  Transferred optimization 
+    problems are also reused within the process.  The cache is disabled by
+    default.
+
+    Parameters
+    ----------
+    cache_dir : string
+        Path to the cache directory.  It is created if it does not exist.
+        None disables the cache.
+    max_size : int, optional
+        Maximum total size of the cached fmus in bytes.  The least recently
+        used fmus are removed first.
+        Default is None, for no limit.
+    max_age : float, optional
+        Maximum time in seconds since the last use of a cached fmu.
+        Default is None, for no limit.
+    
+    '''
+
+    if cache_dir is not None:
+        cache_dir = os.path.abspath(cache_dir);
+        if not os.path.exists(cache_dir):
+            os.makedirs(cache_dir);
+    _compile_cache.cache_dir = cache_dir;
+    _compile_cache.max_size = max_size;
+    _compile_cache.max_age = max_age;
+    _compile_cache.evict();
+    
+#%% Get the compile cache statistics
+def get_compile_cache_statistics():
+    '''Get the hit and miss statistics of the compile cache.
+    
+    Returns
+    -------
+    statistics : dictionary
+        {"hits" : int, "misses" : int, "evictions" : int, 
+        "problem_transfers" : int, "problem_reuses" : int}, where hits and 
+        misses count compiled fmus found in and added to the cache, and the
+        problem counts are for transferred optimization problems.
+    
+    '''
+
+    return _compile_cache.get_statistics()
+    
+#%% Hash the content of a file
+def _hash_file(file_path):
+    '''Get the sha1 hex digest of the content of a file.
+    
+    The hash is memoized by file size and modification time, so the file is
+    only read again if it changes.
+    
+    '''
+    
+    file_path = os.path.abspath(file_path);
+    stat = os.stat(file_path);
+    stamp = (file_path, stat.st_size, stat.st_mtime);
+    if stamp not in _file_hashes:
+        sha1 = hashlib.sha1();
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                sha1.update(chunk);
+        _file_hashes[stamp] = sha1.hexdigest();
+        
+    return _file_hashes[stamp]
+        
+#%% Save a DataFrame of inputs or results
+def _save_df(df, file_name, file_format):
+    '''Save a DataFrame of simulation or optimization inputs or results.
+    
+    Parameters
+    ----------
+    df : ``pandas`` DataFrame
+        Inputs or results to save.
+    file_name : string
+        Name of the file without extension.
+    file_format : boolean or string
+        ``'parquet'`` to save to a parquet file, otherwise to a csv file.
+    
+    '''
+    
+    if file_format == 'parquet':
+        _write_parquet(df, file_name + '.parquet');
+    else:
+        df.to_csv(file_name + '.csv');
+
+#%% Write a DataFrame to a parquet file
+def _write_parquet(df, file_path, row_group_size = None):
+    '''Write a DataFrame to a parquet file with pyarrow.
+    
+    The index is written as a column, named as the index.
+    
+    Parameters
+    ----------
+    df : ``pandas`` DataFrame
+        Data to write.
+    file_path : string
+        Path of the parquet file.
+    row_group_size : int, optional
+        Maximum number of rows in a row group.  
+        Default is None, for one row group.
+    
+    '''
+    
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    table = pa.Table.from_pandas(df);
+    pq.write_table(table, file_path, row_group_size = row_group_size, coerce_timestamps = 'us');
+
+#%% Read a DataFrame from a parquet file
+def _read_parquet(file_path, columns = None, time_column = None, start_time = None, final_time = None):
+    '''Read a DataFrame from a parquet file with pyarrow.
+    
+    If a time column is given, only the row groups whose time statistics
+    overlap the time interval are read, and then only the rows within it
+    are kept.
+    
+    Parameters
+    ----------
+    file_path : string
+        Path of the parquet file.
+    columns : list of strings, optional
+        Columns to read, which may include the columns of a named index.  
+        Default is None, for all columns with the index restored.
+    time_column : string, optional
+        Column of time stamps without time zone to filter.
+    start_time, final_time : ``pandas`` Timestamp, optional
+        Time interval of the rows to read, without time zone.
+        Required if time_column is given.
+        
+    Returns
+    -------
+    df : ``pandas`` DataFrame
+        Data read.
+    
+    '''
+    
+    import pyarrow.parquet as pq
+    parquet_file = pq.ParquetFile(file_path);
+    row_groups = range(parquet_file.num_row_groups);
+    if time_column is not None:
+        row_groups = _get_parquet_row_groups(parquet_file, time_column, start_time, final_time);
+    if row_groups:
+        table = parquet_file.read_row_groups(row_groups, columns = columns, use_pandas_metadata = columns is None);
+        df = table.to_pandas();
+    else:
+        # Keep the columns of the file without rows
+        table = parquet_file.read_row_group(0, columns = columns, use_pandas_metadata = columns is None);
+        df = table.to_pandas().iloc[:0];
+    if time_column is not None:
+        df = df[(df[time_column] >= start_time) & (df[time_column] <= final_time)];
+    
+    return df
+
+def _get_parquet_row_groups(parquet_file, time_column, start_time, final_time):
+    '''Get the row groups of a parquet file that overlap a time interval.
+    
+    Row groups without time statistics are always included.
+    
+    Returns
+    -------
+    row_groups : list of int
+        Indices of the row groups to read.
+    
+    '''
+    
+    arrow_schema = parquet_file.schema.to_arrow_schema();
+    names = [field.name for field in arrow_schema];
+    j = names.index(time_column);
+    unit = getattr(arrow_schema[j].type, 'unit', 'ns');
+    row_groups = [];
+    for i in range(parquet_file.num_row_groups):
         try:
-            temp_var = variables.Static('tempvar', 1, unit_class_item[1]);   
-            if unit_string == temp_var.get_display_unit_name():
-                unit_class = unit_class_item[1];
-                break
-        except:
+            statistics = parquet_file.metadata.row_group(i).column(j).statistics;
+            group_start = _parquet_statistic_to_timestamp(statistics.min, unit);
+            group_final = _parquet_statistic_to_timestamp(statistics.max, unit);
+        except (AttributeError, TypeError, ValueError):
+            row_groups.append(i);
             continue
+        if group_final >= start_time and group_start <= final_time:
+            row_groups.append(i);
+    
+    return row_groups
 
-    return unit_class
+def _parquet_statistic_to_timestamp(value, unit):
+    '''Convert a parquet time statistic to a timestamp without time zone.
+    
+    Older versions of pyarrow return the statistic as an integer in the 
+    unit of the column, newer ones as a datetime.
+    
+    '''
+    
+    if isinstance(value, (int, long, np.integer)):
+        timestamp = pd.Timestamp(int(value), unit = unit);
+    else:
+        timestamp = pd.Timestamp(value);
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.tz_convert(None);
+        
+    return timestamp
+
+#%% Align timeseries on the union of their times
+def _align_mpcpy_ts_list(mpcpy_ts_list):
+    '''Align the base data of mpcpy timeseries on the union of their times.
+    
+    Missing values are linearly interpolated by position between the 
+    neighboring values and the last value is held, as by the linear 
+    interpolation of a ``pandas`` dataframe.  Values before the first value
+    of a timeseries stay missing.
+    
+    Parameters
+    ----------
+    mpcpy_ts_list : list of variables.Timeseries objects
+        Timeseries to align.
+        
+    Returns
+    -------
+    names : list of strings
+        Sorted names of the timeseries.
+    grid : ``numpy`` array
+        Sorted union of the times as int64 nanoseconds in UTC.
+    data : ``numpy`` array
+        Aligned data with a row for each time and a column for each name.
+    
+    '''
+    
+    series = {};
+    for mpcpy_ts in mpcpy_ts_list:
+        series[mpcpy_ts.name] = mpcpy_ts.get_base_data();
+    names = sorted(series.keys());
+    times = [series[name].index.asi8 for name in names];
+    grid = np.unique(np.concatenate(times));
+    data = np.empty((len(grid), len(names)));
+    data.fill(np.nan);
+    position = np.arange(len(grid));
+    for j, name in enumerate(names):
+        data[np.searchsorted(grid, times[j]), j] = series[name].values;
+        valid = ~np.isnan(data[:, j]);
+        if valid.any():
+            fill = ~valid & (position > position[valid][0]);
+            data[fill, j] = np.interp(position[fill], position[valid], data[valid, j]);
+    
+    return names, grid, data
+
+#%% Get the list of exodata inputs
+def _get_input_mpcpy_ts_list(source, input_names, internal_input_names = None):
+    '''Get the mpcpy timeseries of the exodata of an object that are inputs.
+    
+    Parameters
+    ----------
+    source : object
+        Object with the ``weather_data``, ``internal_data``, 
+        ``control_data``, and ``other_inputs`` attributes.
+    input_names : list of strings
+        Names of the inputs.
+    internal_input_names : list of strings, optional
+        Names of the inputs to check the internal loads against.
+        Default is input_names.
+        
+    Returns
+    -------
+    input_mpcpy_ts_list : list of variables.Timeseries objects
+        Timeseries of the weather, internal, control, and other inputs.
+    
+    '''
+    
+    if internal_input_names is None:
+        internal_input_names = input_names;
+    input_mpcpy_ts_list = [];
+    # Weather
+    for key in source.weather_data.keys():
+        if key in input_names:
+            input_mpcpy_ts_list.append(source.weather_data[key]);
+    # Internal
+    for zone in source.internal_data.keys():
+        for intLoad in ['intCon', 'intRad', 'intLat']:
+            if intLoad+'_'+zone in internal_input_names:
+                input_mpcpy_ts_list.append(source.internal_data[zone][intLoad]);
+    # Controls
+    for key in source.control_data.keys():
+        if key in input_names:
+            input_mpcpy_ts_list.append(source.control_data[key]);                     
+    # Other inputs                   
+    for key in source.other_inputs.keys():
+        if key in input_names:
+            input_mpcpy_ts_list.append(source.other_inputs[key]);
+            
+    return input_mpcpy_ts_list
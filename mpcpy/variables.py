@@ -58,6 +58,7 @@ class _Variable(object):
     '''
 
     __metaclass__ = ABCMeta;
+    _display_cache = None;
     
     @abstractmethod
     def set_data(self,data):
@@ -83,6 +84,11 @@ class _Variable(object):
     def display_data(self, **kwargs):
         '''Return the data of the variable in display units.
         
+        The display data is cached for the display unit and time zone 
+        requested, so repeated calls do not convert the data again.  The 
+        cache is cleared when the data or display unit is set.  The returned 
+        data should therefore not be modified in place.
+        
         Parameters
         ----------
         geography : list, optional
@@ -98,16 +104,30 @@ class _Variable(object):
             Data object of the variable in display units.
             
         '''
-        if type(self.data) is list:
-            self._timeseries = [self.display_unit._convert_from_base(x) for x in self.data];
-        else:
-            self._timeseries = self.display_unit._convert_from_base(self.data);        
+        
+        # Set time zone if requested
         if 'geography' in kwargs:
             self._load_time_zone(kwargs['geography']);
-            self._timeseries = self._utc_to_local(self._timeseries);
+            tz_name = self.tz_name;
         elif 'tz_name' in kwargs:
             self.tz_name = kwargs['tz_name'];
+            tz_name = self.tz_name;
+        else:
+            tz_name = None;
+        # Return cached display data if available
+        display_key = (type(self.display_unit), tz_name);
+        if self._display_cache is not None and self._display_cache[0] == display_key:
+            return self._display_cache[1];
+        # Otherwise convert
+        if type(self.data) is list:
+            self._timeseries = self.display_unit._convert_from_base_array(self.data).tolist();
+        elif isinstance(self.data, np.ndarray):
+            self._timeseries = self.display_unit._convert_from_base_array(self.data);
+        else:
+            self._timeseries = self.display_unit._convert_from_base(self.data);        
+        if tz_name is not None:
             self._timeseries = self._utc_to_local(self._timeseries);
+        self._display_cache = (display_key, self._timeseries);
             
         return self._timeseries;
         
@@ -123,6 +143,7 @@ class _Variable(object):
         
         quantity_old = self.quantity_name;
         self.display_unit = display_unit(self);
+        self._display_cache = None;
         if quantity_old != self.quantity_name:
             raise(AssertionError, 'Display unit to be set has a different quantity than the existing variable display unit.');   
             
@@ -366,14 +387,15 @@ class Static(_Variable):
 
         '''
         
+        self._display_cache = None;
         if type(data) is float:
             self.data = self.display_unit._convert_to_base(float(data));
         elif type(data) is int: 
             self.data = self.display_unit._convert_to_base(float(data));
         elif type(data) is list:
-            self.data = [self.display_unit._convert_to_base(float(x)) for x in data];
+            self.data = self.display_unit._convert_to_base_array(data).tolist();
         elif isinstance(data, np.ndarray):
-            self.data = np.array([self.display_unit._convert_to_base(float(x)) for x in data]);
+            self.data = self.display_unit._convert_to_base_array(data);
         elif type(data) is str:
             raise TypeError('String data is not supported. Data must be numeric or list or numpy array of numerics.')
         else:
@@ -443,6 +465,7 @@ class Timeseries(_Variable):
 
         '''
 
+        self._display_cache = None;
         self._timeseries = timeseries;       
         if 'cleaning_type' in kwargs and kwargs['cleaning_type'] is not None:       
             cleaning_type = kwargs['cleaning_type'];
@@ -454,7 +477,29 @@ class Timeseries(_Variable):
         else:
             self.tz_name = tz_name;
             self._timeseries = self._local_to_utc(self._timeseries);
-        self.data = self.display_unit._convert_to_base(self._timeseries.apply(float));
+        self.data = self.display_unit._convert_to_base_array(self._timeseries);
+        
+    def _set_base_data(self, data):
+        '''Set data of Timeseries variable that is already in base units and utc.
+        
+        The display unit and time zone of the variable are kept.
+
+        Parameters
+        ----------
+        data : ``pandas`` Series
+            Timeseries data of variable in base units.  Must have an index of
+            timestamps in utc.
+
+        Yields
+        ------
+        data : ``pandas`` Series
+            Data attribute.            
+
+        '''
+        
+        self._display_cache = None;
+        self.data = data;
+        self._timeseries = self.display_unit._convert_from_base(data);
         
     def cleaning_replace(self, (to_replace, replace_with)):
         '''Cleaning method to replace values within timeseries.
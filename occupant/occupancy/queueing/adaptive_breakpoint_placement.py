@@ -2,7 +2,7 @@
 from __future__ import division
 import numpy as np
 import random as rd
-from simulate_queue import simulate_queue
+from simulate_queue import simulate_queue, departure_hazard
 from interp1 import interp1
 from parameter_inference import param_inference
 from unique_last import unique_last
@@ -105,6 +105,9 @@ def adaptive_breakpoint_placement(data, res, margin, n_max):
             else:
                 empty_time_relative = empty_time-left+1
 
+            # the departure hazard is the same for all iterations
+            hazard = departure_hazard(mu)
+
             for iter_idx in range(iter_num):
 
 
@@ -114,7 +117,7 @@ def adaptive_breakpoint_placement(data, res, margin, n_max):
                     nstart = data[rd.randint(0,valSize-1),left-1]
 
 
-                jmptimes,syssize = simulate_queue(maxtime,lam,mu,nstart,empty_time_relative)
+                jmptimes,syssize = simulate_queue(maxtime,lam,mu,nstart,empty_time_relative,hazard)
 
 
 
@@ -6,13 +6,15 @@ import warnings
 
 
 
-def simulate_queue(maxtime,lam,mu,nstart,empty_time):
+def simulate_queue(maxtime,lam,mu,nstart,empty_time,hazard=None):
     # Function for simulate queue system size given the queue parameters
     # Inputs: maxtime - the time range for simualtion
     # lam - arrival rate (vector for nonhomogeneous queue), a numpy array
     # mu - departure rate (vector for nonhomogeneous queue), a numpy array
     # nstart - the number of customers in the system at the beginning of simulation
     # empty_time - the time when the queue system is known to have zero customer
+    # hazard - departure_hazard(mu), computed from mu if None, so that it can be
+    # computed once for repeated simulations of the same rate profile
 
 
     # First, generate arrivals from homogeneous Poisson process with parameter 1
@@ -74,21 +76,16 @@ def simulate_queue(maxtime,lam,mu,nstart,empty_time):
     ntotal = E.size
     keeptimes = np.floor(E).astype(int)
 
-    servtimes = []
+    if hazard is None:
+        hazard = departure_hazard(mu)
     if not empty_time:
-        for i in range(ntotal):
-            serv_sample = simulate_service(keeptimes[i],mu)
-            if serv_sample is None:
-                serv_sample = maxtime-1
-            servtimes.append(serv_sample)
+        servtimes_array = simulate_service(keeptimes,hazard)
+        # no departure within the time range
+        servtimes_array[servtimes_array < 0] = maxtime-1
     else:
-        trunc_length = empty_time-keeptimes
-        for i in range(ntotal):
-            if trunc_length[i] == 0:
-                raise NameError('Truncation length zero')
-            serv_sample = simulate_service_with_trunc(keeptimes[i],mu,trunc_length[i])
-            servtimes.append(serv_sample)
-    servtimes_array = np.array(servtimes)
+        if np.any(empty_time-keeptimes == 0):
+            raise NameError('Truncation length zero')
+        servtimes_array = simulate_service_with_trunc(keeptimes,hazard,empty_time)
     deptimes = np.add(keeptimes,servtimes_array)
 
     # sort all the arrivals and departures
@@ -112,27 +109,54 @@ def simulate_queue(maxtime,lam,mu,nstart,empty_time):
 
 
 
-def simulate_service(arrtime, mu):
-    mu_used = mu[arrtime:]
-    mu_cum = np.cumsum(mu_used)
-    cdf = 1- np.exp(-mu_cum)
-    r = np.random.uniform(0,1,1)
-    temp = np.where(cdf > r)
-    if temp[0].size!=0:
-        return temp[0][0]
-    else:
-        return None
+def departure_hazard(mu):
+    # Function for the cumulative departure hazard of a departure rate profile
+    # Input: mu - departure rate (vector for nonhomogeneous queue), a numpy array
+    # Output: hazard - hazard[t] is the sum of mu[:t], a numpy array of size mu.size+1
+
+    return np.concatenate((np.zeros((1,)),np.cumsum(mu)))
+
 
+def simulate_service(arrtimes,hazard,r=None):
+    # Function for sampling the service times of customers by inverse transform
+    # Inputs: arrtimes - the integer arrival times of the customers, a numpy array
+    # hazard - departure_hazard(mu)
+    # r - uniform samples in [0, 1), one for each customer, drawn if None
+    # Output: servtimes - the service times, -1 where the customer does not
+    # depart within the time range of mu
+    #
+    # The service time of a customer arriving at a is the first j such that
+    # 1-exp(-(hazard[a+j+1]-hazard[a])) > r, so all customers are sampled with
+    # one search of the cumulative hazard
+
+    if r is None:
+        r = np.random.uniform(0,1,arrtimes.size)
+    target = hazard[arrtimes]-np.log1p(-r)
+    idx = np.searchsorted(hazard,target,side='right')
+    servtimes = idx-arrtimes-1
+    servtimes[idx == hazard.size] = -1
+
+    return servtimes
+
+
+def simulate_service_with_trunc(arrtimes,hazard,trunc_time,r=None):
+    # Function for sampling the service times of customers who are known to
+    # depart before a time, by inverse transform
+    # Inputs: arrtimes - the integer arrival times of the customers, a numpy array
+    # hazard - departure_hazard(mu)
+    # trunc_time - the time before which all customers depart, such as empty_time
+    # r - uniform samples in [0, 1), one for each customer, drawn if None
+    # Output: servtimes - the service times, less than trunc_time-arrtimes and
+    # within the time range of mu
+    #
+    # The distribution of each customer is truncated by normalizing its cdf with
+    # the probability 1-exp(-(hazard[trunc_time]-hazard[a])) of departing in time
 
-def simulate_service_with_trunc(arrtime,mu,trunc_length):
-    mu_used = mu[arrtime:arrtime+trunc_length]
-    mu_cum = np.cumsum(mu_used)
-    cdf = (1-np.exp(-mu_cum))/(1-np.exp(-mu_cum[-1]))
-    r = np.random.uniform(0,1,1)
-    temp = np.where(cdf > r)
+    if r is None:
+        r = np.random.uniform(0,1,arrtimes.size)
+    hazard_trunc = hazard[:trunc_time+1]
+    p_trunc = -np.expm1(hazard[arrtimes]-hazard_trunc[-1])
+    target = hazard[arrtimes]-np.log1p(-r*p_trunc)
+    idx = np.searchsorted(hazard_trunc,target,side='right')
 
-    try:
-        answer = temp[0][0]
-        return answer
-    except:
-        print('temp = ', temp)
\ No newline at end of file
+    return np.minimum(idx,hazard_trunc.size-1)-arrtimes-1
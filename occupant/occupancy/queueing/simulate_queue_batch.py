@@ -0,0 +1,111 @@
+from __future__ import division
+import numpy as np
+from simulate_queue import simulate_queue, departure_hazard, simulate_service, simulate_service_with_trunc
+from unique_last import unique_last
+from interp1 import interp1
+
+
+
+def simulate_queue_batch(maxtime,lam,mu,nstart,empty_time,iter_num,random_state=None):
+    # Function for simulating the queue system size of all Monte Carlo replicates at once
+    # Inputs: maxtime - the time range for simulation, an integer
+    # lam - arrival rate (vector for nonhomogeneous queue), a numpy array
+    # mu - departure rate (vector for nonhomogeneous queue), a numpy array
+    # nstart - the number of customers in the system at the beginning of simulation
+    # empty_time - the time when the queue system is known to have zero customer
+    # iter_num - the number of Monte Carlo replicates
+    # random_state - numpy RandomState used for the samples, np.random if None
+    # Output: syssize - the system size of each replicate (column) at each integer
+    # time (row) in [0, maxtime), a numpy array of shape (maxtime, iter_num)
+    #
+    # Each replicate is the queue of simulate_queue on the integer time grid, as
+    # interpolated by interp1 after unique_last.  The samples are drawn in the same
+    # order as iter_num calls of simulate_queue, so the replicates are the same as
+    # those of the calls for the same random state.
+
+    if random_state is None:
+        random_state = np.random
+    syssize = np.zeros((maxtime,iter_num))
+
+    # First, generate arrivals from homogeneous Poisson process with parameter 1
+    lam_max = max(lam)
+    if lam_max == 0:
+        return syssize
+    lam = lam/lam_max
+
+    # Draw the arrivals, thin them, and draw a uniform sample for the service of
+    # each customer, replicate by replicate to keep the order of the samples
+    keeptimes = []
+    replicate = []
+    r_serv = []
+    for iter_idx in range(iter_num):
+        npoints = random_state.poisson(maxtime*lam_max)
+        if npoints == 0:
+            continue
+        arrtimes = np.sort(random_state.uniform(0,1,npoints)*maxtime)
+        arrtimes_floor = np.floor(arrtimes).astype(int)
+        r = random_state.uniform(0,1,arrtimes.size)
+        accepted = r - lam[arrtimes_floor] < 0
+        if empty_time is not None: # if the segment contains the empty region
+            accepted = np.logical_and(accepted, arrtimes_floor < empty_time)
+        if not np.any(accepted):
+            continue
+        keep = np.concatenate((np.zeros((int(nstart),),dtype=int), arrtimes_floor[accepted]))
+        keeptimes.append(keep)
+        replicate.append(iter_idx*np.ones((keep.size,),dtype=int))
+        r_serv.append(random_state.uniform(0,1,keep.size))
+    if not keeptimes:
+        return syssize
+    keeptimes = np.concatenate(keeptimes)
+    replicate = np.concatenate(replicate)
+    r_serv = np.concatenate(r_serv)
+
+    # Sample the service times of all customers from the cumulative hazard
+    hazard = departure_hazard(mu)
+    if not empty_time:
+        servtimes = simulate_service(keeptimes,hazard,r_serv)
+        # no departure within the time range
+        servtimes[servtimes < 0] = maxtime-1
+    else:
+        if np.any(empty_time-keeptimes == 0):
+            raise NameError('Truncation length zero')
+        servtimes = simulate_service_with_trunc(keeptimes,hazard,empty_time,r_serv)
+    deptimes = keeptimes + servtimes
+
+    # Count the arrivals and departures of each replicate at each integer time,
+    # with the departures after the time window of interest in the last bin
+    nbins = maxtime+1
+    arrcount = np.bincount(replicate*nbins + keeptimes, minlength=iter_num*nbins)
+    depcount = np.bincount(replicate*nbins + np.minimum(deptimes,maxtime), minlength=iter_num*nbins)
+    netcount = np.cumsum((arrcount-depcount).reshape((iter_num,nbins)),axis=1)
+
+    # The system size on the grid holds the size before the jump at each time,
+    # except at time zero, where it holds the size after
+    syssize[0,:] = netcount[:,0]
+    syssize[1:,:] = np.transpose(netcount[:,:maxtime-1])
+
+    return syssize
+
+
+def simulate_queue_loop(maxtime,lam,mu,nstart,empty_time,iter_num):
+    # Function for simulating the queue system size of the Monte Carlo replicates
+    # one by one, the reference for simulate_queue_batch
+    # Inputs: as for simulate_queue_batch, with the samples drawn from np.random
+    # Output: syssize_mc - the system size of each replicate (column) at each
+    # integer time (row) in [0, maxtime), a numpy array of shape (maxtime, iter_num)
+
+    time_int = np.arange(maxtime)
+    syssize_mc = np.zeros((maxtime,iter_num))
+    for iter_idx in range(iter_num):
+        jmptimes, syssize = simulate_queue(maxtime,lam,mu,nstart,empty_time)
+        if jmptimes is None:
+            continue
+        # round jmptimes to the nearest integer
+        jmptimes_d, ia = unique_last(np.round(jmptimes))
+        syssize_d = syssize[ia]
+        if jmptimes_d[0] != 0:
+            jmptimes_d = np.insert(jmptimes_d, 0, 0)
+            syssize_d = np.insert(syssize_d, 0, 0)
+        syssize_mc[:,iter_idx] = interp1(jmptimes_d, syssize_d, time_int)
+
+    return syssize_mc
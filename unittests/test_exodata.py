@@ -13,6 +13,7 @@ import numpy as np
 import pickle
 import copy
 import os
+import shutil
 import pandas as pd
 import datetime
 import pytz
@@ -56,6 +57,56 @@ class WeatherFromEPW(TestCaseMPCPy):
         df_test = self.weather.get_base_data();
         self.check_df(df_test, 'collect_data_partial_base.csv');
 
+    def test_collect_data_incremental(self):
+        # Full collection of the second horizon
+        weather_full = exodata.WeatherFromEPW(self.epw_filepath);
+        weather_full.collect_data('10/3/2015', '10/5/2015');
+        df_full = weather_full.get_base_data();
+        # Incremental collection of the second horizon
+        self.weather.collect_data('10/2/2015', '10/4/2015', incremental = True);
+        self.weather.collect_data('10/3/2015', '10/5/2015', incremental = True);
+        df_test = self.weather.get_base_data();
+        self.assertTrue(df_test.index.equals(df_full.index));
+        for key in df_full.columns:
+            self.assertTrue(np.allclose(df_test[key].values, df_full[key].values), key);
+        # Retention keeps data before the start time
+        self.weather.collect_data('10/4/2015', '10/6/2015', incremental = True, retention = '1D');
+        df_test = self.weather.get_base_data();
+        self.assertEqual(df_test.index[0], pd.Timestamp('10/3/2015', tz = 'America/Chicago'));
+        self.assertEqual(df_test.index[-1], pd.Timestamp('10/6/2015', tz = 'America/Chicago'));
+        
+    def test_clip_counts(self):
+        start_time = '1/1/2015';
+        final_time = '1/1/2016';
+        self.weather.collect_data(start_time, final_time);
+        # Check counts reported for each checked variable
+        self.assertEqual(sorted(self.weather.clip_counts.keys()), \
+                         ['weaCelHei', 'weaNOpa', 'weaNTot', 'weaRelHum']);
+        # Check counts against the raw epw columns of the collected times
+        df_epw = pd.read_csv(self.epw_filepath, skiprows = 8, header = None, names = exodata._epw_header);
+        raw = {'weaCelHei' : df_epw['Ceiling'].values, \
+               'weaNOpa' : df_epw['Opaque sky cover'].values/10.0, \
+               'weaNTot' : df_epw['Total sky cover'].values/10.0, \
+               'weaRelHum' : df_epw['Relative humidity'].values/100.0};
+        bounds = {'weaCelHei' : (-np.inf, 20000), \
+                  'weaNOpa' : (0.011, 1.0), \
+                  'weaNTot' : (0.011, 1.0), \
+                  'weaRelHum' : (0.0, 0.989)};
+        for key in raw.keys():
+            # The epw data swap repeats the first row and drops the last one
+            values = np.concatenate([raw[key][0:1], raw[key][:-1]]);
+            values = values[:len(self.weather.data[key].get_base_data())];
+            count = np.sum(values < bounds[key][0]) + np.sum(values > bounds[key][1]);
+            self.assertEqual(self.weather.clip_counts[key], count, key);
+        # Check data within bounds
+        df_test = self.weather.get_base_data();
+        self.assertLessEqual(df_test['weaCelHei'].max(), 20000);
+        for key in ['weaNOpa', 'weaNTot']:
+            self.assertGreaterEqual(df_test[key].min(), 0.011);
+            self.assertLessEqual(df_test[key].max(), 1.0);
+        self.assertGreaterEqual(df_test['weaRelHum'].min(), 0.0);
+        self.assertLessEqual(df_test['weaRelHum'].max(), 0.989);
+
     def test_standard_time(self):
         start_time = '1/1/2015';
         final_time = '1/1/2016';
@@ -69,6 +120,76 @@ class WeatherFromEPW(TestCaseMPCPy):
         df_test = weather.display_data();
         self.check_df(df_test, 'collect_data_standard_time.csv');
 
+class WeatherFromEPWCache(TestCaseMPCPy):
+    '''Test the cache of parsed epw data.
+    
+    '''
+    
+    def setUp(self):
+        self.epw_filepath = os.path.join(self.get_unittest_path(), 'resources', 'weather', \
+                                         'USA_IL_Chicago-OHare.Intl.AP.725300_TMY3.epw');
+        self.cache_dir = os.path.join(self.get_unittest_path(), 'outputs', 'epw_cache');
+        if os.path.exists(self.cache_dir):
+            shutil.rmtree(self.cache_dir);
+        exodata.set_epw_cache(self.cache_dir);
+        exodata._epw_cache.clear();
+        
+    def tearDown(self):
+        exodata.set_epw_cache(None);
+        exodata._epw_cache.clear();
+        shutil.rmtree(self.cache_dir);
+        
+    def test_cache(self):
+        # First collection parses the file and writes the cache
+        weather = exodata.WeatherFromEPW(self.epw_filepath);
+        weather.collect_data('10/2/2015 06:00:00', '10/3/2015 06:00:00');
+        self.assertEqual(len(exodata._epw_cache), 1);
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1);
+        # Successive horizon slices the cached data
+        weather.collect_data('10/3/2015 06:00:00', '10/4/2015 06:00:00');
+        self.assertEqual(len(exodata._epw_cache), 1);
+        df_memory = weather.get_base_data();
+        # Collection from the on-disk cache gives the same data
+        exodata._epw_cache.clear();
+        weather.collect_data('10/3/2015 06:00:00', '10/4/2015 06:00:00');
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1);
+        pd.util.testing.assert_frame_equal(weather.get_base_data(), df_memory);
+        # Collection for another year parses the file again
+        weather.collect_data('10/3/2016 06:00:00', '10/4/2016 06:00:00');
+        self.assertEqual(len(exodata._epw_cache), 2);
+        self.assertEqual(len(os.listdir(self.cache_dir)), 2);
+
+class WeatherProcessor(TestCaseMPCPy):
+    '''Test the native implementation of the weather processor fmu.
+    
+    '''
+    
+    def setUp(self):
+        self.epw_filepath = os.path.join(self.get_unittest_path(), 'resources', 'weather', \
+                                         'USA_IL_Chicago-OHare.Intl.AP.725300_TMY3.epw');
+        # References of the weather processor fmu
+        self.ref_dir = os.path.join('..', 'WeatherFromEPW');
+        
+    def test_collect_data(self):
+        weather = exodata.WeatherFromEPW(self.epw_filepath, process_method = 'numpy');
+        weather.collect_data('1/1/2015', '1/1/2016');
+        # Check fmu reference
+        df_test = weather.display_data();
+        self.check_df(df_test, os.path.join(self.ref_dir, 'collect_data.csv'));
+        
+    def test_collect_data_partial(self):
+        weather = exodata.WeatherFromEPW(self.epw_filepath, process_method = 'numpy');
+        weather.collect_data('10/2/2015 06:00:00', '11/13/2015 16:00:00');
+        # Check fmu references
+        df_test = weather.display_data();
+        self.check_df(df_test, os.path.join(self.ref_dir, 'collect_data_partial_display.csv'));
+        df_test = weather.get_base_data();
+        self.check_df(df_test, os.path.join(self.ref_dir, 'collect_data_partial_base.csv'));
+            
+    def test_catch_method_error(self):
+        with self.assertRaises(NameError):
+            exodata.WeatherFromEPW(self.epw_filepath, process_method = 'test');
+
 class CalSolRad(TestCaseMPCPy):
     '''Test the method of calculate_solar_radiation
 
@@ -107,7 +228,23 @@ class CalSolRad(TestCaseMPCPy):
         # Check reference
         df_test = weather.display_data();
         self.check_df(df_test, 'calculate_solar_radiation.csv')
-    
+
+    def test_calculate_other_methods(self):
+        # Instantiate weather object
+        weather = exodata.WeatherFromCSV(self.csv_filepath, \
+                                         self.variable_map, \
+                                         self.geography, \
+                                         time_header = self.time_header, \
+                                         tz_name = 'from_geography')
+        # Get weather data
+        weather.collect_data(self.start_time, self.final_time)
+        # Calculate solar radiation and check reference of each method
+        for method, ref_file_name in [('Kasten-Czeplak', 'calculate_solar_radiation_kasten_czeplak.csv'), \
+                                      ('Haurwitz', 'calculate_solar_radiation_haurwitz.csv')]:
+            weather.calculate_solar_radiation(method = method)
+            df_test = weather.display_data();
+            self.check_df(df_test, ref_file_name)
+
     def test_catch_method_error(self):
         # Instantiate weather object
         with self.assertRaises(NameError):
@@ -163,6 +300,50 @@ class WeatherFromCSV(TestCaseMPCPy):
             weather = exodata.WeatherFromCSV(self.csv_filepath,
                                              self.variable_map);
 
+    def test_collect_data_incremental(self):
+        time_header = 'DateUTC';
+        weather_full = exodata.WeatherFromCSV(self.csv_filepath, \
+                                              self.variable_map, \
+                                              self.geography, \
+                                              time_header = time_header);
+        weather_full.collect_data('2016-10-19 22:53:00', '2016-10-20 06:53:00');
+        weather = exodata.WeatherFromCSV(self.csv_filepath, \
+                                         self.variable_map, \
+                                         self.geography, \
+                                         time_header = time_header);
+        weather.collect_data('2016-10-19 19:53:00', '2016-10-20 03:53:00', incremental = True);
+        weather.collect_data('2016-10-19 22:53:00', '2016-10-20 06:53:00', incremental = True);
+        pd.util.testing.assert_frame_equal(weather.get_base_data(), weather_full.get_base_data());
+
+    def test_collect_data_stream(self):
+        start_time = '2016-10-19 19:53:00';
+        final_time = '2016-10-20 06:53:00';
+        time_header = 'DateUTC';
+        weather_full = exodata.WeatherFromCSV(self.csv_filepath, \
+                                              self.variable_map, \
+                                              self.geography, \
+                                              time_header = time_header);
+        weather_full.collect_data(start_time, final_time);
+        # Stream in chunks with and without the sidecar time index
+        index_path = self.csv_filepath + '.tidx.npz';
+        block = utility._csv_time_index_block;
+        utility._csv_time_index_block = 5;
+        try:
+            for time_index in [False, True]:
+                weather = exodata.WeatherFromCSV(self.csv_filepath, \
+                                                 self.variable_map, \
+                                                 self.geography, \
+                                                 time_header = time_header, \
+                                                 chunksize = 7, \
+                                                 time_index = time_index);
+                weather.collect_data(start_time, final_time);
+                pd.util.testing.assert_frame_equal(weather.get_base_data(), weather_full.get_base_data());
+            self.assertTrue(os.path.exists(index_path));
+        finally:
+            utility._csv_time_index_block = block;
+            if os.path.exists(index_path):
+                os.remove(index_path);
+
     def test_collect_data_default_time(self):
         start_time = '2016-10-19 19:53:00';
         final_time = '2016-10-20 06:53:00';
@@ -658,6 +839,36 @@ class ControlFromDF(TestCaseMPCPy):
         df_test = control.display_data();
         self.check_df(df_test, 'collect_data.csv');
 
+class ControlFromParquet(TestCaseMPCPy):
+    '''Test the collection of control data from a parquet file.
+    
+    '''
+    
+    def setUp(self):
+        self.csv_filepath = os.path.join(self.get_unittest_path(), 'resources', 'building', 'ControlCSV_0.csv');
+        self.parquet_filepath = os.path.join(self.get_unittest_path(), 'outputs', 'ControlParquet_0.parquet');
+        df = pd.read_csv(self.csv_filepath);
+        df['Time'] = pd.to_datetime(df['Time']);
+        utility._write_parquet(df, self.parquet_filepath, row_group_size = 24);
+        self.variable_map = {'conHeat_wes' : ('conHeat_wes', units.unit1), \
+                             'conHeat_hal' : ('conHeat_hal', units.unit1)};
+                        
+    def tearDown(self):
+        os.remove(self.parquet_filepath);
+        del self.variable_map
+
+    def test_collect_data(self):
+        start_time = '1/1/2015 13:00:00';
+        final_time = '1/2/2015';
+        control_csv = exodata.ControlFromCSV(self.csv_filepath, \
+                                             self.variable_map);
+        control_csv.collect_data(start_time, final_time);
+        control = exodata.ControlFromParquet(self.parquet_filepath, \
+                                             self.variable_map);
+        control.collect_data(start_time, final_time);
+        pd.util.testing.assert_frame_equal(control.display_data(), control_csv.display_data());
+        self.assertEqual(sorted(control._df.columns), ['Time', 'conHeat_hal', 'conHeat_wes']);
+
 #%% Other Input Tests
 class OtherInputFromCSV(TestCaseMPCPy):
     '''Test the collection of other input data from a CSV file.
@@ -753,6 +964,27 @@ class ParameterFromCSV(TestCaseMPCPy):
         df_test = self.parameters.display_data();
         self.check_df(df_test, 'collect_data.csv', timeseries=False);
 
+class ParameterFromParquet(TestCaseMPCPy):
+    '''Test the collection of parameter data from a parquet file.
+    
+    '''
+    
+    def setUp(self):
+        self.csv_filepath = os.path.join(self.get_unittest_path(), 'resources', 'model', 'LBNL71T_Parameters.csv');
+        self.parquet_filepath = os.path.join(self.get_unittest_path(), 'outputs', 'LBNL71T_Parameters.parquet');
+        df = pd.read_csv(self.csv_filepath, dtype={'Unit':str});
+        utility._write_parquet(df, self.parquet_filepath);
+        
+    def tearDown(self):
+        os.remove(self.parquet_filepath);
+
+    def test_collect_data(self):
+        parameters_csv = exodata.ParameterFromCSV(self.csv_filepath);
+        parameters_csv.collect_data();
+        parameters = exodata.ParameterFromParquet(self.parquet_filepath);
+        parameters.collect_data();
+        pd.util.testing.assert_frame_equal(parameters.display_data(), parameters_csv.display_data());
+
 class ParameterSet(TestCaseMPCPy):
     '''Test setting parameter data.
     
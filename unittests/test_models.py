@@ -11,6 +11,8 @@ from mpcpy import systems
 from mpcpy import units
 from mpcpy import variables
 from testing import TestCaseMPCPy
+from occupant.occupancy.queueing.simulate_queue import departure_hazard, simulate_service, simulate_service_with_trunc
+from occupant.occupancy.queueing.simulate_queue_batch import simulate_queue_batch, simulate_queue_loop
 import pandas as pd
 import numpy as np
 from matplotlib import pyplot as plt
@@ -83,6 +85,9 @@ class SimpleRC(TestCaseMPCPy):
         self.check_df(df_test, 'simulate_display.csv');
         df_test = model.get_base_measurements('Simulated');
         self.check_df(df_test, 'simulate_base.csv');
+        # Check saved results
+        df_results = pd.read_csv('mpcpy_simulation_results_model.csv', index_col='Time');
+        np.testing.assert_allclose(df_results.values, df_test[list(df_results)].values);
 
     def test_estimate_one_par(self):
         '''Test the estimation of one parameter of a model.'''
@@ -413,6 +418,19 @@ class EstimateFromJModelicaRealCSV(TestCaseMPCPy):
             RMSE[key]['Value'] = self.model.RMSE[key].display_data();
         df_test = pd.DataFrame(data = RMSE);
         self.check_df(df_test, 'validate_RMSE_missing.csv', timeseries=False);
+        # Check metrics and bulk report of missing times
+        self.assertTrue(any(len(times) for times in self.model.missing_times.values()));
+        for key in self.model.RMSE.keys():
+            metrics = self.model.validation_metrics[key];
+            self.assertEqual(sorted(metrics.keys()), ['CVRMSE', 'MAE', 'MaxError', 'NMBE', 'RMSE']);
+            self.assertAlmostEqual(metrics['RMSE'].display_data(), RMSE[key]['Value'], places = 8);
+            self.assertTrue(metrics['MAE'].display_data() <= metrics['RMSE'].display_data() <= metrics['MaxError'].display_data());
+        # Check metric selection
+        self.model.set_validate_options({'metrics' : ['MAE']});
+        self.model.validate(self.start_time_validation, self.final_time_validation, \
+                            os.path.join(self.get_unittest_path(), 'outputs', 'model_validation_csv'), plot=0);
+        for key in self.model.RMSE.keys():
+            self.assertEqual(list(self.model.validation_metrics[key].keys()), ['MAE']);
 
     def test_estimate_and_validate_global_start_init(self):
         '''Test the estimation of a model's coefficients based on measured data using global start and user-defined initial value.'''
@@ -430,6 +448,31 @@ class EstimateFromJModelicaRealCSV(TestCaseMPCPy):
         # Finish test
         self._finish_estimate_validate('_global_start_woinit')
         
+    def test_estimate_global_start_parallel(self):
+        '''Test the global start estimation in worker processes gives the same result as in serial.'''
+        plt.close('all');
+        # Estimate in worker processes
+        self.model.parameter_estimate(self.start_time_estimation, self.final_time_estimation, self.measurement_variable_list, global_start=7, seed=0, use_initial_values=True, processes=4);
+        glo_est_data_parallel = self.model.get_global_estimate_data();
+        # Check same as serial reference
+        self._finish_estimate_validate('_global_start_winit')
+        self.assertEqual(sorted(glo_est_data_parallel.keys()), range(8) + ['J_Best']);
+        
+    def test_estimate_global_start_target(self):
+        '''Test the global start estimation stops when the target objective is reached.'''
+        plt.close('all');
+        # Target any successful estimate
+        self.model.parameter_estimate(self.start_time_estimation, self.final_time_estimation, self.measurement_variable_list, global_start=7, seed=0, use_initial_values=True, target_J=float('inf'));
+        glo_est_data = self.model.get_global_estimate_data();
+        self.assertEqual(sorted(glo_est_data.keys()), [0, 'J_Best']);
+        self.assertEqual(glo_est_data['J_Best'], glo_est_data[0]['J']);
+        RMSE = dict([(key, self.model.RMSE[key].display_data()) for key in self.model.RMSE.keys()]);
+        # Same iterations and final state in worker processes
+        self.model.parameter_estimate(self.start_time_estimation, self.final_time_estimation, self.measurement_variable_list, global_start=7, seed=0, use_initial_values=True, target_J=float('inf'), processes=4);
+        self.assertEqual(self.model.get_global_estimate_data(), glo_est_data);
+        for key in RMSE.keys():
+            self.assertAlmostEqual(self.model.RMSE[key].display_data(), RMSE[key], places=8);
+        
     def test_estimate_and_validate_global_start_maxexceeded(self):
         '''Test the estimation of a model's coefficients based on measured data using global start and maximum cpu time and iterations.'''
         plt.close('all');
@@ -765,6 +808,9 @@ class StateEstimateFromUKF(TestCaseMPCPy):
                                      version = fmu_ver);
         # Estimate
         model.state_estimate(start_time, final_time, ['T_db']);
+        # Check the data file of the estimation is removed
+        self.assertFalse(os.path.exists(model._state_estimate_method.csv_path));
+        self.assertFalse(os.path.exists('ukf.csv'));
         # Check references
         df_test = system.display_measurements('Measured')
         est = [x[0] for x in model._state_estimate_method.res_est[1]]
@@ -778,6 +824,60 @@ class StateEstimateFromUKF(TestCaseMPCPy):
             plt.legend()
             plt.show()
             
+    def test_streaming_estimate(self):
+        '''Test streaming state estimation against filtering the whole period.
+        
+        '''
+        
+        start_time = '1/1/2017';
+        mid_time = '1/1/2017 06:00:00';
+        final_time = '1/1/2017 12:00:00';
+        # Set measurements
+        measurements = {};
+        measurements['T_db'] = {'Sample' : variables.Static('T_db_sample', 1800, units.s)};
+        measurements['heatCapacitor2.T'] = {'Sample' : variables.Static('T_flo_sample', 1800, units.s)};
+        # Set model paths
+        mopath = os.path.join(self.get_unittest_path(), 'resources', 'model', 'Simple.mo');
+        moinfo = (mopath, 'Simple.R2C2', {})
+        # Gather control inputs
+        control_csv_filepath = os.path.join(self.get_unittest_path(), 'resources', 'model', 'SimpleRC_Input.csv');
+        controls = exodata.ControlFromCSV(control_csv_filepath, {'q_flow_csv' : ('q_flow', units.W)});
+        controls.collect_data(start_time, final_time);
+        # Get measurements
+        system = systems.EmulationFromFMU(measurements, \
+                                          moinfo = moinfo, \
+                                          control_data = controls.data);
+        system.collect_measurements(start_time, final_time);
+        # Estimate states over the whole period and streaming
+        csv_filepath = os.path.join(self.get_unittest_path(), 'resources', 'model', 'SimpleEstimatedStates_ukf.csv');
+        results = [];
+        for streaming in [False, True]:
+            estimated_states = exodata.EstimatedStateFromCSV(csv_filepath);
+            estimated_states.collect_data()
+            model = models.Modelica(models.UKFParameter, \
+                                    models.RMSE, \
+                                    system.measurements, \
+                                    models.UKFState, \
+                                    moinfo = moinfo, \
+                                    estimated_state_data = estimated_states.data, \
+                                    control_data = controls.data);
+            model.set_state_estimate_options({'streaming' : streaming});
+            if streaming:
+                model.state_estimate(start_time, mid_time, ['T_db']);
+            model.state_estimate(start_time, final_time, ['T_db']);
+            results.append(model);
+        # Check the second streaming estimation starts at the previous final time
+        statistics = results[1]._state_estimate_method.update_statistics;
+        self.assertEqual(len(statistics), 2);
+        self.assertEqual(statistics[1]['start_time'], pd.Timestamp(mid_time, tz = 'UTC'));
+        self.assertTrue(statistics[1]['samples'] < statistics[0]['samples'] + 2);
+        self.assertTrue('T_db' in statistics[1]['innovation_mean']);
+        # Check the estimates are close
+        for key in results[0].estimated_state_data:
+            self.assertAlmostEqual(results[1].estimated_state_data[key]['Value'].get_base_data(), \
+                                   results[0].estimated_state_data[key]['Value'].get_base_data(), \
+                                   delta = 0.5);
+
     def test_simple_estimate_10(self):
         self._test_simple_estimate(fmu_ver='1.0')
         
@@ -1001,8 +1101,8 @@ class StateEstimateFromJModelica(TestCaseMPCPy):
             plt.legend()
             plt.show()
             
-    def test_replace_parameters(self):
-        '''Test the functions that replace the parameters for state estimation.
+    def test_copy_parameters(self):
+        '''Test the copy of the parameters for state estimation.
         
         '''
 
@@ -1045,15 +1145,94 @@ class StateEstimateFromJModelica(TestCaseMPCPy):
         # Check original parameters
         df_test_pars = parameters.display_data()
         self.check_df(df_test_pars, 'model_parameters_check.csv', timeseries=False);
-        # Replace parameters and check
-        model._state_estimate_method._replace_parameter_data(model)
-        df_test_pars = parameters.display_data()
-        self.check_df(df_test_pars, 'model_parameters_replaced_check.csv', timeseries=False);
-        # Restore parameters and check with original
-        model._state_estimate_method._restore_parameter_data(model)
+        # Copy parameters and check
+        parameter_data = model._state_estimate_method._copy_parameter_data(model)
+        self.assertTrue(parameter_data['T2o']['Free'].display_data())
+        self.assertTrue(parameter_data['To']['Free'].display_data())
+        self.assertEqual(parameter_data['To']['Covariance'].display_data(), 2)
+        # Check original parameters are unchanged
         df_test_pars = parameters.display_data()
         self.check_df(df_test_pars, 'model_parameters_check.csv', timeseries=False);
         
+    def test_moving_horizon_estimate(self):
+        '''Test moving horizon state estimation on a simple two-state model.
+        
+        '''
+        
+        start_time = '1/1/2017';
+        final_time = '1/1/2017 14:00:00';
+        # Set measurements
+        measurements = {};
+        measurements['T_db'] = {'Sample' : variables.Static('T_db_sample', 1800, units.s)};
+        measurements['heatCapacitor2.T'] = {'Sample' : variables.Static('T_flo_sample', 1800, units.s)};
+        # Set model paths
+        mopath = os.path.join(self.get_unittest_path(), 'resources', 'model', 'Simple.mo');
+        modelpath = 'Simple.R2C2';
+        moinfo = (mopath, modelpath, {})
+        # Define parameters
+        parameter = {};
+        parameter['T2o'] = {};
+        parameter['T2o']['Value'] = 295
+        parameter['T2o']['Minimum'] = 273.15
+        parameter['T2o']['Maximum'] = 350
+        parameter['T2o']['Free'] = False
+        parameter['T2o']['Unit'] = 'K'
+        parameter['To'] = {};
+        parameter['To']['Value'] = 295
+        parameter['To']['Minimum'] = 273.15
+        parameter['To']['Maximum'] = 350
+        parameter['To']['Free'] = False
+        parameter['To']['Unit'] = 'K'
+        df_parameter = pd.DataFrame(parameter).transpose()
+        parameters = exodata.ParameterFromDF(df_parameter)
+        parameters.collect_data()
+        # Gather state data
+        csv_filepath = os.path.join(self.get_unittest_path(), 'resources', 'model', 'SimpleEstimatedStates_jmodelica.csv');
+        estimated_states = exodata.EstimatedStateFromCSV(csv_filepath);
+        estimated_states.collect_data()
+        # Gather control inputs
+        control_csv_filepath = os.path.join(self.get_unittest_path(), 'resources', 'model', 'SimpleRC_Input.csv');
+        variable_map = {'q_flow_csv' : ('q_flow', units.W)};
+        controls = exodata.ControlFromCSV(control_csv_filepath, variable_map);
+        controls.collect_data(start_time, final_time);
+        # Instantiate system and get measurements
+        system = systems.EmulationFromFMU(measurements, \
+                                          moinfo = moinfo, \
+                                          control_data = controls.data);
+        system.collect_measurements(start_time, final_time);
+        # Instantiate model
+        model = models.Modelica(models.JModelicaParameter, \
+                                     models.RMSE, \
+                                     system.measurements, \
+                                     models.JModelicaState, \
+                                     moinfo = moinfo, \
+                                     parameter_data = parameters.data, \
+                                     estimated_state_data = estimated_states.data, \
+                                     control_data = controls.data);
+        # Set moving horizon options
+        estimate_options = model.get_state_estimate_options();
+        estimate_options['moving_horizon'] = True;
+        estimate_options['horizon'] = 6*3600;
+        model.set_state_estimate_options(estimate_options);
+        # Estimate over two overlapping windows
+        model.simulate(start_time, final_time);
+        simulated = dict((key, model.measurements[key]['Simulated']) for key in model.measurements.keys());
+        df_test_pars = parameters.display_data()
+        model.state_estimate(start_time, '1/1/2017 12:00:00', ['T_db']);
+        model.state_estimate(start_time, final_time, ['T_db']);
+        # Check model parameters and simulated measurements are unchanged
+        self.assertTrue((parameters.display_data() == df_test_pars).all().all());
+        for key in simulated.keys():
+            self.assertIs(model.measurements[key]['Simulated'], simulated[key]);
+        # Check second window was warm started
+        opt_statistics = model._state_estimate_method.opt_problem.get_optimization_statistics(warm_start=True);
+        self.assertEqual(opt_statistics['cold_solves'], 1);
+        self.assertEqual(opt_statistics['warm_solves'], 1);
+        # Check estimated state is the measured state at the final time
+        est_value = estimated_states.data['T_db']['Value'].get_base_data()
+        meas_value = system.measurements['T_db']['Measured'].get_base_data().iloc[-1]
+        self.assertAlmostEqual(est_value, meas_value, delta=0.5);
+
     def test_instantiate_error_incompatible_estimation(self):
         '''Test error raised if estimation method is incompatible with model.'''
         # Set model path
@@ -1131,6 +1310,42 @@ class OccupancyFromQueueing(TestCaseMPCPy):
         df_test = occupancy.get_base_measurements('Simulated');
         self.check_df(df_test, 'simulate_base.csv');
 
+    def test_simulate_batch(self):
+        '''Test batch simulation of replicates against single simulations.'''
+        maxtime = 288;
+        lam_vec = np.concatenate((0.01*np.ones(96), 0.2*np.ones(96), 0.05*np.ones(96)));
+        mu_vec = np.concatenate((0.1*np.ones(96), 0.02*np.ones(96), 0.1*np.ones(96)));
+        for empty_time in [None, 250]:
+            # Simulate replicates one by one
+            np.random.seed(1);
+            syssize_ref = simulate_queue_loop(maxtime, lam_vec, mu_vec, 2, empty_time, 20);
+            # Simulate replicates in batch
+            syssize_test = simulate_queue_batch(maxtime, lam_vec, mu_vec, 2, empty_time, 20, np.random.RandomState(1));
+            np.testing.assert_array_equal(syssize_test, syssize_ref);
+
+    def test_simulate_service(self):
+        '''Test service time sampling with the cumulative departure hazard.'''
+        mu = np.concatenate((0.1*np.ones(96), np.zeros(96), 0.02*np.ones(96)));
+        hazard = departure_hazard(mu);
+        np.random.seed(1);
+        arrtimes = np.random.randint(0, 250, 200);
+        r = np.random.uniform(0, 1, 200);
+        # Without truncation
+        servtimes = simulate_service(arrtimes, hazard, r);
+        for i in range(arrtimes.size):
+            cdf = 1-np.exp(-np.cumsum(mu[arrtimes[i]:]));
+            ref = np.where(cdf > r[i])[0];
+            if ref.size:
+                self.assertEqual(servtimes[i], ref[0]);
+            else:
+                self.assertEqual(servtimes[i], -1);
+        # With truncation
+        servtimes = simulate_service_with_trunc(arrtimes, hazard, 250, r);
+        for i in range(arrtimes.size):
+            mu_cum = np.cumsum(mu[arrtimes[i]:250]);
+            cdf = (1-np.exp(-mu_cum))/(1-np.exp(-mu_cum[-1]));
+            self.assertEqual(servtimes[i], np.where(cdf > r[i])[0][0]);
+
     def test_validate(self):
         '''Test occupancy prediction comparison with measured data.'''
         plt.close('all');
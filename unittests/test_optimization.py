@@ -159,6 +159,30 @@ class OptimizeSimpleFromJModelica(TestCaseMPCPy):
         df_test = opt_problem.display_measurements('Simulated');
         self.check_df(df_test, 'optimize_energycost.csv');
 
+    def test_mop_path(self):
+        '''Test that the mop file location depends only on its content.
+
+        '''
+        
+        modelpath = 'Simple.RC';
+        model = models.Modelica(models.JModelicaParameter, \
+                                models.RMSE, \
+                                self.measurements, \
+                                moinfo = (self.mopath, modelpath, {}), \
+                                control_data = self.controls.data);
+        moppaths = [];
+        for problem_type in [optimization.EnergyMin, optimization.EnergyMin, optimization.EnergyCostMin]:
+            opt_problem = optimization.Optimization(model, \
+                                                    problem_type, \
+                                                    optimization.JModelica, \
+                                                    'q_flow', \
+                                                    constraint_data = self.constraints.data);
+            moppaths.append(opt_problem._package_type.moppath);
+        self.assertEqual(moppaths[0], moppaths[1]);
+        self.assertNotEqual(moppaths[0], moppaths[2]);
+        self.assertTrue(os.path.exists(moppaths[2]));
+        self.assertEqual(os.path.dirname(moppaths[0]), os.path.dirname(self.mopath));
+
     def test_simulate_cost_opt(self):
         '''Test the simulation of cost optimization after solving optimization.
 
@@ -557,6 +581,133 @@ class OptimizeSimpleFromJModelica(TestCaseMPCPy):
         df_test.index.name = 'Time'
         self.check_df(df_test, 'optimize_long_control.csv');
         
+    def test_warm_start(self):
+        '''Test warm starting the optimization in a receding horizon.
+        
+        '''
+        
+        modelpath = 'Simple.RC';
+        # Instantiate model
+        model = models.Modelica(models.JModelicaParameter, \
+                                models.RMSE, \
+                                self.measurements, \
+                                moinfo = (self.mopath, modelpath, {}), \
+                                control_data = self.controls.data);
+        # Instantiate optimization problem
+        opt_problem = optimization.Optimization(model, \
+                                                optimization.EnergyMin, \
+                                                optimization.JModelica, \
+                                                'q_flow', \
+                                                constraint_data = self.constraints.data);
+        # Solve receding horizon, first step is cold
+        for start_time in pd.date_range('1/1/2017 00:00:00', periods = 3, freq = '2H'):
+            final_time = start_time + pd.Timedelta(hours = 12);
+            opt_problem.optimize(start_time, final_time, warm_start = True);
+        objective_warm = opt_problem.get_optimization_statistics()[2];
+        opt_statistics = opt_problem.get_optimization_statistics(warm_start = True);
+        self.assertEqual(opt_statistics['cold_solves'], 1);
+        self.assertEqual(opt_statistics['warm_solves'], 2);
+        self.assertEqual(opt_statistics['warm_initial_time'], 0.0);
+        self.assertIsNotNone(opt_statistics['time_saved']);
+        # Horizon not covered by the previous solution is solved cold
+        opt_problem.optimize(start_time, final_time, warm_start = True);
+        opt_problem.optimize('1/5/2017', '1/5/2017 12:00:00', warm_start = True);
+        self.assertEqual(opt_problem.get_optimization_statistics(warm_start = True)['cold_solves'], 2);
+        # Warm start does not change the solution
+        opt_problem.optimize(start_time, final_time);
+        objective_cold = opt_problem.get_optimization_statistics()[2];
+        self.assertAlmostEqual(objective_warm/objective_cold, 1.0, places = 3);
+        
+    def test_warm_start_measurements(self):
+        '''Test the measurements of a warm started optimization are of its horizon only.
+        
+        '''
+        
+        modelpath = 'Simple.RC';
+        # Instantiate model
+        model = models.Modelica(models.JModelicaParameter, \
+                                models.RMSE, \
+                                self.measurements, \
+                                moinfo = (self.mopath, modelpath, {}), \
+                                control_data = self.controls.data);
+        # Instantiate optimization problem
+        opt_problem = optimization.Optimization(model, \
+                                                optimization.EnergyMin, \
+                                                optimization.JModelica, \
+                                                'q_flow', \
+                                                constraint_data = self.constraints.data);
+        # Solve second horizon warm after a cold first horizon
+        opt_problem.optimize('1/1/2017 00:00:00', '1/1/2017 12:00:00', warm_start = True);
+        opt_problem.optimize('1/1/2017 02:00:00', '1/1/2017 14:00:00', warm_start = True);
+        self.assertEqual(opt_problem.get_optimization_statistics(warm_start = True)['warm_solves'], 1);
+        df_warm = opt_problem.display_measurements('Simulated');
+        # Solve second horizon cold
+        opt_problem.optimize('1/1/2017 02:00:00', '1/1/2017 14:00:00');
+        df_cold = opt_problem.display_measurements('Simulated');
+        self.assertTrue(df_warm.index.equals(df_cold.index));
+        for key in df_cold.columns:
+            self.assertTrue(np.allclose(df_warm[key].values, df_cold[key].values, rtol = 1e-3, atol = 1e-3), key);
+        
+    def test_optimize_batch(self):
+        '''Test the optimization of a batch of price scenarios.
+        
+        '''
+        
+        modelpath = 'Simple.RC';
+        # Instantiate model
+        model = models.Modelica(models.JModelicaParameter, \
+                                models.RMSE, \
+                                self.measurements, \
+                                moinfo = (self.mopath, modelpath, {}), \
+                                control_data = self.controls.data);
+        # Instantiate optimization problem
+        opt_problem = optimization.Optimization(model, \
+                                                optimization.EnergyCostMin, \
+                                                optimization.JModelica, \
+                                                'q_flow', \
+                                                constraint_data = self.constraints.data);
+        # Gather price scenarios
+        price_csv_filepath = os.path.join(self.get_unittest_path(), 'resources', 'optimization', 'SimpleRC_Prices.csv');
+        price_variable_map = {'energy[cents/kWh]' : ('pi_e', units.cents_kWh)};
+        price = exodata.PriceFromCSV(price_csv_filepath, price_variable_map);
+        price.collect_data(self.start_time, self.final_time);
+        scenarios = [];
+        for factor in [1, 2, 3]:
+            ts = price.data['pi_e'].get_base_data()*factor;
+            scenarios.append({'price_data' : {'pi_e' : variables.Timeseries('pi_e', ts, units.cents_kWh)}});
+        # Solve once before the batch
+        opt_problem.optimize(self.start_time, self.final_time, price_data = price.data);
+        control_data = model.control_data;
+        package = opt_problem._package_type;
+        res_opt = package.res_opt;
+        solve_log = list(package._solve_log);
+        measurements = opt_problem.measurements;
+        model_simulated = {key : model.measurements[key]['Simulated'] for key in model.measurements.keys()};
+        # Solve in this process and in worker processes
+        results_serial = opt_problem.optimize_batch(self.start_time, self.final_time, scenarios, processes = 1, warm_start = True);
+        results_parallel = opt_problem.optimize_batch(self.start_time, self.final_time, scenarios, processes = 2, warm_start = True);
+        # Check model, measurements, and warm start state are unchanged
+        self.assertIs(model.control_data, control_data);
+        self.assertIs(package.res_opt, res_opt);
+        self.assertEqual(package._solve_log, solve_log);
+        self.assertIs(opt_problem.measurements, measurements);
+        for key in model.measurements.keys():
+            self.assertIs(model.measurements[key]['Simulated'], model_simulated[key]);
+        self.assertEqual(len(results_parallel['statistics']), 3);
+        self.assertEqual(sorted(set(results_parallel['control'].columns.get_level_values(0))), [0, 1, 2]);
+        for key in ['control', 'measurements']:
+            np.testing.assert_allclose(results_parallel[key].values, results_serial[key].values, rtol = 1e-6);
+        # Scenario matches a single optimization
+        opt_problem.optimize(self.start_time, self.final_time, price_data = scenarios[1]['price_data']);
+        df_test = opt_problem.get_base_measurements('Simulated');
+        np.testing.assert_allclose(results_parallel['measurements'][1].values, df_test.values, rtol = 1e-6);
+        # Unknown scenario keys raise an error
+        with self.assertRaises(KeyError):
+            opt_problem.optimize_batch(self.start_time, self.final_time, [{'prices' : {}}]);
+        # An empty batch raises an error
+        with self.assertRaises(ValueError):
+            opt_problem.optimize_batch(self.start_time, self.final_time, []);
+        
     def test_update_constraints(self):
         '''Test the updating of constraints in the optimization.
         
@@ -7,6 +7,8 @@ This module contains the classes for testing the units of mpcpy.
 import unittest
 from mpcpy import variables
 from mpcpy import units
+import numpy as np
+import pandas as pd
         
 #%% Temperature tests
 class Temperature(unittest.TestCase):
@@ -1193,5 +1195,51 @@ class Boolean(unittest.TestCase):
         # Test the display unit name string
         self.assertEqual(var.get_display_unit_name(), 'boolean');            
         
+#%% Array conversion tests
+class ArrayConversion(unittest.TestCase):
+    def setUp(self):
+        self.data = np.array([-40.0, 0, 32, 72.5, 212]);
+        self.index = pd.date_range('1/1/2017', periods = len(self.data), freq = 'H');
+    def test_affine_units(self):
+        for unit in [units.degF, units.degR, units.kBtuh, units.percent, units.deg, units.cents_kWh]:
+            var = variables.Static('var1', self.data, unit);
+            # Test array conversion matches scalar conversion
+            for x, y in zip(self.data, var.get_base_data()):
+                self.assertAlmostEqual(variables.Static('var2', x, unit).get_base_data(), y, places = 6);
+            # Test round trip
+            for x, y in zip(self.data, var.display_data()):
+                self.assertAlmostEqual(x, y, places = 6);
+    def test_list(self):
+        var = variables.Static('var1', self.data.tolist(), units.degF);
+        self.assertIs(type(var.get_base_data()), list);
+        self.assertAlmostEqual(var.get_base_data()[0], 233.15, places = 3);
+        self.assertAlmostEqual(var.display_data()[3], 72.5, places = 3);
+    def test_timeseries(self):
+        ts = pd.Series(data = self.data, index = self.index);
+        var = variables.Timeseries('var1', ts, units.degF);
+        self.assertAlmostEqual(var.get_base_data().get_values()[2], 273.15, places = 3);
+        self.assertAlmostEqual(var.display_data().get_values()[4], 212, places = 3);
+    def test_boolean_array(self):
+        var = variables.Static('var1', np.array([1, 0, 1]), units.boolean);
+        self.assertEqual(var.get_base_data().tolist(), [1, 0, 1]);
+        self.assertEqual(var.display_data().tolist(), [True, False, True]);
+        ts = pd.Series(data = [True, False, True], index = self.index[:3]);
+        var = variables.Timeseries('var1', ts, units.boolean_integer);
+        self.assertEqual(var.get_base_data().tolist(), [1, 0, 1]);
+        
+#%% Unit registry tests
+class Registry(unittest.TestCase):
+    def test_unit_registry(self):
+        self.assertIs(units._unit_registry['(m2.K)/W'], units.m2K_W);
+        self.assertIs(units._unit_registry['boolean'], units.boolean);
+        self.assertNotIn('Temperature', units._unit_registry);
+        for unit_name, unit_class in units._unit_registry.items():
+            self.assertEqual(variables.Static('var1', 1, unit_class).get_display_unit_name(), unit_name);
+    def test_quantity_registry(self):
+        self.assertEqual(set(units._quantity_registry['Temperature']), set([units.K, units.degC, units.degF, units.degR]));
+        for quantity_name, unit_classes in units._quantity_registry.items():
+            for unit_class in unit_classes:
+                self.assertEqual(variables.Static('var1', 1, unit_class).quantity_name, quantity_name);
+        
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
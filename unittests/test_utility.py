@@ -6,6 +6,10 @@ This module contains the classes for testing the utility functions of mpcpy.
 
 import unittest
 import os
+import shutil
+import gc
+import numpy as np
+import pandas as pd
 from mpcpy import utility
 from mpcpy import units
 from mpcpy import systems
@@ -45,6 +49,13 @@ class TestEmulationFromFMU(TestCaseMPCPy):
         fmu_variables_units_2 = self.building_2._get_fmu_variable_units();
         self.assertEqual(fmu_variables_units_2['wesTdb'], 'K');
         self.assertEqual(fmu_variables_units_2['lat'], 'rad');
+    def test_model_description(self):
+        for building in [self.building_1, self.building_2]:
+            model_description = building.model_description;
+            self.assertIs(model_description.get_units(), building._get_fmu_variable_units());
+            self.assertEqual(model_description.get_unit('wesTdb'), 'K');
+            self.assertEqual(model_description.get_causality('wesTdb'), 'output');
+            self.assertEqual(sorted(model_description.get_variable_names(causality = 'input')), sorted(building._get_input_names()));
     def test_get_unit_class_from_fmu_variable_units(self):
         fmu_variables_units = self.building_1._get_fmu_variable_units();
         unit_class = self.building_1._get_unit_class_from_fmu_variable_units('wesTdb', fmu_variables_units);
@@ -55,6 +66,94 @@ class TestEmulationFromFMU(TestCaseMPCPy):
     def test_free_parameter_check(self):
         self.assertEqual(self.building_1.parameter_data['par']['Free'].get_base_data(), 0);
 
+class TestModelDescriptionCache(TestCaseMPCPy):
+    '''Test the on-disk cache of parsed model descriptions.'''
+    def setUp(self):
+        self.cache_dir = os.path.join(self.get_unittest_path(), 'outputs', 'model_description_cache');
+        if os.path.exists(self.cache_dir):
+            shutil.rmtree(self.cache_dir);
+        utility.set_model_description_cache(self.cache_dir);
+        self.fmupath = os.path.join(self.get_unittest_path(), 'resources', 'building', 'LBNL71T_Emulation_JModelica_v2.fmu');
+        
+    def tearDown(self):
+        utility.set_model_description_cache(None);
+        shutil.rmtree(self.cache_dir);
+        
+    def test_cache(self):
+        # First load writes the cache
+        building_1 = systems.EmulationFromFMU({}, fmupath = self.fmupath);
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1);
+        # Second load reads the cache
+        building_2 = systems.EmulationFromFMU({}, fmupath = self.fmupath);
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1);
+        self.assertEqual(building_2.model_description.variables, building_1.model_description.variables);
+        self.assertEqual(building_2.fmu_target, building_1.fmu_target);
+        self.assertEqual(building_2.input_names, building_1.input_names);
+        
+class TestFMUPool(TestCaseMPCPy):
+    '''Test the reuse of fmu instances by the process-wide fmu pool.'''
+    def setUp(self):
+        self.fmupath = os.path.join(self.get_unittest_path(), 'resources', 'model', 'Simple_RC_me_2.fmu');
+        
+    def test_reuse(self):
+        building_1 = systems.EmulationFromFMU({}, fmupath = self.fmupath);
+        fmu_1 = building_1.fmu;
+        # Instance is busy, so a new one is loaded
+        building_2 = systems.EmulationFromFMU({}, fmupath = self.fmupath);
+        self.assertIsNot(building_2.fmu, fmu_1);
+        self.assertIs(building_2.model_description, building_1.model_description);
+        # Instance is returned when its owner is collected
+        del building_1
+        gc.collect();
+        reuses = utility._fmu_pool.reuses;
+        building_3 = systems.EmulationFromFMU({}, fmupath = self.fmupath);
+        self.assertIs(building_3.fmu, fmu_1);
+        self.assertEqual(utility._fmu_pool.reuses, reuses + 1);
+        
+class TestCompileCache(TestCaseMPCPy):
+    '''Test the reuse of compiled fmus by the compile cache.'''
+    def setUp(self):
+        self.cache_dir = os.path.join(self.get_unittest_path(), 'outputs', 'compile_cache');
+        if os.path.exists(self.cache_dir):
+            shutil.rmtree(self.cache_dir);
+        utility.set_compile_cache(self.cache_dir);
+        self.mopath = os.path.join(self.get_unittest_path(), 'resources', 'model', 'Simple.mo');
+        self.modelpath = 'Simple.RC';
+        
+    def tearDown(self):
+        utility.set_compile_cache(None);
+        shutil.rmtree(self.cache_dir);
+        
+    def test_hit_miss(self):
+        statistics = utility.get_compile_cache_statistics();
+        model_1 = models.Modelica(models.JModelicaParameter, models.RMSE, {}, moinfo = (self.mopath, self.modelpath, {}));
+        model_2 = models.Modelica(models.JModelicaParameter, models.RMSE, {}, moinfo = (self.mopath, self.modelpath, {}));
+        self.assertEqual(model_2.fmupath, model_1.fmupath);
+        self.assertEqual(utility.get_compile_cache_statistics()['misses'], statistics['misses'] + 1);
+        self.assertEqual(utility.get_compile_cache_statistics()['hits'], statistics['hits'] + 1);
+        # Different compiler arguments are a different entry
+        model_3 = models.Modelica(models.JModelicaParameter, models.RMSE, {}, moinfo = (self.mopath, self.modelpath, {}), version = '1.0');
+        self.assertNotEqual(model_3.fmupath, model_1.fmupath);
+        self.assertEqual(len(os.listdir(self.cache_dir)), 2);
+        
+    def test_key_file_list(self):
+        key = utility._compile_cache.get_key(self.modelpath, self.mopath, {});
+        # A list of one file has the same content as the file
+        self.assertEqual(utility._compile_cache.get_key(self.modelpath, [self.mopath], {}), key);
+        self.assertEqual(utility._compile_cache.get_key(self.modelpath, unicode(self.mopath), {}), key);
+        # Directories are hashed by the content of their files
+        mopath_dir = os.path.dirname(self.mopath);
+        key_dir = utility._compile_cache.get_key(self.modelpath, [self.mopath, mopath_dir], {});
+        self.assertNotEqual(key_dir, key);
+        self.assertEqual(utility._compile_cache.get_key(self.modelpath, [self.mopath, mopath_dir], {}), key_dir);
+        
+    def test_evict_size(self):
+        utility.set_compile_cache(self.cache_dir, max_size = 1);
+        for version in ['1.0', '2.0']:
+            model = models.Modelica(models.JModelicaParameter, models.RMSE, {}, moinfo = (self.mopath, self.modelpath, {}), version = version);
+            # Only the most recent entry is kept
+            self.assertEqual(os.listdir(self.cache_dir), [os.path.basename(os.path.dirname(model.fmupath))]);
+        
 class TestFMIVersionDefault(TestCaseMPCPy):
     def setUp(self):
         self.mopath = os.path.join(self.get_unittest_path(), 'resources', 'model', 'Simple.mo');
@@ -105,6 +204,23 @@ class TestGetInputNames(TestCaseMPCPy):
             model = models.Modelica(models.JModelicaParameter, models.RMSE, {}, moinfo = (self.mopath, self.modelpath, {}), version = version);
             self.assertEqual(model.input_names, ['q_flow']);
             
+class TestAlignInputs(TestCaseMPCPy):
+    '''Test the alignment of inputs on the union of their times.'''
+    def test_align(self):
+        index_a = pd.date_range('1/1/2017', periods = 10, freq = '15T');
+        index_b = pd.date_range('1/1/2017 00:20:00', periods = 4, freq = '40T');
+        a = pd.Series(np.arange(10.0), index = index_a);
+        a.iloc[3] = np.nan;
+        b = pd.Series(np.arange(4.0)*10, index = index_b);
+        ts_list = [variables.Timeseries('b', b, units.W), \
+                   variables.Timeseries('a', a, units.K)];
+        names, grid, data = utility._align_mpcpy_ts_list(ts_list);
+        df = pd.DataFrame({'a' : ts_list[1].get_base_data(), \
+                           'b' : ts_list[0].get_base_data()}).interpolate(method = 'linear');
+        self.assertEqual(names, ['a', 'b']);
+        np.testing.assert_array_equal(grid, df.index.asi8);
+        np.testing.assert_allclose(data, df.values);
+
 class TestSimulateFMU(TestCaseMPCPy):
     '''Test simulation of me, cs, 1.0, 2.0 fmus.'''
     def setUp(self):
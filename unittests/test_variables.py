@@ -145,6 +145,30 @@ class Timeseries(unittest.TestCase):
         for i in range(len(self.dataC)):
             self.assertEqual(self.var.get_base_data().index[i], self.time[i].tz_localize('UTC')+relativedelta(hours = 6));
             self.assertEqual(self.var.display_data().index[i], self.time[i].tz_localize('UTC')+relativedelta(hours = 6));         
+    def test_display_cache(self):
+        '''Test that display data is cached and updated on set.'''
+        # Repeated calls return cached data
+        self.assertIs(self.var.display_data(), self.var.display_data());
+        # Time zone requests are cached separately
+        local = self.var.display_data(tz_name = 'America/Los_Angeles');
+        self.assertEqual(local.index.tz.zone, 'America/Los_Angeles');
+        self.assertEqual(self.var.display_data().index.tz.zone, 'UTC');
+        # Setting display unit clears cache
+        self.var.set_display_unit(units.degF);
+        self.assertAlmostEqual(self.var.display_data().get_values()[0], 68, places = 3);
+        # Setting data clears cache
+        self.var.set_data(self.dataF_pd);
+        self.assertAlmostEqual(self.var.display_data().get_values()[0], 72, places = 3);
+    def test_set_base_data(self):
+        '''Test setting the data in base units keeps the display unit and time zone.'''
+        self.var = variables.Timeseries('var1', self.dataC_pd, units.degC, tz_name = 'America/Los_Angeles');
+        self.assertAlmostEqual(self.var.display_data().get_values()[0], 20, places = 3);
+        self.var._set_base_data(self.var.get_base_data()+1);
+        self.assertIs(self.var.get_display_unit(), units.degC);
+        self.assertEqual(self.var.tz_name, 'America/Los_Angeles');
+        for i in range(len(self.dataC)):
+            self.assertAlmostEqual(self.var.get_base_data().get_values()[i], self.dataC[i]+274.15, places = 3);
+            self.assertAlmostEqual(self.var.display_data().get_values()[i], self.dataC[i]+1, places = 3);
         
         
 class Operations_Static(unittest.TestCase):